@@ -0,0 +1,5 @@
+"""
+utils/db.py のベンチマーク
+
+    python -m benchmarks --scales 1000,100000,1000000 --output results.json
+"""
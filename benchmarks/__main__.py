@@ -0,0 +1,86 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.generator import generate_dataset
+from benchmarks.db_bench import build_operations, run_db_benchmarks
+from config import DB_DURABILITY_PROFILE
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="utils/db.py のベンチマーク")
+    parser.add_argument("--scales", default="1000,100000,1000000",
+                        help="生成するタスク数（カンマ区切り）")
+    parser.add_argument("--iterations", type=int, default=200, help="操作ごとの計測回数")
+    parser.add_argument("--warmup", type=int, default=10, help="計測前に捨てる実行回数")
+    parser.add_argument("--seed", type=int, default=0, help="データ生成と引数選択の乱数シード")
+    parser.add_argument("--operations", default=None,
+                        help="計測する操作（カンマ区切り、省略時はすべて）")
+    parser.add_argument("--output", default=None, help="結果を書き出すJSONファイル（省略時は標準出力）")
+    parser.add_argument("--workdir", default=None,
+                        help="データベースを作成するディレクトリ（指定した場合は削除しない）")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scales = [int(scale) for scale in args.scales.split(",") if scale]
+    operations = args.operations.split(",") if args.operations else None
+    if operations:
+        unknown = set(operations) - set(build_operations(None, 1, 1))
+        if unknown:
+            sys.exit(f"unknown operations: {', '.join(sorted(unknown))}")
+
+    report = {
+        "meta": {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "durability_profile": DB_DURABILITY_PROFILE,
+            "seed": args.seed,
+            "iterations": args.iterations,
+        },
+        "results": [],
+    }
+
+    with tempfile.TemporaryDirectory(prefix="todo-bench-") as tmpdir:
+        workdir = args.workdir or tmpdir
+        os.makedirs(workdir, exist_ok=True)
+        for scale in scales:
+            db_path = os.path.join(workdir, f"bench-{scale}.db")
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(db_path + suffix):
+                    os.remove(db_path + suffix)
+            print(f"generating {scale} tasks...", file=sys.stderr)
+            start = time.perf_counter()
+            rows = generate_dataset(db_path, scale, seed=args.seed)
+            generate_seconds = time.perf_counter() - start
+            print(f"running benchmarks on {scale} tasks...", file=sys.stderr)
+            operations_result = asyncio.run(run_db_benchmarks(
+                db_path, rows["users"], iterations=args.iterations,
+                warmup=args.warmup, seed=args.seed, operations=operations,
+            ))
+            report["results"].append({
+                "scale": scale,
+                "rows": rows,
+                "generate_seconds": round(generate_seconds, 2),
+                "operations": operations_result,
+            })
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
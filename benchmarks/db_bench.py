@@ -0,0 +1,122 @@
+import random
+import statistics
+import time
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.generator import WORDS
+from utils import db
+from utils.db_pool import open_pool, close_pool, reader
+
+SORT_KEYS = ["created_at", "deadline", "priority", "name"]
+
+
+def summarize(samples):
+    """
+    計測した所要時間（秒）の一覧を集計する
+
+    Args:
+        samples (list): 1回ごとの所要時間（秒）
+
+    Returns:
+        dict: 回数、p50/p95/p99/平均（ミリ秒）、1秒あたりの実行回数
+    """
+    ordered = sorted(samples)
+
+    def percentile(p):
+        # 最近傍法（計測回数が少なくても実測値のどれかを返す）
+        index = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))
+        return ordered[index] * 1000
+
+    total = sum(ordered)
+    return {
+        "count": len(ordered),
+        "p50_ms": round(percentile(50), 3),
+        "p95_ms": round(percentile(95), 3),
+        "p99_ms": round(percentile(99), 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "ops_per_sec": round(len(ordered) / total, 1) if total else None,
+    }
+
+
+def build_operations(rng, users, max_task_id):
+    """
+    計測する操作の一覧を作る（各操作は呼び出すたびに引数を変えるコルーチン関数）
+
+    Args:
+        rng (random.Random): 引数を選ぶ乱数
+        users (int): データセットのユーザー数
+        max_task_id (int): 計測前のタスクIDの最大値（generate_datasetのタスクIDは1から連番）
+
+    Returns:
+        dict: 操作名 -> 引数なしで呼べるコルーチン関数
+    """
+    def user():
+        return rng.randint(1, users)
+
+    async def create_task():
+        await db.create_task(user(), rng.choice(WORDS), priority=rng.randint(0, 4))
+
+    async def search_tasks():
+        return await db.search_tasks(user(), keyword=rng.choice(WORDS))
+
+    async def get_tasks_sorted():
+        return await db.get_tasks_sorted(user(), rng.choice(SORT_KEYS), rng.choice(["ASC", "DESC"]))
+
+    async def get_shared_tasks():
+        return await db.get_shared_tasks(user())
+
+    async def get_reminders_by_user():
+        return await db.get_reminders_by_user(user())
+
+    async def update_task():
+        # 更新するタスクはSQLで探さずに選ぶ（計測するのはUPDATEだけ）
+        await db.update_task(rng.randint(1, max_task_id), priority=rng.randint(0, 4))
+
+    return {
+        "create_task": create_task,
+        "search_tasks": search_tasks,
+        "get_tasks_sorted": get_tasks_sorted,
+        "get_shared_tasks": get_shared_tasks,
+        "get_reminders_by_user": get_reminders_by_user,
+        "update_task": update_task,
+    }
+
+
+async def run_db_benchmarks(db_path, users, iterations=200, warmup=10, seed=0, operations=None):
+    """
+    生成済みのデータベースに対して utils/db.py の各操作を計測する
+
+    Args:
+        db_path (str): generate_datasetで作成したデータベースのパス
+        users (int): データセットのユーザー数
+        iterations (int): 操作ごとの計測回数
+        warmup (int): 計測前に捨てる実行回数（接続作成やページキャッシュの影響を除く）
+        seed (int): 引数を選ぶ乱数のシード
+        operations (list, optional): 計測する操作名。Noneの場合はすべて
+
+    Returns:
+        dict: 操作名 -> summarizeの集計結果
+    """
+    rng = random.Random(seed)
+    await open_pool(db_path)
+    try:
+        async with reader() as conn:
+            cursor = await conn.execute("SELECT MAX(id) FROM tasks")
+            max_task_id = (await cursor.fetchone())[0] or 1
+        available = build_operations(rng, users, max_task_id)
+        names = operations or list(available)
+        results = {}
+        for name in names:
+            operation = available[name]
+            for _ in range(warmup):
+                await operation()
+            samples = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                await operation()
+                samples.append(time.perf_counter() - start)
+            results[name] = summarize(samples)
+        return results
+    finally:
+        await close_pool()
@@ -0,0 +1,156 @@
+import os
+import random
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db_init import ensure_schema
+
+# タスク名・詳細に使う単語（日本語と英語を混ぜ、検索語としても使う）
+WORDS = [
+    "買い物", "会議", "資料", "レポート", "提出", "掃除", "洗濯", "予約", "電話", "メール",
+    "確認", "準備", "請求書", "振込", "打ち合わせ", "企画書", "発表", "課題", "読書", "運動",
+    "report", "review", "meeting", "invoice", "deploy", "release", "budget", "design", "backup", "update",
+]
+TAG_NAMES = ["仕事", "家事", "学校", "買い物", "趣味", "健康", "家族", "お金", "旅行", "重要"]
+TAG_COLORS = ["#e74c3c", "#3498db", "#2ecc71", "#f1c40f", "#9b59b6", "#1abc9c", "#e67e22", None]
+
+# ベンチマーク用ユーザーのパスワード（"password" をコスト4でハッシュ化したもの）
+PASSWORD_HASH = b"$2b$04$bZ2QeGDT4K/.TjQBHF0B8eN7Sn.fQc85WY9qFhqn6GWelQvQmQrgi"
+
+# 1ユーザーあたりの平均タスク数
+TASKS_PER_USER = 200
+# 締切を持つタスク・完了済みタスク・共有されるタスク・リマインダーを持つタスクの割合
+DEADLINE_RATIO = 0.7
+DONE_RATIO = 0.4
+SHARE_RATIO = 0.05
+REMINDER_RATIO = 0.2
+# 優先度0〜4の出現比率（低い優先度ほど多い）
+PRIORITY_WEIGHTS = [40, 25, 18, 12, 5]
+
+# executemanyに一度に渡す行数
+BATCH_SIZE = 10000
+
+
+def _text(rng, min_words, max_words):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words)))
+
+
+def _batched(rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate_dataset(db_path, tasks, seed=0, now=None, users=None):
+    """
+    テスト用データベースにユーザー・タグ・タスク・共有・リマインダーを生成する
+
+    ユーザーあたりのタスク数は対数正規分布（少数のユーザーが多くのタスクを持つ）、
+    締切は基準日時の前後60日、完了済みタスクは作成から30日以内に完了したものとする。
+    同じseedなら同じデータが生成される。
+
+    Args:
+        db_path (str): 作成するデータベースファイルのパス（既存のファイルは使わないこと）
+        tasks (int): 生成するタスク数
+        seed (int): 乱数のシード
+        now (datetime, optional): 基準日時。Noneの場合は固定の日時（結果を再現できるようにする）
+        users (int, optional): ユーザー数。Noneの場合はタスク数から決める（1ユーザー平均TASKS_PER_USER件）
+
+    Returns:
+        dict: 生成した行数（users, tags, tasks, task_shares, reminders）
+    """
+    rng = random.Random(seed)
+    now = now or datetime(2025, 1, 1, 9, 0)
+    ensure_schema(db_path)
+
+    users = users or max(1, tasks // TASKS_PER_USER)
+    # ユーザーごとのタスク数（合計がtasksになるよう重みで配分する）
+    weights = [rng.lognormvariate(0, 1) for _ in range(users)]
+    total_weight = sum(weights)
+    counts = [int(tasks * w / total_weight) for w in weights]
+    counts[0] += tasks - sum(counts)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executemany(
+            "INSERT INTO users (id, name, email, password) VALUES (?, ?, ?, ?)",
+            [(i, f"user{i}", f"user{i}@example.com", PASSWORD_HASH) for i in range(1, users + 1)],
+        )
+
+        tag_rows = []
+        tags_by_user = {}
+        for user_id in range(1, users + 1):
+            names = rng.sample(TAG_NAMES, rng.randint(3, 8))
+            tags_by_user[user_id] = list(range(len(tag_rows) + 1, len(tag_rows) + len(names) + 1))
+            for name in names:
+                tag_rows.append((len(tag_rows) + 1, user_id, name, rng.choice(TAG_COLORS)))
+        conn.executemany("INSERT INTO tags (id, user, name, color) VALUES (?, ?, ?, ?)", tag_rows)
+
+        task_ids_with_deadline = []
+
+        def task_rows():
+            task_id = 0
+            for user_id, count in enumerate(counts, start=1):
+                for _ in range(count):
+                    task_id += 1
+                    created = now - timedelta(days=rng.uniform(0, 120))
+                    deadline = None
+                    if rng.random() < DEADLINE_RATIO:
+                        deadline = now + timedelta(days=rng.uniform(-60, 60))
+                        task_ids_with_deadline.append((task_id, deadline))
+                    is_done = 1 if rng.random() < DONE_RATIO else 0
+                    completed = created + timedelta(days=rng.uniform(0, 30)) if is_done else None
+                    tag = rng.choice(tags_by_user[user_id]) if rng.random() < 0.6 else None
+                    yield (
+                        task_id, user_id, is_done, _text(rng, 1, 3),
+                        _text(rng, 0, 12) or None, tag,
+                        deadline.strftime("%Y-%m-%d %H:%M") if deadline else None,
+                        rng.choices(range(5), PRIORITY_WEIGHTS)[0],
+                        created.strftime("%Y-%m-%d %H:%M:%S"),
+                        completed.strftime("%Y-%m-%d %H:%M:%S") if completed else None,
+                    )
+
+        for batch in _batched(task_rows()):
+            conn.executemany(
+                """INSERT INTO tasks (id, user, is_done, name, description, tag, deadline, priority, created_at, completed_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                batch,
+            )
+
+        share_rows = []
+        if users > 1:
+            for task_id in range(1, tasks + 1):
+                if rng.random() < SHARE_RATIO:
+                    for user_id in rng.sample(range(1, users + 1), min(users, rng.randint(1, 3))):
+                        share_rows.append((task_id, user_id))
+        for batch in _batched(share_rows):
+            conn.executemany("INSERT INTO task_shares (task_id, user_id) VALUES (?, ?)", batch)
+
+        reminder_rows = []
+        for task_id, deadline in task_ids_with_deadline:
+            if rng.random() < REMINDER_RATIO:
+                remind_at = deadline - timedelta(minutes=rng.choice([10, 30, 60, 180, 1440]))
+                reminder_rows.append((task_id, remind_at.strftime("%Y-%m-%d %H:%M"), 1 if remind_at < now else 0))
+        for batch in _batched(reminder_rows):
+            conn.executemany("INSERT INTO reminders (task_id, remind_at, is_sent) VALUES (?, ?, ?)", batch)
+
+        conn.commit()
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+    return {
+        "users": users,
+        "tags": len(tag_rows),
+        "tasks": tasks,
+        "task_shares": len(share_rows),
+        "reminders": len(reminder_rows),
+    }
@@ -0,0 +1,224 @@
+"""
+TodoPageの描画ベンチマーク（仮想Xディスプレイ上でAppを起動して計測する）
+
+    python -m benchmarks.ui_bench --scales 100,1000,10000 --output ui_results.json
+
+DISPLAYが設定されていない場合はXvfbを起動する（Xvfbのインストールが必要）。
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.generator import generate_dataset
+
+# 非同期処理の完了を待つ最大秒数
+WAIT_TIMEOUT = 60
+
+
+def start_xvfb(display=":99"):
+    """
+    Xvfbを起動してDISPLAYを設定する
+
+    Args:
+        display (str): 使用するディスプレイ番号
+
+    Returns:
+        subprocess.Popen: Xvfbのプロセス
+    """
+    if shutil.which("Xvfb") is None:
+        sys.exit("Xvfb not found: install it (e.g. apt install xvfb) or set DISPLAY")
+    process = subprocess.Popen(
+        ["Xvfb", display, "-screen", "0", "1280x800x24", "-nolisten", "tcp"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    os.environ["DISPLAY"] = display
+    # サーバーが接続を受け付けるまで待つ
+    socket_path = f"/tmp/.X11-unix/X{display.lstrip(':')}"
+    deadline = time.monotonic() + 10
+    while not os.path.exists(socket_path):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.terminate()
+            sys.exit("failed to start Xvfb")
+        time.sleep(0.05)
+    return process
+
+
+def count_widgets(widget):
+    """ウィジェットの数を子孫まで含めて数える"""
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def wait_until(app, predicate, timeout=WAIT_TIMEOUT):
+    """
+    条件を満たすまでTkのイベントを処理し続ける（バックグラウンド処理の結果もafter経由で届く）
+    """
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise TimeoutError("timed out waiting for the UI")
+        app.update()
+    app.update_idletasks()
+
+
+def measure(app, action, done, repeat):
+    """
+    actionを実行してからdoneがTrueになるまでの時間をrepeat回計測する
+
+    Returns:
+        dict: p50/最小/最大（ミリ秒）と計測後のウィジェット数
+    """
+    samples = []
+    for _ in range(repeat):
+        app.update()
+        start = time.perf_counter()
+        token = action()
+        wait_until(app, lambda: done(token))
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "min_ms": round(min(samples), 3),
+        "max_ms": round(max(samples), 3),
+        "widgets": count_widgets(app),
+    }
+
+
+def run_scale(App, tasks, workdir, repeat, seed):
+    """
+    1つの規模のデータでAppを起動し、各操作を計測する
+    """
+    from lib.session import save_session
+    from lib.tags import TagManager
+    from lib.tasks import TaskManager
+    from utils.db_pool import open_pool
+    import customtkinter as tk
+
+    db_path = os.path.join(workdir, f"ui-bench-{tasks}.db")
+    rows = generate_dataset(db_path, tasks, seed=seed, users=1)
+    asyncio.run(open_pool(db_path))
+    save_session((1, "user1", "user1@example.com"))
+    # 前の規模で読み込んだキャッシュを使わないようにする
+    TaskManager.invalidate_cache()
+    TagManager.invalidate_cache()
+
+    results = {"scale": tasks, "rows": rows}
+    start = time.perf_counter()
+    app = App()
+    page = app.frames["todo"]
+    # 描画が終わった回数（最初の描画は非同期の取得後なので、ここで登録しても取りこぼさない）
+    renders = [0]
+    page.subscribe_render(lambda: renders.__setitem__(0, renders[0] + 1))
+    wait_until(app, lambda: renders[0] > 0)
+    results["startup"] = {
+        "wall_ms": round((time.perf_counter() - start) * 1000, 3),
+        "widgets": count_widgets(app),
+    }
+
+    def refresh(**changes):
+        def action():
+            before = renders[0]
+            for var, value in changes.items():
+                getattr(page, var).set(value)
+            page.refresh_tasks(force=True)
+            return before
+        return action
+
+    rendered = lambda before: renders[0] > before
+    operations = {
+        "refresh_tasks": refresh(),
+        "filter_status": refresh(show_completed_var="未完了"),
+        "filter_reset": refresh(show_completed_var="すべて"),
+        "sort_deadline": refresh(sort_var="期限日"),
+        "sort_name_desc": refresh(sort_var="名前", order_var="降順"),
+    }
+    for name, action in operations.items():
+        results[name] = measure(app, action, rendered, repeat)
+
+    def popups():
+        return [w for w in page.winfo_children() if isinstance(w, tk.CTkToplevel)]
+
+    def open_popup(open_func):
+        def action():
+            before = popups()
+            task = page.task_list.items[0]
+            open_func(task)
+            return before
+        return action
+
+    def popup_opened(before):
+        opened = [w for w in popups() if w not in before]
+        if not opened:
+            return False
+        app.update_idletasks()
+        for popup in opened:
+            popup.destroy()
+        return True
+
+    results["open_edit_popup"] = measure(
+        app, open_popup(lambda task: page.open_edit_popup(task[0], task[4])), popup_opened, repeat)
+    results["open_share_popup"] = measure(
+        app, open_popup(lambda task: page.open_share_popup(task[0])), popup_opened, repeat)
+
+    app.shutdown()
+    app.destroy()
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.ui_bench", description="TodoPageの描画ベンチマーク")
+    parser.add_argument("--scales", default="100,1000,10000", help="ユーザーのタスク数（カンマ区切り）")
+    parser.add_argument("--repeat", type=int, default=5, help="操作ごとの計測回数")
+    parser.add_argument("--seed", type=int, default=0, help="データ生成の乱数シード")
+    parser.add_argument("--display", default=":99", help="Xvfbで使うディスプレイ番号")
+    parser.add_argument("--output", default=None, help="結果を書き出すJSONファイル（省略時は標準出力）")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scales = [int(scale) for scale in args.scales.split(",") if scale]
+    xvfb = None if os.environ.get("DISPLAY") else start_xvfb(args.display)
+    output_path = os.path.abspath(args.output) if args.output else None
+    cwd = os.getcwd()
+    report = {
+        "meta": {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "display": os.environ.get("DISPLAY"),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": [],
+    }
+    try:
+        with tempfile.TemporaryDirectory(prefix="todo-ui-bench-") as workdir:
+            # session.json などを作業ディレクトリに作らないよう、一時ディレクトリで実行する
+            os.chdir(workdir)
+            from main import App
+            for scale in scales:
+                print(f"running UI benchmark on {scale} tasks...", file=sys.stderr)
+                report["results"].append(run_scale(App, scale, workdir, args.repeat, args.seed))
+    finally:
+        os.chdir(cwd)
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,80 @@
 """
 アプリケーション設定ファイル
 """
+import os
 
 # データベース設定
-DB_PATH = "todo.db"
\ No newline at end of file
+DB_PATH = "todo.db"
+
+# 接続プール設定
+DB_POOL_READERS = 4  # 読み取り用に保持する接続数（書き込み用は常に1本）
+DB_POOL_HEALTH_CHECK_INTERVAL = 30  # この秒数以上使われていない接続は利用前に疎通確認する
+
+# 接続ごとに設定するPRAGMAのプロファイル（耐久性と速度のバランス）
+# safe: 電源断でもコミット済みの変更を失わない / balanced: WALでアプリのクラッシュには耐える / fast: 速度優先
+DB_PRAGMA_PROFILES = {
+    "safe": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -8000,  # 負の値はKiB単位（約8MB）
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,  # ミリ秒
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+DB_DURABILITY_PROFILE = "balanced"  # 使用するプロファイル名
+DB_CHECKPOINT_INTERVAL = 300  # WALのチェックポイントを実行する間隔（秒）
+DB_OPTIMIZE_INTERVAL = 3600  # PRAGMA optimizeを実行する間隔（秒）
+
+# 計測設定
+METRICS_ENABLED = False  # utils/db.pyの呼び出し回数・レイテンシなどを計測する（調査するときだけTrueにする）
+SLOW_QUERY_MS = 100  # この時間（ミリ秒）以上かかったSQLをスロークエリログに記録する
+# スロークエリログのファイル（起動したディレクトリによらずこのファイルと同じ場所。Noneの場合は件数だけ数える）
+SLOW_QUERY_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "slow_queries.log")
+METRICS_DUMP_PATH = None  # 終了時に計測値を書き出すJSONファイル（Noneの場合は書き出さない）
+
+# パスワードハッシュ設定
+BCRYPT_ROUNDS = 12  # bcryptのコスト（変更すると既存ユーザーは次回ログイン時に再ハッシュされる）
+BCRYPT_WORKERS = 2  # ハッシュ計算を行うスレッド数
+
+# キャッシュ設定
+TASK_CACHE_MAX_TASKS = 5000  # これ以下のタスク数のユーザーはタスクをメモリに保持し、一覧表示でSQLを発行しない
+
+# 書き込みの遅延設定
+TASK_WRITE_BEHIND = True  # Trueの場合、UIからのタスク更新をまとめて書き込む
+WRITE_BEHIND_FLUSH_MS = 20  # 最初の更新からまとめて書き込むまでの時間（ミリ秒）
+
+# APIサーバー設定（server.py）
+API_HOST = "127.0.0.1"  # 待ち受けるアドレス（認証がないためローカルのみにする）
+API_PORT = 8765
+API_MAX_BODY_BYTES = 1024 * 1024  # リクエストボディの上限（バイト）
+API_KEEP_ALIVE_TIMEOUT = 15  # 次のリクエストを待つ最大秒数（keep-alive）
+
+# エクスポート・インポート設定（utils/export.py, utils/importer.py）
+EXPORT_BATCH_SIZE = 1000  # fetchmanyで1回に読み出す行数
+IMPORT_BATCH_SIZE = 1000  # インポートで1トランザクションにまとめて挿入する行数
+
+# UI設定
+ASYNC_POLL_INTERVAL_MS = 10  # バックグラウンド処理の完了をTk側で確認する間隔（ミリ秒）
+SEARCH_DEBOUNCE_MS = 250  # 検索欄の入力が止まってから検索するまでの時間（ミリ秒）
+TASK_PAGE_SIZE = 100  # タスク一覧で1回に読み込む件数（スクロールで続きを読み込む）
+SESSION_CHECK_INTERVAL_MS = 1000  # session.jsonが外部で更新されていないか確認する間隔（ミリ秒）
+
+# リマインダー設定
+REMINDER_RELOAD_INTERVAL = 60  # APIサーバー・インポートなど他のプロセスが追加したリマインダーを読み直す間隔（秒）
@@ -1,11 +1,7 @@
 import os
-import subprocess
+from utils.db_init import ensure_schema
 
-# todo.dbファイルを同じディレクトリに作成
-db_path = os.path.join(os.path.dirname(__file__), 'todo.db')
-if not os.path.exists(db_path):
-    open(db_path, 'w').close()
-
-# ./utils/db_init.py を実行
-utils_path = os.path.join(os.path.dirname(__file__), 'utils', 'db_init.py')
-subprocess.run(['python', utils_path])
\ No newline at end of file
+# todo.dbを同じディレクトリに作成し、テーブルとマイグレーションを適用する
+db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'todo.db')
+applied = ensure_schema(db_path)
+print(f"Applied migrations: {applied}" if applied else "Schema is up to date")
@@ -0,0 +1,591 @@
+import asyncio
+import base64
+import hashlib
+import json
+import re
+import sqlite3
+from datetime import datetime
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs
+from config import API_MAX_BODY_BYTES, API_KEEP_ALIVE_TIMEOUT
+from lib.tasks import TaskManager
+from lib.tags import TagManager
+from lib.users import UserManager
+from lib.reminder import ReminderManager, parse_remind_at
+from utils.db import TASK_SORT_EXPRESSIONS
+
+# 各テーブルの行（タプル）をJSONのオブジェクトに変換するときのキー
+TASK_FIELDS = ("id", "user", "shared_with", "is_done", "name", "description", "tag", "deadline",
+               "priority", "created_at", "updated_at", "completed_at", "tag_name", "tag_color")
+TAG_FIELDS = ("id", "user", "name", "color")
+REMINDER_FIELDS = ("id", "task_id", "remind_at", "is_sent")
+
+# PATCH /tasks/{id} で変更できる項目
+TASK_UPDATE_FIELDS = ("name", "description", "tag", "deadline", "priority", "is_done")
+# POST /users/{id}/tasks で指定できる項目（作成したタスクは常に未完了）
+TASK_CREATE_FIELDS = ("name", "description", "tag", "deadline", "priority")
+
+# 1ページの件数の上限（limit未指定時の件数）
+MAX_PAGE_SIZE = 1000
+
+# リクエストヘッダーの上限
+MAX_HEADER_LINES = 100
+MAX_LINE_BYTES = 8192
+
+
+class ApiError(Exception):
+    """HTTPのエラーレスポンスとして返す例外"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+    """受信したHTTPリクエスト"""
+
+    def __init__(self, method, target, headers, body):
+        parts = urlsplit(target)
+        self.method = method
+        self.path = parts.path
+        self.query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        self.headers = headers
+        self.body = body
+        self.params = {}  # パスから取り出したパラメータ
+
+    def json(self):
+        """ボディをJSONとして読み込む"""
+        if not self.body:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "request body is required")
+        try:
+            return json.loads(self.body)
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "request body is not valid JSON")
+
+
+class Response:
+    """返却するHTTPレスポンス"""
+
+    def __init__(self, status=HTTPStatus.OK, body=b"", headers=None):
+        self.status = HTTPStatus(status)
+        self.body = body
+        self.headers = headers or {}
+
+
+def json_response(request, payload, status=HTTPStatus.OK, etag=False):
+    """
+    JSONのレスポンスを作る
+
+    Args:
+        request (Request): 対応するリクエスト
+        payload (Any): JSONにする値
+        status (int): ステータスコード
+        etag (bool): Trueの場合はボディのハッシュをETagとして付け、If-None-Matchと一致すれば304を返す
+
+    Returns:
+        Response: レスポンス
+    """
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    headers = {"Content-Type": "application/json; charset=utf-8"}
+    if etag:
+        tag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        headers["ETag"] = tag
+        if tag in {value.strip() for value in request.headers.get("if-none-match", "").split(",")}:
+            return Response(HTTPStatus.NOT_MODIFIED, headers={"ETag": tag})
+    return Response(status, body, headers)
+
+
+def row_to_dict(fields, row):
+    """行のタプルをキー付きの辞書にする（Noneはそのまま返す）"""
+    return None if row is None else dict(zip(fields, row))
+
+
+def encode_cursor(cursor):
+    """query_tasksの次ページ用カーソルをURLに載せられる文字列にする"""
+    if cursor is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(cursor).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(token):
+    """encode_cursorの文字列をカーソルに戻す"""
+    try:
+        cursor = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "invalid cursor")
+    if not isinstance(cursor, list) or len(cursor) != 2:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "invalid cursor")
+    value, task_id = cursor
+    # カーソルは [ソートキーの値, タスクID]（値は文字列か数値）
+    if (not isinstance(value, (str, int, float)) or isinstance(value, bool)
+            or not isinstance(task_id, int) or isinstance(task_id, bool)):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "invalid cursor")
+    return cursor
+
+
+def _int_param(query, name, default=None):
+    value = query.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} must be an integer")
+
+
+def _bool_param(query, name):
+    value = query.get(name)
+    if value is None or value == "":
+        return None
+    if value.lower() in ("1", "true"):
+        return True
+    if value.lower() in ("0", "false"):
+        return False
+    raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} must be true or false")
+
+
+def _require_object(data):
+    if not isinstance(data, dict):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "request body must be a JSON object")
+    return data
+
+
+def _remind_at(data):
+    """リマインド日時を検証して取り出す（保存する前に不正な値を400にする）"""
+    try:
+        parse_remind_at(data["remind_at"])
+    except ValueError as e:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"remind_at: {e}")
+    return data["remind_at"]
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_datetime(value):
+    # 締切はリマインド日時と同じくタイムゾーンなしのローカル時刻で扱う
+    try:
+        return datetime.fromisoformat(value).tzinfo is None
+    except ValueError:
+        return False
+
+
+# タスクの項目ごとの値の検証（Noneを許す項目はNoneも受け付ける）
+TASK_FIELD_CHECKS = {
+    "name": (lambda value: isinstance(value, str) and value != "", "a non-empty string"),
+    "description": (lambda value: value is None or isinstance(value, str), "a string or null"),
+    "tag": (lambda value: value is None or _is_int(value), "an integer or null"),
+    "deadline": (lambda value: value is None or (isinstance(value, str) and _is_datetime(value)),
+                 "an ISO 8601 local date-time string (without a UTC offset) or null"),
+    "priority": (_is_int, "an integer"),
+    "is_done": (lambda value: isinstance(value, bool) or value in (0, 1), "a boolean"),
+}
+
+
+def _task_fields(data, allowed=TASK_UPDATE_FIELDS):
+    """
+    作成・更新に使う項目を検証する
+
+    Args:
+        data (dict): リクエストのオブジェクト
+        allowed (tuple): 指定できる項目
+
+    Returns:
+        dict: 検証済みの項目
+    """
+    unknown = set(data) - set(allowed)
+    if unknown:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"unknown fields: {', '.join(sorted(unknown))}")
+    for field, value in data.items():
+        check, expected = TASK_FIELD_CHECKS[field]
+        if not check(value):
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"{field} must be {expected}")
+    return data
+
+
+async def _require_user(user_id):
+    """パスのユーザーが存在しなければ404にする"""
+    if await UserManager.get_by_id(user_id) is None:
+        raise ApiError(HTTPStatus.NOT_FOUND, "user not found")
+
+
+async def _check_tags(user_id, tasks):
+    """
+    タスクに指定したタグが、そのユーザーのタグとして存在するか確認する
+
+    Args:
+        user_id (int): タスクの所有者のユーザーID
+        tasks (list): _task_fields で検証済みの項目の辞書のリスト
+    """
+    tag_ids = {task["tag"] for task in tasks if task.get("tag") is not None}
+    if not tag_ids:
+        return
+    own_tag_ids = {tag[0] for tag in await TagManager.get_by_user(user_id, use_cache=False)}
+    missing = tag_ids - own_tag_ids
+    if missing:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"unknown tag for this user: {', '.join(map(str, sorted(missing)))}")
+
+
+ROUTES = []
+
+
+def route(method, pattern):
+    """
+    ハンドラーを登録するデコレーター
+
+    Args:
+        method (str): HTTPメソッド
+        pattern (str): パス（{name} の部分は整数のパラメータとしてrequest.paramsに入る）
+    """
+    regex = re.compile("^" + re.sub(r"\{(\w+)\}", r"(?P<\1>\\d+)", pattern) + "$")
+
+    def decorator(handler):
+        ROUTES.append((method, regex, handler))
+        return handler
+    return decorator
+
+
+async def dispatch(request):
+    """
+    リクエストを対応するハンドラーで処理する
+
+    Returns:
+        Response: レスポンス
+    """
+    allowed = []
+    for method, regex, handler in ROUTES:
+        match = regex.match(request.path)
+        if match is None:
+            continue
+        if method != request.method:
+            allowed.append(method)
+            continue
+        request.params = {key: int(value) for key, value in match.groupdict().items()}
+        try:
+            return await handler(request)
+        except ApiError as e:
+            return json_response(request, {"error": e.message}, e.status)
+        except Exception as e:
+            print(f"API error on {request.method} {request.path}: {e}")
+            return json_response(request, {"error": "internal server error"}, HTTPStatus.INTERNAL_SERVER_ERROR)
+    if allowed:
+        response = json_response(request, {"error": "method not allowed"}, HTTPStatus.METHOD_NOT_ALLOWED)
+        response.headers["Allow"] = ", ".join(allowed)
+        return response
+    return json_response(request, {"error": "not found"}, HTTPStatus.NOT_FOUND)
+
+
+# === タスク ===
+
+@route("GET", "/health")
+async def health(request):
+    return json_response(request, {"status": "ok"})
+
+
+@route("GET", "/users/{user_id}/tasks")
+async def list_tasks(request):
+    """
+    タスク一覧（keyword, tag, is_done, priority, deadline_from, deadline_to, sort_by, order, limit, cursorで絞り込み）
+    """
+    query = request.query
+    limit = _int_param(query, "limit", MAX_PAGE_SIZE)
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    # query_tasksは不明な値を既定の並び順として扱うため、ここで400にする
+    sort_by = query.get("sort_by", "created_at")
+    if sort_by not in TASK_SORT_EXPRESSIONS:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"sort_by must be one of {', '.join(TASK_SORT_EXPRESSIONS)}")
+    order = query.get("order", "ASC").upper()
+    if order not in ("ASC", "DESC"):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "order must be ASC or DESC")
+    # todo.dbはGUIやインポートなど他のプロセスも書き込むため、プロセス内のキャッシュは使わない
+    # （ETagも常にデータベースの現在の内容から計算される）
+    tasks, cursor = await TaskManager.query(
+        request.params["user_id"],
+        use_cache=False,
+        keyword=query.get("keyword") or None,
+        tag_id=_int_param(query, "tag"),
+        is_done=_bool_param(query, "is_done"),
+        priority=_int_param(query, "priority"),
+        deadline_from=query.get("deadline_from") or None,
+        deadline_to=query.get("deadline_to") or None,
+        sort_by=sort_by,
+        order=order,
+        limit=limit,
+        cursor=decode_cursor(query["cursor"]) if query.get("cursor") else None,
+    )
+    return json_response(request, {
+        "tasks": [row_to_dict(TASK_FIELDS, task) for task in tasks],
+        "next_cursor": encode_cursor(cursor),
+    }, etag=True)
+
+
+@route("GET", "/users/{user_id}/shared-tasks")
+async def list_shared_tasks(request):
+    """このユーザーに共有されたタスク一覧"""
+    tasks = await TaskManager.get_shared_with_me_with_tags(request.params["user_id"])
+    return json_response(request, {"tasks": [row_to_dict(TASK_FIELDS, task) for task in tasks]}, etag=True)
+
+
+@route("POST", "/users/{user_id}/tasks")
+async def create_tasks(request):
+    """
+    タスクを作成する（オブジェクトなら1件、配列なら1つのトランザクションでまとめて作成）
+    """
+    data = request.json()
+    user_id = request.params["user_id"]
+    if isinstance(data, list):
+        tasks = [_task_fields(_require_object(task), TASK_CREATE_FIELDS) for task in data]
+        if any(not task.get("name") for task in tasks):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "name is required")
+        await _require_user(user_id)
+        await _check_tags(user_id, tasks)
+        count = await TaskManager.create_many(user_id, tasks)
+        return json_response(request, {"created": count}, HTTPStatus.CREATED)
+    task = _task_fields(_require_object(data), TASK_CREATE_FIELDS)
+    if not task.get("name"):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "name is required")
+    await _require_user(user_id)
+    await _check_tags(user_id, [task])
+    task_id = await TaskManager.create(user_id, **task)
+    created = await TaskManager.get_by_id_with_tag(task_id)
+    return json_response(request, row_to_dict(TASK_FIELDS, created), HTTPStatus.CREATED)
+
+
+@route("GET", "/tasks/{task_id}")
+async def get_task(request):
+    task = await TaskManager.get_by_id_with_tag(request.params["task_id"])
+    if task is None:
+        raise ApiError(HTTPStatus.NOT_FOUND, "task not found")
+    return json_response(request, row_to_dict(TASK_FIELDS, task), etag=True)
+
+
+@route("PATCH", "/tasks/{task_id}")
+async def update_task(request):
+    task_id = request.params["task_id"]
+    fields = _task_fields(_require_object(request.json()))
+    task = await TaskManager.get_by_id(task_id)
+    if task is None:
+        raise ApiError(HTTPStatus.NOT_FOUND, "task not found")
+    # タグはタスクの所有者のものだけを指定できる
+    await _check_tags(task[1], [fields])
+    if fields:
+        # nullを指定した項目は値を消す（update_taskはNoneの項目を更新しないため、clearで渡す）
+        values = {field: value for field, value in fields.items() if value is not None}
+        clear = tuple(field for field, value in fields.items() if value is None)
+        await TaskManager.update(task_id, clear=clear, **values)
+    return json_response(request, row_to_dict(TASK_FIELDS, await TaskManager.get_by_id_with_tag(task_id)))
+
+
+@route("DELETE", "/tasks/{task_id}")
+async def delete_task(request):
+    task_id = request.params["task_id"]
+    if await TaskManager.get_by_id(task_id) is None:
+        raise ApiError(HTTPStatus.NOT_FOUND, "task not found")
+    await TaskManager.delete(task_id)
+    return Response(HTTPStatus.NO_CONTENT)
+
+
+# === タグ ===
+
+@route("GET", "/users/{user_id}/tags")
+async def list_tags(request):
+    tags = await TagManager.get_by_user(request.params["user_id"], use_cache=False)
+    return json_response(request, {"tags": [row_to_dict(TAG_FIELDS, tag) for tag in tags]}, etag=True)
+
+
+@route("POST", "/users/{user_id}/tags")
+async def create_tag(request):
+    data = _require_object(request.json())
+    if not data.get("name") or not isinstance(data["name"], str):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "name is required")
+    await _require_user(request.params["user_id"])
+    try:
+        tag_id = await TagManager.create(request.params["user_id"], data["name"])
+    except sqlite3.IntegrityError:
+        # tagsは (user, name) が一意
+        raise ApiError(HTTPStatus.CONFLICT, "tag already exists")
+    return json_response(request, row_to_dict(TAG_FIELDS, await TagManager.get_by_id(tag_id)), HTTPStatus.CREATED)
+
+
+@route("DELETE", "/tags/{tag_id}")
+async def delete_tag(request):
+    tag_id = request.params["tag_id"]
+    if await TagManager.get_by_id(tag_id) is None:
+        raise ApiError(HTTPStatus.NOT_FOUND, "tag not found")
+    await TagManager.delete(tag_id)
+    return Response(HTTPStatus.NO_CONTENT)
+
+
+# === リマインダー ===
+
+@route("GET", "/users/{user_id}/reminders")
+async def list_reminders(request):
+    reminders = await ReminderManager.fetch_reminders_by_user(request.params["user_id"])
+    return json_response(
+        request, {"reminders": [row_to_dict(REMINDER_FIELDS, reminder) for reminder in reminders]}, etag=True)
+
+
+@route("GET", "/tasks/{task_id}/reminders")
+async def list_task_reminders(request):
+    reminders = await ReminderManager.fetch_reminders_by_task(request.params["task_id"])
+    return json_response(
+        request, {"reminders": [row_to_dict(REMINDER_FIELDS, reminder) for reminder in reminders]}, etag=True)
+
+
+@route("POST", "/tasks/{task_id}/reminders")
+async def create_reminder(request):
+    task_id = request.params["task_id"]
+    data = _require_object(request.json())
+    if not data.get("remind_at"):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "remind_at is required")
+    remind_at = _remind_at(data)
+    if await TaskManager.get_by_id(task_id) is None:
+        raise ApiError(HTTPStatus.NOT_FOUND, "task not found")
+    reminder_id = await ReminderManager.create_reminder(task_id, remind_at)
+    reminder = await ReminderManager.fetch_reminder(reminder_id)
+    return json_response(request, row_to_dict(REMINDER_FIELDS, reminder), HTTPStatus.CREATED)
+
+
+@route("PATCH", "/reminders/{reminder_id}")
+async def update_reminder(request):
+    reminder_id = request.params["reminder_id"]
+    data = _require_object(request.json())
+    if await ReminderManager.fetch_reminder(reminder_id) is None:
+        raise ApiError(HTTPStatus.NOT_FOUND, "reminder not found")
+    if data.get("remind_at"):
+        await ReminderManager.modify_reminder(reminder_id, _remind_at(data))
+    if data.get("is_sent"):
+        await ReminderManager.done_reminder(reminder_id)
+    reminder = await ReminderManager.fetch_reminder(reminder_id)
+    return json_response(request, row_to_dict(REMINDER_FIELDS, reminder))
+
+
+@route("DELETE", "/reminders/{reminder_id}")
+async def delete_reminder(request):
+    reminder_id = request.params["reminder_id"]
+    if await ReminderManager.fetch_reminder(reminder_id) is None:
+        raise ApiError(HTTPStatus.NOT_FOUND, "reminder not found")
+    await ReminderManager.remove_reminder(reminder_id)
+    return Response(HTTPStatus.NO_CONTENT)
+
+
+# === HTTP ===
+
+async def _readline(reader):
+    try:
+        line = await reader.readline()
+    except ValueError:
+        # StreamReaderのバッファ上限を超える行
+        raise ApiError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "line too long")
+    if len(line) > MAX_LINE_BYTES:
+        raise ApiError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "line too long")
+    return line
+
+
+async def read_request(reader):
+    """
+    HTTP/1.1のリクエストを1件読み込む
+
+    Returns:
+        Request or None: リクエスト（接続が閉じられた場合はNone）
+    """
+    line = await _readline(reader)
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").rstrip("\r\n").split(" ")
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "malformed request line")
+    headers = {"http-version": version}
+    for _ in range(MAX_HEADER_LINES):
+        line = (await _readline(reader)).decode("latin-1").rstrip("\r\n")
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise ApiError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "too many headers")
+
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise ApiError(HTTPStatus.NOT_IMPLEMENTED, "chunked request bodies are not supported")
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "invalid Content-Length")
+    if length < 0:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "invalid Content-Length")
+    if length > API_MAX_BODY_BYTES:
+        raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return Request(method.upper(), target, headers, body)
+
+
+def _keep_alive(request):
+    connection = request.headers.get("connection", "").lower()
+    if request.headers.get("http-version") == "HTTP/1.0":
+        return connection == "keep-alive"
+    return connection != "close"
+
+
+async def write_response(writer, response, keep_alive, head=False):
+    """レスポンスを書き込む（HEADの場合はボディを送らない）"""
+    headers = dict(response.headers)
+    headers["Content-Length"] = str(len(response.body))
+    headers["Connection"] = "keep-alive" if keep_alive else "close"
+    lines = [f"HTTP/1.1 {response.status.value} {response.status.phrase}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+    if response.body and not head:
+        writer.write(response.body)
+    await writer.drain()
+
+
+async def handle_connection(reader, writer):
+    """
+    1つの接続でリクエストを順番に処理する（keep-aliveの間は同じ接続を使い続ける）
+    """
+    try:
+        while True:
+            try:
+                request = await asyncio.wait_for(read_request(reader), API_KEEP_ALIVE_TIMEOUT)
+            except ApiError as e:
+                body = json.dumps({"error": e.message}).encode("utf-8")
+                await write_response(writer, Response(e.status, body, {"Content-Type": "application/json"}), False)
+                break
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                break
+            if request is None:
+                break
+            head = request.method == "HEAD"
+            if head:
+                request.method = "GET"
+            response = await dispatch(request)
+            keep_alive = _keep_alive(request)
+            await write_response(writer, response, keep_alive, head)
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def start_server(host, port):
+    """
+    APIサーバーを起動する
+
+    Args:
+        host (str): 待ち受けるアドレス
+        port (int): 待ち受けるポート（0の場合は空いているポート）
+
+    Returns:
+        asyncio.Server: 起動したサーバー
+    """
+    return await asyncio.start_server(handle_connection, host, port, limit=MAX_LINE_BYTES * 2)
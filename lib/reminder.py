@@ -6,22 +6,209 @@ from utils.db import (
     update_reminder,
     get_reminders_by_task,
     done_reminder,
-    get_reminder_by_id
+    get_reminder_by_id,
+    get_pending_reminders
 )
 from datetime import datetime, timedelta
+from functools import partial
 import asyncio
-from plyer import notification
-from lib.tasks import TaskManager
+import heapq
 import threading
-import json
-import aiofiles
+import time
+from config import REMINDER_RELOAD_INTERVAL
+from lib.tasks import TaskManager
+from lib.session import get_current_user_id, session_store
 
 taskmanager: TaskManager = TaskManager()
 
+class ReminderScheduler:
+    """
+    未送信のリマインダーをリマインド日時順のヒープで保持し、
+    次のリマインド日時までだけ眠って通知するスケジューラ
+
+    ReminderManagerでリマインダーが変更されるとschedule/unscheduleで
+    ヒープを更新し、待機中のループを起こして待ち時間を計算し直す。
+    他のプロセスが書き込んだリマインダーは REMINDER_RELOAD_INTERVAL 秒ごとにデータベースから読み直す。
+    """
+
+    # 時計の変更などに備えて、これより長くは連続で眠らない（秒）
+    MAX_SLEEP = 3600
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._heap = []  # (remind_at, reminder_id)
+        self._entries = {}  # reminder_id -> (remind_at, task_id)
+        self._user_id = None
+        self._loop = None
+        self._wakeup = None
+
+    @property
+    def is_running(self):
+        """スケジューラのループが動いているか（APIサーバーなどループを動かさないプロセスではFalse）"""
+        return self._loop is not None and self._loop.is_running()
+
+    def schedule(self, reminder_id, task_id, remind_at, user_id=None):
+        """
+        リマインダーを登録する（登録済みなら日時を置き換える）
+
+        ループが動いていない場合や、通知の対象ユーザー以外のリマインダーは登録しない
+        （ループが起動・ユーザーが切り替わるときにデータベースから読み込み直すため）。
+
+        Args:
+            reminder_id (int): リマインダーID
+            task_id (int): 対象のタスクID
+            remind_at (str or datetime): リマインド日時
+            user_id (int, optional): タスクの所有者のユーザーID
+        """
+        if isinstance(remind_at, str):
+            remind_at = datetime.fromisoformat(remind_at)
+        with self._lock:
+            if not self.is_running or (user_id is not None and user_id != self._user_id):
+                return
+            self._entries[reminder_id] = (remind_at, task_id)
+            # 古い日時のヒープ要素は取り出すときに_entriesと照合して捨てる
+            heapq.heappush(self._heap, (remind_at, reminder_id))
+        self.wake()
+
+    def unschedule(self, reminder_id):
+        """
+        リマインダーの登録を取り消す
+
+        Args:
+            reminder_id (int): リマインダーID
+        """
+        with self._lock:
+            self._entries.pop(reminder_id, None)
+        self.wake()
+
+    def wake(self):
+        """待機中のループを起こし、ログインユーザーと次の待ち時間を確認し直させる"""
+        if self._loop is None or self._loop.is_closed():
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            # ループが既に停止している
+            pass
+
+    async def _reload(self, user_id):
+        reminders = await get_pending_reminders(user_id) if user_id else []
+        with self._lock:
+            self._user_id = user_id
+            self._entries = {}
+            for reminder in reminders:
+                # reminder: (id, task_id, remind_at, is_sent)
+                try:
+                    remind_at = parse_remind_at(reminder[2])
+                except ValueError as e:
+                    # 不正な日時のリマインダーだけを飛ばし、他のリマインダーは通知する
+                    print(f"Skipping reminder {reminder[0]}: {e}")
+                    continue
+                self._entries[reminder[0]] = (remind_at, reminder[1])
+            self._heap = [(remind_at, reminder_id) for reminder_id, (remind_at, _) in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_due(self, now):
+        """
+        リマインド日時を過ぎたリマインダーを取り出し、次のリマインドまでの秒数と一緒に返す
+        """
+        due = []
+        with self._lock:
+            while self._heap:
+                remind_at, reminder_id = self._heap[0]
+                entry = self._entries.get(reminder_id)
+                if entry is None or entry[0] != remind_at:
+                    # 取り消し・変更済みの古い要素
+                    heapq.heappop(self._heap)
+                    continue
+                if remind_at > now:
+                    return due, min((remind_at - now).total_seconds(), self.MAX_SLEEP)
+                heapq.heappop(self._heap)
+                del self._entries[reminder_id]
+                due.append((entry[1], reminder_id))
+        return due, self.MAX_SLEEP
+
+    async def run(self):
+        """
+        スケジューラのループ（アプリ起動中ずっと動かす）
+        """
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        try:
+            await self._run()
+        finally:
+            with self._lock:
+                self._loop = None
+                self._user_id = None
+                self._entries = {}
+                self._heap = []
+
+    async def _run(self):
+        next_reload = time.monotonic() + REMINDER_RELOAD_INTERVAL
+        while True:
+            # 確認中に呼ばれたwakeを取りこぼさないよう、先にクリアしておく
+            self._wakeup.clear()
+            try:
+                user_id = get_current_user_id()
+                if user_id != self._user_id or time.monotonic() >= next_reload:
+                    await self._reload(user_id)
+                    next_reload = time.monotonic() + REMINDER_RELOAD_INTERVAL
+                due, delay = self._pop_due(datetime.now())
+                for task_id, reminder_id in due:
+                    await send_reminder(task_id, reminder_id)
+                if due:
+                    continue
+                delay = max(0, min(delay, next_reload - time.monotonic()))
+            except Exception as e:
+                # 一時的なDBエラーなどでループを終わらせず、次の読み直しで再試行する
+                print(f"Error in reminder scheduler: {e}")
+                next_reload = time.monotonic() + REMINDER_RELOAD_INTERVAL
+                delay = REMINDER_RELOAD_INTERVAL
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+
+scheduler = ReminderScheduler()
+# ログイン・ログアウトでリマインダーの対象ユーザーを切り替える
+session_store.subscribe(lambda event, session: scheduler.wake())
+
+
+def parse_remind_at(remind_at):
+    """
+    リマインド日時の文字列を検証してdatetimeにする
+
+    スケジューラはタイムゾーンなしのローカル時刻で比較するため、タイムゾーン付きの日時は受け付けない。
+
+    Raises:
+        ValueError: ISO 8601形式の日時でない場合、またはタイムゾーンが付いている場合
+    """
+    if not isinstance(remind_at, str):
+        raise ValueError("must be an ISO 8601 string")
+    parsed = datetime.fromisoformat(remind_at)
+    if parsed.tzinfo is not None:
+        raise ValueError("must be a local time without a UTC offset")
+    return parsed
+
+
+async def _schedule(reminder_id, task_id, remind_at):
+    """スケジューラが動いている場合だけ、タスクの所有者を確認してリマインダーを登録する"""
+    if not scheduler.is_running:
+        return
+    task = await taskmanager.get_by_id(task_id)
+    if task is not None:
+        scheduler.schedule(reminder_id, task_id, remind_at, user_id=task[1])
+
+
 class ReminderManager:
     @staticmethod
     async def create_reminder(task_id: int, remind_at: str):
-        return await reminder_create(task_id, remind_at)
+        # 不正な日時を保存しないよう、挿入する前に検証する
+        parse_remind_at(remind_at)
+        reminder_id = await reminder_create(task_id, remind_at)
+        await _schedule(reminder_id, task_id, remind_at)
+        return reminder_id
 
     @staticmethod
     async def fetch_upcoming_reminders():
@@ -33,7 +220,9 @@ class ReminderManager:
 
     @staticmethod
     async def remove_reminder(reminder_id: int):
-        return await delete_reminder(reminder_id)
+        result = await delete_reminder(reminder_id)
+        scheduler.unschedule(reminder_id)
+        return result
 
     @staticmethod
     async def fetch_reminders_by_user(user_id=None):
@@ -41,7 +230,12 @@ class ReminderManager:
 
     @staticmethod
     async def modify_reminder(reminder_id: int, new_remind_at: str):
-        return await update_reminder(reminder_id, new_remind_at)
+        parse_remind_at(new_remind_at)
+        result = await update_reminder(reminder_id, new_remind_at)
+        reminder = await get_reminder_by_id(reminder_id)
+        if reminder and reminder[3] == 0:
+            await _schedule(reminder_id, reminder[1], new_remind_at)
+        return result
 
     @staticmethod
     async def fetch_reminders_by_task(task_id: int):
@@ -49,7 +243,9 @@ class ReminderManager:
     
     @staticmethod
     async def done_reminder(reminder_id: int):
-        return await done_reminder(reminder_id)
+        result = await done_reminder(reminder_id)
+        scheduler.unschedule(reminder_id)
+        return result
     
     @staticmethod
     async def should_send_reminder(user_id=None):
@@ -86,6 +282,7 @@ class ReminderManager:
                 time_diff = old_deadline - remind_at
                 new_remind_at = new_deadline - time_diff
                 await update_reminder(reminder[0], new_remind_at.isoformat())
+                await _schedule(reminder[0], task_id, new_remind_at)
 
 async def send_notification(task_id: int, reminder_id: int):
     task = await taskmanager.get_by_id(task_id)
@@ -93,29 +290,29 @@ async def send_notification(task_id: int, reminder_id: int):
     reminder = await ReminderManager.fetch_reminder(reminder_id)
     reminder_time = reminder[2]
     time_diff: timedelta = datetime.fromisoformat(task[7]) - datetime.fromisoformat(reminder_time)
-    notification.notify(
+    # plyerは通知を出すときにだけ読み込む（起動時間を短くするため）
+    from plyer import notification
+    # 通知の表示はブロックするため、イベントループを止めないよう別スレッドで行う
+    await asyncio.get_running_loop().run_in_executor(None, partial(
+        notification.notify,
         title="リマインダー",
         message=f"{task_name}の締切まであと{int(time_diff.total_seconds() // 60)}分です。",
         timeout=10
-    )
+    ))
 
-def run_send_notification(task_id: int, reminder_id: int):
+async def send_reminder(task_id: int, reminder_id: int):
+    """
+    リマインダーを通知して送信済みにする（タスクやリマインダーが削除済みなら何もしない）
+    """
     try:
-        asyncio.run(send_notification(task_id, reminder_id))
-        asyncio.run(ReminderManager.done_reminder(reminder_id))
+        reminder = await ReminderManager.fetch_reminder(reminder_id)
+        if reminder is None or reminder[3] == 1 or await taskmanager.get_by_id(task_id) is None:
+            return
+        await send_notification(task_id, reminder_id)
+        await done_reminder(reminder_id)
+        print(f"Reminder {reminder_id} about task {task_id}")
     except Exception as e:
         print(f"Error sending notification: {e}")
 
 async def reminder_loop():
-    while True:
-        async with aiofiles.open('session.json', 'r') as f:
-            session_data = json.loads(await f.read())
-        user_id = session_data.get("user_id")
-        if not user_id:
-            await asyncio.sleep(60)
-            continue
-        should_send = await ReminderManager.should_send_reminder(user_id)
-        for reminder in should_send:
-            threading.Thread(target=run_send_notification, args=(reminder[0], reminder[1])).start()
-            print(f"Reminder for user {reminder[0]} about task {reminder[1]}")
-        await asyncio.sleep(60)  # 1分ごとにチェック
+    await scheduler.run()
@@ -1,8 +1,139 @@
 import json
 import os
+import threading
 
 SESSION_FILE = "session.json"
 
+
+class SessionStore:
+    """
+    セッション情報をメモリに保持するストア
+
+    ファイルを読むのは初回と、refreshでファイルの更新（mtime・サイズの変化）を
+    検知したときだけ。ログイン・ログアウトで状態が変わると購読者に通知する。
+    購読者は callback(event, session) の形で呼ばれ、eventは "login" または "logout"。
+    """
+
+    def __init__(self, path=SESSION_FILE):
+        self.path = path
+        self._lock = threading.RLock()
+        self._session = None
+        self._signature = None
+        self._subscribers = []
+
+    def _stat_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _read_file(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, FileNotFoundError):
+                # ファイルが破損している場合は空のセッションを返す
+                return get_empty_session()
+        return get_empty_session()
+
+    def get(self):
+        """
+        セッション情報を取得する（ファイルは読み込み済みならキャッシュを返す）
+
+        Returns:
+            dict: セッション情報の辞書のコピー
+        """
+        with self._lock:
+            if self._session is None:
+                self._signature = self._stat_signature()
+                self._session = self._read_file()
+            return dict(self._session)
+
+    def set(self, session_data):
+        """
+        セッション情報をファイルに保存し、キャッシュを更新する
+
+        Args:
+            session_data (dict): 保存するセッション情報
+        """
+        with self._lock:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(session_data, f, ensure_ascii=False, indent=2)
+            self._signature = self._stat_signature()
+            self._replace(dict(session_data))
+
+    def clear(self):
+        """
+        セッションファイルを削除し、キャッシュを空のセッションにする
+        """
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self._signature = None
+            self._replace(get_empty_session())
+
+    def refresh(self):
+        """
+        ファイルが外部で更新されていれば読み直す
+
+        Returns:
+            bool: 読み直した場合True
+        """
+        with self._lock:
+            signature = self._stat_signature()
+            if self._session is not None and signature == self._signature:
+                return False
+            self._signature = signature
+            self._replace(self._read_file())
+            return True
+
+    def subscribe(self, callback):
+        """
+        ログイン・ログアウトの通知を受け取る関数を登録する
+
+        Args:
+            callback (callable): callback(event, session) の形で呼ばれる関数
+
+        Returns:
+            callable: 登録を解除する関数
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+        return lambda: self.unsubscribe(callback)
+
+    def unsubscribe(self, callback):
+        """
+        subscribeで登録した関数を解除する
+
+        Args:
+            callback (callable): 解除する関数
+        """
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def _replace(self, session):
+        old = self._session
+        self._session = session
+        if old is None:
+            # 初回読み込みは変化として扱わない
+            return
+        old_user = old.get("user_id") if old.get("is_logged_in", False) else None
+        new_user = session.get("user_id") if session.get("is_logged_in", False) else None
+        if old_user == new_user:
+            return
+        event = "login" if new_user is not None else "logout"
+        for callback in list(self._subscribers):
+            try:
+                callback(event, dict(session))
+            except Exception as e:
+                print(f"Error in session subscriber: {e}")
+
+
+session_store = SessionStore()
+
 def save_session(user_data):
     """
     ユーザーセッション情報をファイルに保存する
@@ -28,24 +159,16 @@ def save_session(user_data):
             "is_logged_in": False
         }
     
-    with open(SESSION_FILE, "w", encoding="utf-8") as f:
-        json.dump(session_data, f, ensure_ascii=False, indent=2)
+    session_store.set(session_data)
 
 def load_session():
     """
-    セッション情報をファイルから読み込む
+    セッション情報を読み込む（ファイルはキャッシュ済みなら読み直さない）
     
     Returns:
         dict: セッション情報の辞書、ファイルが存在しない場合は空のセッション情報
     """
-    if os.path.exists(SESSION_FILE):
-        try:
-            with open(SESSION_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            # ファイルが破損している場合は空のセッションを返す
-            return get_empty_session()
-    return get_empty_session()
+    return session_store.get()
 
 def get_empty_session():
     """
@@ -115,5 +238,4 @@ def clear_session():
     Returns:
         None
     """
-    if os.path.exists(SESSION_FILE):
-        os.remove(SESSION_FILE)
+    session_store.clear()
@@ -4,19 +4,56 @@ from utils.db import (
     get_tag_by_id,
     delete_tag
 )
+from lib.tasks import task_cache
+
+
+class TagCache:
+    """
+    ユーザーごとのタグ一覧をメモリに保持するキャッシュ
+
+    TagManagerで作成・削除するたびに破棄し、versionを1つ進める。
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._tags = {}  # ユーザーID -> タグ情報のタプルのリスト
+
+    def get(self, user_id):
+        """保持しているタグ一覧（未読み込みはNone）"""
+        return self._tags.get(user_id)
+
+    def put(self, user_id, tags):
+        self._tags[user_id] = tags
+        self.version += 1
+
+    def invalidate(self):
+        """保持しているタグ一覧を破棄する"""
+        self._tags = {}
+        self.version += 1
+
+
+tag_cache = TagCache()
 
 class TagManager:
     """タグ管理のためのライブラリクラス"""
     
     @staticmethod
     async def create(user_id, name):
-        """新しいタグを作成する"""
-        await create_tag(user_id, name)
+        """新しいタグを作成する（作成したタグのIDを返す）"""
+        tag_id = await create_tag(user_id, name)
+        tag_cache.invalidate()
+        return tag_id
     
     @staticmethod
-    async def get_by_user(user_id=None):
-        """ユーザーのタグ一覧を取得する"""
-        return await get_tags_by_user(user_id)
+    async def get_by_user(user_id=None, use_cache=True):
+        """ユーザーのタグ一覧を取得する（ユーザー指定時はキャッシュを利用する）"""
+        if user_id is None or not use_cache:
+            return await get_tags_by_user(user_id)
+        tags = tag_cache.get(user_id)
+        if tags is None:
+            tags = await get_tags_by_user(user_id)
+            tag_cache.put(user_id, tags)
+        return list(tags)
     
     @staticmethod
     async def get_by_id(tag_id):
@@ -26,4 +63,17 @@ class TagManager:
     @staticmethod
     async def delete(tag_id):
         """タグを削除する"""
-        await delete_tag(tag_id)
\ No newline at end of file
+        await delete_tag(tag_id)
+        tag_cache.invalidate()
+        # タグが外れたタスクのタグ名・タグ色も取り直す
+        task_cache.invalidate()
+
+    @staticmethod
+    def cache_version(user_id):
+        """タグキャッシュのバージョン（変更があるたびに増える。キャッシュしていない場合はNone）"""
+        return tag_cache.version if tag_cache.get(user_id) is not None else None
+
+    @staticmethod
+    def invalidate_cache():
+        """タグキャッシュを破棄し、次回の取得でSQLから読み直す"""
+        tag_cache.invalidate()
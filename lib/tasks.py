@@ -1,65 +1,353 @@
+from config import TASK_WRITE_BEHIND, WRITE_BEHIND_FLUSH_MS, TASK_CACHE_MAX_TASKS
+from lib.write_behind import WriteBehindQueue
 from utils.db import (
     create_task,
     get_tasks_by_user,
+    get_tasks_with_tags_by_user,
+    get_tasks_with_tags_by_ids,
     get_task_by_id,
+    get_task_with_tag_by_id,
     update_task,
     delete_task,
+    create_tasks_many,
+    update_tasks_many,
+    delete_tasks_many,
+    set_tasks_done_many,
     mark_task_done,
     mark_task_undone,
     search_tasks,
+    query_tasks,
     get_tasks_sorted,
     get_tasks_by_deadline,
     share_task,
     get_shared_tasks,
+    get_shared_tasks_with_tags,
     get_shared_tasks_by_user,
     unshare_task,
     get_shared_task_by_id,
     get_shared_users_by_task
 )
 
+# SQLiteのCOLLATE NOCASEと同じく、ASCII文字だけ大文字小文字を区別しない
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+# query_tasksのソートキー（utils/db.pyのTASK_SORT_EXPRESSIONS）と同じ並びにするための関数
+# 戻り値は (比較に使う値, カーソルに入れる値)
+_SORT_VALUES = {
+    "created_at": lambda task: (task[9] or "", task[9]),
+    "deadline": lambda task: (task[7] or "9999-12-31 23:59:59",) * 2,
+    "priority": lambda task: (task[8] or 0,) * 2,
+    "name": lambda task: (task[4].translate(_ASCII_LOWER), task[4]),
+}
+
+# get_tasks_with_tags_by_ids に一度に渡すIDの数
+_REFETCH_CHUNK = 500
+
+
+class TaskCache:
+    """
+    ログイン中ユーザーのタスク（タグ名・タグ色付き）をメモリに保持するキャッシュ
+
+    タスクIDをキーに保持し、タグIDと完了状態の副インデックスを持つ。
+    TaskManagerの更新系メソッドが変更のあったタスクだけを差し替え（patch）、
+    そのたびにversionを1つ進める。UIはversionが変わっていなければ再描画を省ける。
+    タスク数が TASK_CACHE_MAX_TASKS を超えるユーザーはキャッシュせず、SQLで取得する。
+    """
+
+    def __init__(self, max_tasks=TASK_CACHE_MAX_TASKS):
+        self.max_tasks = max_tasks
+        self.user_id = None
+        self.version = 0
+        self._tasks = None  # タスクID -> タスク行（未読み込みはNone）
+        self._by_tag = {}  # タグID -> タスクIDの集合
+        self._by_status = {0: set(), 1: set()}  # is_done -> タスクIDの集合
+
+    def is_loaded(self, user_id):
+        """指定ユーザーのタスクを保持しているかどうか"""
+        return self._tasks is not None and self.user_id == user_id
+
+    async def ensure_loaded(self, user_id):
+        """
+        指定ユーザーのタスクを読み込む（読み込み済みなら何もしない）
+
+        Returns:
+            bool: キャッシュを利用できる場合True（タスク数が上限を超える場合はFalse）
+        """
+        if self.is_loaded(user_id):
+            return True
+        rows = await get_tasks_with_tags_by_user(user_id, limit=self.max_tasks + 1)
+        if len(rows) > self.max_tasks:
+            self.invalidate()
+            return False
+        self.user_id = user_id
+        self._tasks = {}
+        self._by_tag = {}
+        self._by_status = {0: set(), 1: set()}
+        for row in rows:
+            self._index(row)
+        self.version += 1
+        return True
+
+    def invalidate(self):
+        """保持しているタスクを破棄する（次回の読み込みでSQLから取り直す）"""
+        self._tasks = None
+        self.version += 1
+
+    def _index(self, row):
+        self._tasks[row[0]] = row
+        self._by_tag.setdefault(row[6], set()).add(row[0])
+        self._by_status.setdefault(row[3], set()).add(row[0])
+
+    def _unindex(self, task_id):
+        row = self._tasks.pop(task_id, None)
+        if row is not None:
+            self._by_tag.get(row[6], set()).discard(task_id)
+            self._by_status.get(row[3], set()).discard(task_id)
+        return row
+
+    def remove(self, task_ids):
+        """削除されたタスクを取り除く"""
+        if self._tasks is None:
+            return
+        for task_id in task_ids:
+            self._unindex(task_id)
+        self.version += 1
+
+    async def refetch(self, task_ids):
+        """
+        変更のあったタスクだけをSQLから取り直して差し替える
+        """
+        if self._tasks is None:
+            return
+        task_ids = list(task_ids)
+        rows = []
+        for i in range(0, len(task_ids), _REFETCH_CHUNK):
+            rows.extend(await get_tasks_with_tags_by_ids(task_ids[i:i + _REFETCH_CHUNK]))
+        if self._tasks is None:
+            return  # 取り直している間に破棄された
+        for task_id in task_ids:
+            self._unindex(task_id)
+        for row in rows:
+            # 他のユーザーのタスク（共有されたタスク）は保持しない
+            if row[1] == self.user_id:
+                self._index(row)
+        self.version += 1
+
+    def select(self, tag_id=None, is_done=None, priority=None, deadline_from=None, deadline_to=None,
+               sort_by="created_at", order="ASC", limit=None, cursor=None):
+        """
+        保持しているタスクから条件に合うものを取得する（SQLは発行しない）
+
+        引数と戻り値は query_tasks と同じで、カーソルも互換。
+
+        Returns:
+            tuple: (タスク行のリスト, 次ページ用カーソル または None)
+        """
+        if tag_id is not None:
+            ids = set(self._by_tag.get(tag_id, ()))
+        else:
+            ids = None
+        if is_done is not None:
+            done_ids = self._by_status.get(1 if is_done else 0, set())
+            ids = done_ids if ids is None else ids & done_ids
+        rows = self._tasks.values() if ids is None else (self._tasks[task_id] for task_id in ids)
+        if priority is not None:
+            rows = [row for row in rows if row[8] == priority]
+        if deadline_from is not None:
+            rows = [row for row in rows if row[7] is not None and row[7] >= deadline_from]
+        if deadline_to is not None:
+            rows = [row for row in rows if row[7] is not None and row[7] <= deadline_to]
+
+        sort_value = _SORT_VALUES.get(sort_by, _SORT_VALUES["created_at"])
+        descending = str(order).upper() == "DESC"
+        keyed = [((sort_value(row)[0], row[0]), row) for row in rows]
+        if cursor is not None:
+            after = (sort_value_of_cursor(sort_by, cursor[0]), cursor[1])
+            keyed = [item for item in keyed if (item[0] < after if descending else item[0] > after)]
+        keyed.sort(key=lambda item: item[0], reverse=descending)
+
+        next_cursor = None
+        if limit is not None and len(keyed) > limit:
+            keyed = keyed[:limit]
+            last = keyed[-1][1]
+            next_cursor = [sort_value(last)[1], last[0]]
+        return [row for _, row in keyed], next_cursor
+
+
+def sort_value_of_cursor(sort_by, value):
+    """カーソルに入っているソートキーの値を、キャッシュ内の比較用の値に変換する"""
+    if sort_by == "name":
+        return (value or "").translate(_ASCII_LOWER)
+    if sort_by == "priority":
+        return value or 0
+    return value or ""
+
+
+task_cache = TaskCache()
+
+
+async def _refetch_written(task_ids):
+    """write_behindが書き込んだタスクをまとめてキャッシュに取り直す（失敗した場合はキャッシュを破棄する）"""
+    try:
+        await task_cache.refetch(task_ids)
+    except Exception as e:
+        print(f"Error refreshing task cache: {e}")
+        task_cache.invalidate()
+
+
+# UIからの更新をまとめて書き込むキュー
+write_behind = WriteBehindQueue(WRITE_BEHIND_FLUSH_MS / 1000, on_flush=_refetch_written)
+
+
+def task_matches_keyword(task, keyword):
+    """
+    タスクがキーワードの検索条件（空白区切りの全語をタスク名か詳細に含む）を満たすか判定する
+
+    ASCII文字の大文字小文字だけを区別しない。ASCIIだけのキーワードではquery_tasksのキーワード検索
+    （FTS5 trigram・LIKE）と同じ結果になるため、その場合に前回の検索結果を絞り込むときに使う。
+
+    Args:
+        task (tuple): タスク行
+        keyword (str): 検索キーワード
+
+    Returns:
+        bool: 条件を満たす場合True
+    """
+    name = (task[4] or "").translate(_ASCII_LOWER)
+    description = (task[5] or "").translate(_ASCII_LOWER)
+    for term in keyword.split():
+        term = term.rstrip("*").translate(_ASCII_LOWER)
+        if term and term not in name and term not in description:
+            return False
+    return True
+
 class TaskManager:
     """タスク管理のためのライブラリクラス"""
     
     @staticmethod
     async def create(user_id, name, description=None, tag=None, deadline=None, priority=0):
-        """新しいタスクを作成する"""
-        await create_task(user_id, name, description, tag, deadline, priority)
+        """新しいタスクを作成する（作成したタスクのIDを返す）"""
+        task_id = await create_task(user_id, name, description, tag, deadline, priority)
+        task_cache.invalidate()
+        return task_id
     
     @staticmethod
     async def get_by_user(user_id=None):
         """ユーザーのタスク一覧を取得する"""
         return await get_tasks_by_user(user_id)
     
+    @staticmethod
+    async def get_by_user_with_tags(user_id=None):
+        """ユーザーのタスク一覧をタグ名・タグ色付きで取得する"""
+        return await get_tasks_with_tags_by_user(user_id)
+    
     @staticmethod
     async def get_by_id(task_id):
         """IDでタスクを取得する"""
         return await get_task_by_id(task_id)
     
+    @staticmethod
+    async def get_by_id_with_tag(task_id):
+        """IDでタスクをタグ名・タグ色付きで取得する"""
+        return await get_task_with_tag_by_id(task_id)
+    
     @staticmethod
     async def update(task_id, **kwargs):
         """タスク情報を更新する"""
         await update_task(task_id, **kwargs)
+        await task_cache.refetch([task_id])
+    
+    @staticmethod
+    async def update_deferred(task_id, **kwargs):
+        """タスク情報の更新をキューに積み、他の更新とまとめて書き込まれるまで待つ"""
+        if TASK_WRITE_BEHIND:
+            # キャッシュはwrite_behindが書き込んだバッチごとに取り直す
+            await write_behind.update(task_id, **kwargs)
+        else:
+            await update_task(task_id, **kwargs)
+            await task_cache.refetch([task_id])
+    
+    @staticmethod
+    async def flush():
+        """キューに積まれた更新をすぐに書き込む"""
+        return await write_behind.flush()
     
     @staticmethod
     async def delete(task_id):
         """タスクを削除する"""
         await delete_task(task_id)
+        task_cache.remove([task_id])
+    
+    @staticmethod
+    async def create_many(user_id, tasks):
+        """複数のタスクを1つのトランザクションで作成する（tasks: 各タスクの辞書のリスト）"""
+        count = await create_tasks_many(user_id, tasks)
+        task_cache.invalidate()
+        return count
+    
+    @staticmethod
+    async def update_many(updates):
+        """複数のタスクを1つのトランザクションで更新する（updates: (タスクID, フィールドの辞書) のリスト）"""
+        count = await update_tasks_many(updates)
+        await task_cache.refetch([task_id for task_id, _ in updates])
+        return count
+    
+    @staticmethod
+    async def delete_many(task_ids):
+        """複数のタスクを共有・リマインダーごと1つのトランザクションで削除する"""
+        count = await delete_tasks_many(task_ids)
+        task_cache.remove(task_ids)
+        return count
+    
+    @staticmethod
+    async def set_done_many(task_ids, is_done=True):
+        """複数のタスクの完了状態を1つのトランザクションで変更する"""
+        count = await set_tasks_done_many(task_ids, is_done)
+        await task_cache.refetch(task_ids)
+        return count
     
     @staticmethod
     async def mark_complete(task_id):
         """タスクを完了にする"""
         await mark_task_done(task_id)
+        await task_cache.refetch([task_id])
     
     @staticmethod
     async def mark_incomplete(task_id):
         """タスクを未完了にする"""
         await mark_task_undone(task_id)
+        await task_cache.refetch([task_id])
     
     @staticmethod
     async def search(user_id=None, **filters):
         """タスクを検索する"""
         return await search_tasks(user_id, **filters)
     
+    @staticmethod
+    async def query(user_id=None, use_cache=True, **options):
+        """
+        条件・並び順・ページを指定してタスクを取得する（(タスク一覧, 次ページ用カーソル)を返す）
+
+        キーワード検索・共有タスク以外は、キャッシュを利用できればSQLを発行せずに返す。
+        他のプロセスの書き込みを反映する必要がある場合は use_cache=False でSQLから取得する。
+        """
+        if (use_cache and user_id is not None and not options.get("keyword") and options.get("shared_with") is None
+                and await task_cache.ensure_loaded(user_id)):
+            options.pop("keyword", None)
+            options.pop("shared_with", None)
+            return task_cache.select(**options)
+        return await query_tasks(user_id, **options)
+    
+    @staticmethod
+    def cache_version(user_id):
+        """タスクキャッシュのバージョン（変更があるたびに増える。キャッシュしていない場合はNone）"""
+        return task_cache.version if task_cache.is_loaded(user_id) else None
+    
+    @staticmethod
+    def invalidate_cache():
+        """タスクキャッシュを破棄し、次回の取得でSQLから読み直す"""
+        task_cache.invalidate()
+    
     @staticmethod
     async def get_sorted(user_id=None, sort_by="created_at", order="ASC"):
         """ソート済みタスク一覧を取得する"""
@@ -80,6 +368,11 @@ class TaskManager:
         """自分に共有されたタスク一覧を取得する"""
         return await get_shared_tasks(user_id)
     
+    @staticmethod
+    async def get_shared_with_me_with_tags(user_id):
+        """自分に共有されたタスク一覧をタグ名・タグ色付きで取得する"""
+        return await get_shared_tasks_with_tags(user_id)
+    
     @staticmethod
     async def get_shared_by_me(user_id):
         """自分が共有したタスク一覧を取得する"""
@@ -0,0 +1,84 @@
+import asyncio
+from utils.db import update_tasks_many
+
+
+class WriteBehindQueue:
+    """
+    タスクの更新をタスクIDごとにまとめ、短い間隔で1つのトランザクションに書き込むキュー
+
+    同じタスクへの続けざまの更新（チェックボックスの連打や、編集直後の完了切り替えなど）は
+    フィールド単位でマージされ、後から指定した値が優先される。
+    最初の更新から flush_interval 秒後にまとめて update_tasks_many で書き込む。
+    """
+
+    def __init__(self, flush_interval, on_flush=None):
+        """
+        Args:
+            flush_interval (float): 最初の更新から書き込むまでの秒数
+            on_flush (callable, optional): 書き込みのたびに書き込んだタスクIDのリストを渡して待つコルーチン関数
+                （待っている呼び出し元には、これが終わってから完了を通知する）
+        """
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self._pending = {}  # task_id -> 更新するフィールドの辞書
+        self._waiters = []  # 次の書き込みを待っているFuture
+        self._flush_handle = None
+
+    @property
+    def pending_count(self):
+        """書き込み待ちのタスク数"""
+        return len(self._pending)
+
+    async def update(self, task_id, **fields):
+        """
+        タスクの更新をキューに積み、書き込みが完了するまで待つ
+
+        Args:
+            task_id (int): 更新するタスクのID
+            **fields: update_taskと同じ更新フィールド
+
+        Raises:
+            Exception: 書き込みに失敗した場合はその例外
+        """
+        loop = asyncio.get_running_loop()
+        self._pending.setdefault(task_id, {}).update(fields)
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.flush_interval, lambda: loop.create_task(self._scheduled_flush()))
+        await waiter
+
+    async def _scheduled_flush(self):
+        try:
+            await self.flush()
+        except Exception:
+            # 例外は待っている呼び出し元に渡し済み
+            pass
+
+    async def flush(self):
+        """
+        キューに積まれた更新をすぐに書き込む
+
+        Returns:
+            int: 書き込んだタスクの数
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        waiters, self._waiters = self._waiters, []
+        if not pending:
+            return 0
+        try:
+            count = await update_tasks_many(list(pending.items()))
+            if self.on_flush is not None:
+                await self.on_flush(list(pending))
+        except Exception as e:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(e)
+            raise
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        return count
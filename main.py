@@ -1,15 +1,37 @@
+import argparse
 import os
 # macOSのIMKCエラーメッセージを抑制
 os.environ['OBJC_DISABLE_INITIALIZE_FORK_SAFETY'] = 'YES'
 
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="TODOアプリ")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="モジュールごとのimport時間と最初の描画までの時間を表示する")
+    return parser.parse_args(argv)
+
+
+# 起動時間の計測は、以降のimportより前に開始する（省略形の指定も受け付けるよう、解釈した引数で判断する）
+args = parse_args() if __name__ == "__main__" else None
+if args is not None and args.profile_startup:
+    from utils.startup_profile import profiler
+    profiler.start()
+
+import importlib
 import customtkinter as tk
-from pages.login import LoginPage
-from pages.todo import TodoPage
-from pages.sign_up import SignUpPage
-from lib.session import is_logged_in
-import threading
-from lib.reminder import reminder_loop
-import asyncio
+from lib.session import is_logged_in, session_store
+from lib.tasks import TaskManager
+from utils.async_runner import AsyncRunner
+from utils.db_pool import close_pool, maintenance_loop
+from utils.db_init import ensure_schema
+from config import DB_PATH, ASYNC_POLL_INTERVAL_MS, SESSION_CHECK_INTERVAL_MS
+
+# ページ名 -> (モジュール, クラス名)。ページは初めて表示するときにimportして作成する
+PAGES = {
+    "login": ("pages.login", "LoginPage"),
+    "todo": ("pages.todo", "TodoPage"),
+    "signup": ("pages.sign_up", "SignUpPage"),
+}
 
 
 class App(tk.CTk):
@@ -20,17 +42,15 @@ class App(tk.CTk):
         self.minsize(600, 400)  # 最小サイズを設定
         self.maxsize(1600, 1200)  # 最大サイズを設定
 
+        # DB処理を実行するイベントループ（アプリ全体で1つ）
+        self.runner = AsyncRunner().start()
+
         # ページを格納するコンテナフレーム
         self.container = tk.CTkFrame(self)
         self.container.pack(fill="both", expand=True)
 
+        # 作成済みのページ（show_frameで初めて表示するときに作成する）
         self.frames = {}
-        # ページのインスタンスを作成
-        for F in [LoginPage, TodoPage, SignUpPage]:
-            page_name = F.__name__.replace("Page", "").lower()
-            frame = F(parent=self.container, controller=self)
-            self.frames[page_name] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
 
         # コンテナのグリッド設定
         self.container.grid_rowconfigure(0, weight=1)
@@ -42,22 +62,107 @@ class App(tk.CTk):
         else:
             self.show_frame("login")
 
+        self.after(SESSION_CHECK_INTERVAL_MS, self.check_session)
+
+    def check_session(self):
+        """session.jsonの外部での変更を検知する（変更があれば購読者に通知される）"""
+        session_store.refresh()
+        self.after(SESSION_CHECK_INTERVAL_MS, self.check_session)
+
+    def get_frame(self, page_name):
+        """
+        ページを取得する（未作成ならモジュールをimportして作成する）
+
+        Args:
+            page_name (str): PAGES のページ名
+
+        Returns:
+            tk.CTkFrame: ページ
+        """
+        frame = self.frames.get(page_name)
+        if frame is None:
+            module_name, class_name = PAGES[page_name]
+            page_class = getattr(importlib.import_module(module_name), class_name)
+            frame = page_class(parent=self.container, controller=self)
+            frame.grid(row=0, column=0, sticky="nsew")
+            self.frames[page_name] = frame
+        return frame
+
     def show_frame(self, page_name):
         """指定したページを最前面に表示する"""
-        frame = self.frames[page_name]
+        frame = self.get_frame(page_name)
         frame.tkraise()
         # フォーカスをリセットして、前のページのフォーカス状態を無効化
         frame.focus_set()
         # 少し待ってから再度フォーカスをリセット（確実にするため）
         self.after(1, lambda: frame.focus_set())
 
+    def run_async(self, coro, callback=None, error_callback=None):
+        """
+        コルーチンをバックグラウンドのイベントループで実行し、結果をTkスレッドで受け取る
+
+        Args:
+            coro (coroutine): 実行するコルーチン
+            callback (callable, optional): 成功時に戻り値を受け取る関数
+            error_callback (callable, optional): 失敗時に例外を受け取る関数
+
+        Returns:
+            concurrent.futures.Future: 実行結果のFuture
+        """
+        future = self.runner.submit(coro)
+
+        def deliver():
+            if not future.done():
+                self.after(ASYNC_POLL_INTERVAL_MS, deliver)
+                return
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is not None:
+                if error_callback:
+                    error_callback(error)
+                else:
+                    print(f"非同期処理エラー: {error}")
+            elif callback:
+                callback(future.result())
+
+        self.after(ASYNC_POLL_INTERVAL_MS, deliver)
+        return future
+
+    def shutdown(self):
+        """書き込み待ちの更新を書き込み、イベントループ上の処理を止め、プールしている接続を閉じる"""
+        try:
+            try:
+                self.runner.run(TaskManager.flush(), timeout=5)
+            finally:
+                self.runner.run(close_pool(), timeout=5)
+        finally:
+            self.runner.stop()
+
 if __name__ == "__main__":
+    if args.profile_startup:
+        profiler.mark("imports done")
+
+    # スキーマが最新なら PRAGMA user_version を読むだけで返る
+    ensure_schema(DB_PATH)
+    if args.profile_startup:
+        profiler.mark("schema ready")
+
     tk.set_appearance_mode("Dark")
     tk.set_default_color_theme("blue")
     app = App()
-
-    def run_reminder_loop():
-        asyncio.run(reminder_loop())
-
-    threading.Thread(target=run_reminder_loop, daemon=True).start()
+    if args.profile_startup:
+        profiler.mark("App created")
+        # ウィンドウが表示され、保留中の描画が終わった時点を最初の描画とする
+        app.wait_visibility()
+        app.update_idletasks()
+        profiler.mark("first paint")
+        profiler.stop()
+        profiler.report()
+    # リマインダー監視とDBの定期メンテナンスも同じイベントループで動かす
+    from lib.reminder import reminder_loop
+    app.runner.submit(reminder_loop())
+    app.runner.submit(maintenance_loop())
     app.mainloop()
+    # 終了時にプールしている接続を閉じる
+    app.shutdown()
@@ -0,0 +1,66 @@
+import os
+import customtkinter as tk
+
+# static/ フォルダの場所（カレントディレクトリに依存しないようにする）
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+
+# アイコンの標準サイズ
+DEFAULT_ICON_SIZE = (20, 20)
+
+_images = {}  # アイコン名 -> デコード済みのPIL画像
+_icons = {}  # (ライト用アイコン名, ダーク用アイコン名, サイズ) -> CTkImage
+
+
+def get_image(name):
+    """
+    static/ のPNG画像を読み込む（2回目以降はデコード済みの画像を返す）
+
+    Args:
+        name (str): 拡張子を除いたファイル名（例: "trash"）
+
+    Returns:
+        PIL.Image.Image: デコード済みの画像
+    """
+    image = _images.get(name)
+    if image is None:
+        from PIL import Image
+        with Image.open(os.path.join(STATIC_DIR, f"{name}.png")) as f:
+            image = f.copy()  # ファイルを閉じる前にデコードしておく
+        _images[name] = image
+    return image
+
+
+def get_icon(name, size=DEFAULT_ICON_SIZE, dark_name=None):
+    """
+    ボタンなどに使うCTkImageを取得する（同じ名前・サイズなら同じオブジェクトを共有する）
+
+    CTkImageはウィンドウのスケーリングとライト/ダークの切り替えに合わせて
+    縮小済みの画像を内部でキャッシュするため、ページ間で使い回せる。
+
+    Args:
+        name (str): ライトモードで使うアイコン名
+        size (tuple): 表示サイズ（幅, 高さ）
+        dark_name (str, optional): ダークモードで使うアイコン名。Noneの場合はnameと同じ画像
+
+    Returns:
+        customtkinter.CTkImage: アイコン
+    """
+    key = (name, dark_name or name, tuple(size))
+    icon = _icons.get(key)
+    if icon is None:
+        icon = tk.CTkImage(light_image=get_image(name), dark_image=get_image(dark_name or name), size=size)
+        _icons[key] = icon
+    return icon
+
+
+def preload(size=DEFAULT_ICON_SIZE):
+    """
+    static/ のすべてのPNG画像を読み込んでおく（初回表示時のファイル読み込みを避けたい場合に使う）
+
+    Args:
+        size (tuple): あらかじめ作成しておくCTkImageのサイズ
+    """
+    for filename in sorted(os.listdir(STATIC_DIR)):
+        name, ext = os.path.splitext(filename)
+        if ext.lower() == ".png":
+            get_icon(name, size)
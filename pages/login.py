@@ -1,7 +1,6 @@
 import customtkinter as tk
 from lib.login import login
 from lib.session import save_session
-import asyncio
 
 
 class PlaceholderCTkEntry(tk.CTkEntry):
@@ -92,8 +91,14 @@ class LoginPage(tk.CTkFrame):
             self.error_label.configure(text="メールアドレスとパスワードを入力してください。")
             return
 
-        result = asyncio.run(login(email, password))
+        self.controller.run_async(
+            login(email, password),
+            callback=self.on_login_result,
+            error_callback=lambda e: self.error_label.configure(text=f"エラー: {e}"),
+        )
 
+    def on_login_result(self, result):
+        """ログイン処理の結果をUIに反映する"""
         if result[0]:
             # ログイン成功後、Todoページに切り替える
             self.controller.show_frame("todo")
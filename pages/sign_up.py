@@ -1,5 +1,4 @@
 import customtkinter as tk
-import asyncio
 from lib.sign_up import create_user
 from lib.login import login
 from lib.session import save_session
@@ -120,12 +119,24 @@ class SignUpPage(tk.CTkFrame):
             return
 
         self.error_label.configure(text="登録中...")
-        result = asyncio.run(create_user(name, email, password))
 
-        if result[0]:
+        async def register():
+            result = await create_user(name, email, password)
+            if not result[0]:
+                return result, None
             # 登録成功後、自動的にログイン
-            self.error_label.configure(text="登録成功！ログイン中...")
-            login_result = asyncio.run(login(email, password))
+            return result, await login(email, password)
+
+        self.controller.run_async(
+            register(),
+            callback=self.on_sign_up_result,
+            error_callback=lambda e: self.error_label.configure(text=f"エラー: {e}"),
+        )
+
+    def on_sign_up_result(self, results):
+        """登録処理（と続けて行うログイン）の結果をUIに反映する"""
+        result, login_result = results
+        if result[0]:
             if login_result[0]:
                 self.controller.show_frame("todo")
                 self.error_label.configure(text="")
@@ -1,19 +1,25 @@
 import customtkinter as tk
-from lib.tasks import TaskManager
+from lib.tasks import TaskManager, task_matches_keyword
 from lib.tags import TagManager
 from lib.reminder import ReminderManager
 from lib.users import UserManager
-from lib.session import get_current_user_id
+from lib.session import get_current_user_id, session_store
 from lib.session import logout as db_logout
-import asyncio
 from aiosqlite import IntegrityError
-from PIL import Image
+from pages.icons import get_icon
+from pages.virtual_list import VirtualList
+from config import TASK_PAGE_SIZE, SEARCH_DEBOUNCE_MS
 
 task_manager: TaskManager = TaskManager()
 tag_manager: TagManager = TagManager()
 reminder_manager: ReminderManager = ReminderManager()
 user_manager: UserManager = UserManager()
 
+# 並び替えメニューの表示名 → query_tasksのソートキー
+SORT_KEYS = {"作成日": "created_at", "期限日": "deadline", "優先度": "priority", "名前": "name"}
+# 複数選択中の行の背景色（ライト, ダーク）
+SELECTED_ROW_COLOR = ("gray75", "gray30")
+
 priority = ["無", "低", "中", "高", "最高"]
 
 class PlaceholderCTkEntry(tk.CTkEntry):
@@ -68,11 +74,111 @@ class PlaceholderCTkEntry(tk.CTkEntry):
             return ""
         return self.get()
 
+class TaskRow(tk.CTkFrame):
+    """マイタスク一覧の1行（VirtualListで使い回される）"""
+
+    def __init__(self, master, page, height):
+        super().__init__(master, height=height - 4)
+        self.pack_propagate(False)
+        self.page = page
+        self.task_id = None
+        self.name = ""
+        self._default_fg_color = self.cget("fg_color")
+        # Ctrl+クリックで複数選択
+        self.bind("<Control-Button-1>", lambda e: self.page.toggle_selection(self.task_id))
+
+        # 完了チェックボックス
+        self.is_done_var = tk.BooleanVar(value=False)
+        done_check = tk.CTkCheckBox(self, text="", variable=self.is_done_var,
+            command=lambda: self.page.toggle_done(self.task_id, self.is_done_var.get()))
+        done_check.pack(side="left", padx=5)
+        # 名前
+        self.name_label = tk.CTkLabel(self, text="", width=200, anchor="w")
+        self.name_label.pack(side="left", padx=5)
+        self.name_label.bind("<Double-Button-1>", lambda e: self.page.show_detail_popup(self.task_id))
+        self.name_label.bind("<Control-Button-1>", lambda e: self.page.toggle_selection(self.task_id))
+        # タグ
+        self.tag_label = tk.CTkLabel(self, text="", width=60)
+        self.tag_label.pack(side="left", padx=5)
+        self.tag_label.bind("<Control-Button-1>", lambda e: self.page.toggle_selection(self.task_id))
+        icons = page.icons
+        del_btn = tk.CTkButton(self, image=icons["trash"], text="", width=30, command=lambda: self.page.delete_task(self.task_id))
+        del_btn.pack(side="right", padx=5)
+        edit_btn = tk.CTkButton(self, image=icons["edit"], text="", width=30, command=lambda: self.page.open_edit_popup(self.task_id, self.name))
+        edit_btn.pack(side="right", padx=5)
+        reminder_btn = tk.CTkButton(self, image=icons["bell"], text="", width=30, command=lambda: self.page.open_reminder_popup(self.task_id))
+        reminder_btn.pack(side="right", padx=5)
+        share_btn = tk.CTkButton(self, image=icons["share"], text="", width=30, command=lambda: self.page.open_share_popup(self.task_id))
+        share_btn.pack(side="right", padx=5)
+
+    def bind_item(self, task):
+        """表示するタスクを差し替える（task: タグ名・タグ色付きのタスク行）"""
+        # DB設計に合わせてインデックス修正
+        self.task_id = task[0]
+        self.name = task[4]
+        self.is_done_var.set(bool(task[3]))  # 0/1→False/True
+        self.name_label.configure(text=f"{self.name}")
+        tag_name, tag_color = task[12], task[13]
+        self.tag_label.configure(
+            text=tag_name if tag_name else "",
+            text_color=tag_color if tag_color else tk.ThemeManager.theme["CTkLabel"]["text_color"],
+        )
+        selected = self.task_id in self.page.selected_task_ids
+        self.configure(fg_color=SELECTED_ROW_COLOR if selected else self._default_fg_color)
+
+
+class SharedTaskRow(tk.CTkFrame):
+    """共有されたタスク一覧の1行（VirtualListで使い回される）"""
+
+    def __init__(self, master, page, height):
+        super().__init__(master, height=height - 4)
+        self.pack_propagate(False)
+        self.page = page
+        self.task_id = None
+        self.name = ""
+
+        self.name_label = tk.CTkLabel(self, text="", width=200, anchor="w")
+        self.name_label.pack(side="left", padx=5)
+        self.name_label.bind("<Double-Button-1>", lambda e: self.page.show_detail_popup(self.task_id))
+        icons = page.icons
+        del_btn = tk.CTkButton(self, image=icons["trash"], text="", width=30, command=lambda: self.page.delete_task(self.task_id))
+        del_btn.pack(side="right", padx=5)
+        edit_btn = tk.CTkButton(self, image=icons["edit"], text="", width=30, command=lambda: self.page.open_edit_popup(self.task_id, self.name))
+        edit_btn.pack(side="right", padx=5)
+        reminder_btn = tk.CTkButton(self, image=icons["bell"], text="", width=30, command=lambda: self.page.open_reminder_popup(self.task_id))
+        reminder_btn.pack(side="right", padx=5)
+
+    def bind_item(self, task):
+        """表示するタスクを差し替える"""
+        # タスク構造: (id, user, created_at, is_done, name, description, tag, deadline, priority)
+        self.task_id, self.name = task[0], task[4]  # nameは5番目のフィールド（インデックス4）
+        self.name_label.configure(text=f"{self.name} (共有)")
+
+
 class TodoPage(tk.CTkFrame):
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
-        self._last_user_id = None
+        self._refresh_generation = 0
+        # 複数選択中のタスクID
+        self.selected_task_ids = set()
+        # 書き込み待ちの完了切り替え（タスクID → [切り替え前の行, 書き込み待ちの数]）
+        self._optimistic_done = {}
+        # 最後に描画したときの条件とキャッシュのバージョン
+        self._rendered_state = None
+        # 最後に描画した取得結果（検索語を延ばしたときの絞り込みに使う）
+        self._last_result = None
+        self._refresh_future = None
+        # 一覧の描画が終わるたびに呼ぶ関数（subscribe_renderで登録する）
+        self._render_subscribers = []
+        self._search_after_id = None
+        # 最後に検索を予約したときの検索欄の文字列（文字列が変わったときだけ検索する）
+        self._search_text = ""
+        # 一覧ごとのページ読み込み状態（取得条件と次ページ用カーソル）
+        self._paging = {
+            name: {"user_id": None, "query": None, "cursor": None, "loading": False}
+            for name in ("own", "shared")
+        }
 
         # メインレイアウト設定
         self.grid_rowconfigure(1, weight=1)  # メインエリアを拡張可能に
@@ -88,7 +194,7 @@ class TodoPage(tk.CTkFrame):
         self.create_main_area()
 
         self.refresh_tasks()
-        self.check_user_update()
+        session_store.subscribe(self.on_session_change)
 
     def create_header(self):
         """ヘッダーエリア（ログアウト、検索など）"""
@@ -109,9 +215,7 @@ class TodoPage(tk.CTkFrame):
         search_frame.grid(row=0, column=1, padx=10, pady=10, sticky="ew")
         search_frame.grid_columnconfigure(0, weight=1)
 
-        search_image = tk.CTkImage(
-            Image.open("static/search.png"), size=(20, 20)
-        )
+        search_image = get_icon("search")
         search_label = tk.CTkLabel(search_frame, image=search_image, text="", font=("", 16))
         search_label.grid(row=0, column=0, sticky="w")
 
@@ -119,14 +223,13 @@ class TodoPage(tk.CTkFrame):
             search_frame, placeholder="タスクを検索..."
         )
         self.search_entry.grid(row=0, column=1, sticky="ew", padx=(5, 0))
-        self.search_entry.bind("<KeyRelease>", lambda e: self.refresh_tasks())
+        self.search_entry.bind("<KeyRelease>", lambda e: self.on_search_input())
+        self.search_entry.bind("<Return>", lambda e: self.run_search())
 
         # 更新ボタン
-        refresh_button_image = tk.CTkImage(
-            Image.open("static/refresh.png"), size=(20, 20)
-        )
+        refresh_button_image = get_icon("refresh")
         refresh_button = tk.CTkButton(
-            header_frame, image=refresh_button_image, text="", command=self.refresh_tasks, width=10
+            header_frame, image=refresh_button_image, text="", command=lambda: self.refresh_tasks(force=True), width=10
         )
         refresh_button.grid(row=0, column=2, padx=10, pady=10, sticky="e")
 
@@ -151,9 +254,7 @@ class TodoPage(tk.CTkFrame):
         self.new_task_entry.pack(fill="x", padx=10, pady=5)
         self.new_task_entry.bind("<Return>", lambda e: self.add_task())
 
-        add_task_img = tk.CTkImage(
-            Image.open("static/plus.png"), size=(20, 20)
-        )
+        add_task_img = get_icon("plus")
 
         add_task_button = tk.CTkButton(
             add_section, image=add_task_img, text="タスク追加", command=self.add_task
@@ -234,6 +335,36 @@ class TodoPage(tk.CTkFrame):
         )
         order_menu.pack(fill="x", padx=10, pady=(5, 10))
 
+        # === 一括操作エリア ===
+        bulk_section = tk.CTkFrame(sidebar_frame)
+        bulk_section.pack(fill="x", padx=10, pady=5)
+
+        bulk_label = tk.CTkLabel(
+            bulk_section, text="一括操作", font=("", 14, "bold")
+        )
+        bulk_label.pack(pady=(10, 0))
+
+        self.selection_label = tk.CTkLabel(bulk_section, text="Ctrl+クリックで選択")
+        self.selection_label.pack(pady=(0, 5))
+
+        bulk_buttons = tk.CTkFrame(bulk_section, fg_color="transparent")
+        bulk_buttons.pack(fill="x", padx=10, pady=(0, 10))
+        bulk_buttons.grid_columnconfigure((0, 1), weight=1)
+        bulk_actions = [
+            ("すべて選択", self.select_all_tasks),
+            ("選択解除", self.clear_selection),
+            ("完了にする", lambda: self.set_selected_done(True)),
+            ("未完了にする", lambda: self.set_selected_done(False)),
+        ]
+        for i, (text, command) in enumerate(bulk_actions):
+            tk.CTkButton(bulk_buttons, text=text, width=100, command=command).grid(
+                row=i // 2, column=i % 2, padx=2, pady=2, sticky="ew"
+            )
+        tk.CTkButton(
+            bulk_buttons, text="選択を削除", fg_color="#c0392b", hover_color="#962d22",
+            command=self.delete_selected_tasks,
+        ).grid(row=2, column=0, columnspan=2, padx=2, pady=2, sticky="ew")
+
         # === ステータス表示エリア ===
         self.status_label = tk.CTkLabel(sidebar_frame, text="", fg_color="transparent")
         self.status_label.pack(side="bottom", pady=10)
@@ -255,15 +386,20 @@ class TodoPage(tk.CTkFrame):
         )
         task_title.grid(row=0, column=0, sticky="w", padx=10)
 
-        # タスク一覧エリア（スクロール可能）
-        self.task_scroll_frame = tk.CTkScrollableFrame(main_frame)
-        self.task_scroll_frame.grid(row=1, column=0, sticky="nsew", padx=10, pady=5)
-
-        # マイタスクフレーム
-        self.task_list_frame = tk.CTkFrame(
-            self.task_scroll_frame, fg_color="transparent"
+        # 行ウィジェットで共有するアイコン
+        self.icons = {
+            name: get_icon(name)
+            for name in ("trash", "edit", "bell", "share")
+        }
+
+        # タスク一覧エリア（表示範囲の行だけを描画するスクロールリスト）
+        self.task_list = VirtualList(
+            main_frame,
+            row_factory=lambda master, height: TaskRow(master, self, height),
+            key=lambda task: task[0],  # タスクID
+            on_reach_end=lambda: self.load_next_page("own"),
         )
-        self.task_list_frame.pack(fill="both", expand=True)
+        self.task_list.grid(row=1, column=0, sticky="nsew", padx=10, pady=5)
 
         # 共有タスクエリア
         shared_title_frame = tk.CTkFrame(main_frame, height=40, fg_color="transparent")
@@ -274,167 +410,369 @@ class TodoPage(tk.CTkFrame):
         )
         shared_title.grid(row=0, column=0, sticky="w", padx=10)
 
-        self.shared_task_scroll_frame = tk.CTkScrollableFrame(main_frame, height=150)
-        self.shared_task_scroll_frame.grid(
+        self.shared_task_list = VirtualList(
+            main_frame, height=150,
+            row_factory=lambda master, height: SharedTaskRow(master, self, height),
+            key=lambda task: task[0],  # タスクID
+            on_reach_end=lambda: self.load_next_page("shared"),
+        )
+        self.shared_task_list.grid(
             row=3, column=0, sticky="ew", padx=10, pady=(5, 10)
         )
 
-        self.shared_task_list_frame = tk.CTkFrame(
-            self.shared_task_scroll_frame, fg_color="transparent"
-        )
-        self.shared_task_list_frame.pack(fill="both", expand=True)
+    def on_session_change(self, event, session):
+        """ログイン・ログアウトされたら一覧を取り直す"""
+        self.refresh_tasks()
 
-    def check_user_update(self):
-        current_user_id = get_current_user_id()
-        if current_user_id != self._last_user_id:
-            self._last_user_id = current_user_id
-            self.refresh_tasks()
-        self.after(100, lambda: self.check_user_update())  # 1秒ごとにチェック
+    def show_error(self, prefix):
+        """例外をステータス欄に表示するコールバックを返す"""
+        return lambda e: self.status_label.configure(text=f"{prefix}: {e}", text_color="red")
 
     def add_task(self):
         name = self.new_task_entry.get()
         if name:
             user_id = get_current_user_id()
-            try:
-                # 引数を明示的に渡す
-                asyncio.run(task_manager.create(user_id, name=name, description=None, tag=None, deadline=None, priority=0))
+
+            def on_created(_):
                 self.new_task_entry.delete(0, tk.END)
                 self.refresh_tasks()
                 self.status_label.configure(text="タスクを追加しました", text_color="green")
-            except Exception as e:
-                self.status_label.configure(text=f"エラー: {e}", text_color="red")
+
+            # 引数を明示的に渡す
+            self.controller.run_async(
+                task_manager.create(user_id, name=name, description=None, tag=None, deadline=None, priority=0),
+                callback=on_created,
+                error_callback=self.show_error("エラー"),
+            )
         else:
             self.status_label.configure(text="タスク名を入力してください", text_color="red")
 
-    def get_tasks(self):
-        user_id = get_current_user_id()
-        # TaskManager.get_by_userはリストを返す
-        tasks = asyncio.run(task_manager.get_by_user(user_id))
-        return tasks
-
-    def refresh_tasks(self):
-        # タスク一覧Frameの中身をクリア
-        for widget in self.task_list_frame.winfo_children():
-            widget.destroy()
-        tasks = self.get_tasks()
-        # タグ一覧を更新
-        tags = asyncio.run(tag_manager.get_by_user(get_current_user_id()))
-        tag_filter_values = ["すべて"] + [str(t[2]) for t in tags]  # タグ名のリスト
-        self.tag_id_dict = {str(t[2]): t[0] for t in tags}  # タグ名→IDの辞書
-        self.tag_filter_menu.configure(values=tag_filter_values)
-
-        # 検索フィルタ適用
+    def current_query(self):
+        """検索欄とサイドバーの条件をquery_tasksの引数にまとめる"""
+        query = {
+            "sort_by": SORT_KEYS.get(self.sort_var.get(), "created_at"),
+            "order": "DESC" if self.order_var.get() == "降順" else "ASC",
+        }
         search_text = self.search_entry.get_real_value()
         if search_text:
-            tasks = asyncio.run(task_manager.search(get_current_user_id(), keyword=search_text))
-
-        # タグフィルタ適用
+            query["keyword"] = search_text
         selected_tag = self.tag_filter_var.get()
         if selected_tag != "すべて":
-            selected_tag_id = self.tag_id_dict.get(selected_tag)
-            tasks = [t for t in tasks if t[6] == selected_tag_id]
-        
-        # 完了済み/未完了フィルタ適用
+            query["tag_id"] = self.tag_id_dict.get(selected_tag)
         status_filter = self.show_completed_var.get()
         if status_filter == "未完了":
-            tasks = [t for t in tasks if t[3] == 0]  # is_doneが0のもの
+            query["is_done"] = False
         elif status_filter == "完了済み":
-            tasks = [t for t in tasks if t[3] == 1]  # is_doneが1のもの
-
-        # 並び替え適用
-        sort_key = self.sort_var.get()
-        reverse = self.order_var.get() == "降順"
-        if sort_key == "作成日":
-            tasks.sort(key=lambda x: x[9], reverse=reverse)  # 作成日でソート
-        elif sort_key == "期限日":
-            tasks.sort(key=lambda x: (x[7] is None, x[7]), reverse=reverse)  # 締切でソート、Noneは最後
-        elif sort_key == "優先度":
-            tasks.sort(key=lambda x: x[8], reverse=reverse)  # 優先度でソート
-        elif sort_key == "名前":
-            tasks.sort(key=lambda x: x[4].lower(), reverse=reverse)  # 名前でソート（大文字小文字区別なし）
-
-        trash_img = tk.CTkImage(
-            light_image=Image.open("static/trash.png"), size=(20, 20)
-        )
-        edit_img = tk.CTkImage(
-            light_image=Image.open("static/edit.png"), size=(20, 20)
+            query["is_done"] = True
+        return query
+
+    async def fetch_tasks(self, user_id, query, limit, rendered_state, force):
+        """
+        一覧表示に必要なタスク・タグ・共有タスクの先頭ページをまとめて取得する
+
+        前回描画したときからキャッシュのバージョンと共有されたタスクが変わっていなければ、
+        自分のタスクとタグは取得せずNoneを返す。
+        """
+        if force:
+            task_manager.invalidate_cache()
+            tag_manager.invalidate_cache()
+        # 共有されたタスクは他のユーザーが変更し、キャッシュのバージョンには表れないため毎回取得する
+        shared_page = await task_manager.query(shared_with=user_id, limit=TASK_PAGE_SIZE)
+        state = self.cache_state(user_id, query, shared_page)
+        if not force and None not in state[2:4] and state == rendered_state:
+            return None
+        # 絞り込み・並び替えはキャッシュまたはSQL側で行い、表示に必要な件数だけ取得する
+        tasks_page = await task_manager.query(user_id, limit=limit, **query)
+        tags = await tag_manager.get_by_user(user_id)
+        return self.cache_state(user_id, query, shared_page), tasks_page, tags, shared_page
+
+    @staticmethod
+    def cache_state(user_id, query, shared_page):
+        """描画内容を決める条件・キャッシュのバージョン・共有されたタスクの先頭ページの組"""
+        return (user_id, query, task_manager.cache_version(user_id), tag_manager.cache_version(user_id),
+                shared_page)
+
+    def on_search_input(self):
+        """検索欄でキーが離されたとき、文字列が変わっていれば検索を予約する（矢印キーや修飾キーでは検索しない）"""
+        search_text = self.search_entry.get_real_value()
+        if search_text == self._search_text:
+            return
+        self._search_text = search_text
+        self.schedule_search()
+
+    def schedule_search(self):
+        """入力が SEARCH_DEBOUNCE_MS 止まったら検索する（それまでの入力はまとめる）"""
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(SEARCH_DEBOUNCE_MS, self.run_search)
+
+    def run_search(self):
+        """待機中の検索があれば取り消し、すぐに検索する"""
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+            self._search_after_id = None
+        self.refresh_tasks()
+
+    def narrow_search(self, user_id, query):
+        """
+        検索語を延ばしただけの場合、前回の検索結果を絞り込んで今回の結果を作る
+
+        前回の結果が全件読み込み済みで、他の条件とキャッシュのバージョンが同じ場合だけ使える。
+        FTS5（trigram）はASCII以外の大文字小文字も同一視するため、ASCII以外を含む検索語はSQLで検索し直す。
+
+        Returns:
+            tuple or None: fetch_tasksと同じ形の結果、絞り込めない場合はNone
+        """
+        keyword = query.get("keyword")
+        if self._last_result is None or not keyword:
+            return None
+        state, _, tags, shared_page = self._last_result
+        # 続きのページや完了切り替えを反映した、現在表示中の一覧を絞り込む
+        paging = self._paging["own"]
+        tasks, cursor = self.task_list.items, paging["cursor"]
+        last_user_id, last_query = paging["user_id"], paging["query"]
+        last_keyword = last_query.get("keyword")
+        others = {k: v for k, v in query.items() if k != "keyword"}
+        last_others = {k: v for k, v in last_query.items() if k != "keyword"}
+        new_state = self.cache_state(user_id, query, shared_page)
+        if (cursor is not None or not last_keyword or last_user_id != user_id
+                or not keyword.isascii() or not keyword.startswith(last_keyword) or others != last_others
+                or None in state[2:4] or state[2:] != new_state[2:]):
+            return None
+        tasks = [task for task in tasks if task_matches_keyword(task, keyword)]
+        return new_state, (tasks, None), tags, shared_page
+
+    def refresh_tasks(self, force=False):
+        """
+        一覧を取り直して描画する
+
+        Args:
+            force (bool): Trueの場合はキャッシュを破棄してデータベースから読み直す
+        """
+        # 連続して呼ばれた場合は最後の取得結果だけを描画する
+        self._refresh_generation += 1
+        generation = self._refresh_generation
+        user_id = get_current_user_id()
+        if user_id is None:
+            # ログアウト中は前のユーザーのタスクを残さない
+            self._rendered_state = None
+            self._last_result = None
+            self.task_list.set_items([])
+            self.shared_task_list.set_items([])
+            return
+        # 古い条件での取得が実行中なら取り消す
+        if self._refresh_future is not None:
+            self._refresh_future.cancel()
+            self._refresh_future = None
+        query = self.current_query()
+        if not force:
+            narrowed = self.narrow_search(user_id, query)
+            if narrowed is not None:
+                self.render_tasks(generation, user_id, query, narrowed)
+                return
+        # 条件が同じなら読み込み済みの件数を保ち、スクロール位置を維持する
+        limit = TASK_PAGE_SIZE
+        if self._paging["own"]["query"] == query and self._paging["own"]["user_id"] == user_id:
+            limit = max(limit, len(self.task_list.items))
+        self._refresh_future = self.controller.run_async(
+            self.fetch_tasks(user_id, query, limit, self._rendered_state, force),
+            callback=lambda result: self.render_tasks(generation, user_id, query, result),
+            error_callback=self.show_error("取得エラー"),
         )
-        reminder_img = tk.CTkImage(
-            light_image=Image.open("static/bell.png"), size=(20, 20)
+
+    def subscribe_render(self, callback):
+        """
+        一覧の描画が終わるたびに呼ばれる関数を登録する（ベンチマークなどで描画の完了を待つのに使う）
+
+        前回の描画から変化がなく描画を省いた場合は呼ばれない。
+
+        Args:
+            callback (callable): 自分のタスクと共有されたタスクを描画した後に、引数なしでTkのスレッドから呼ばれる関数
+
+        Returns:
+            callable: 登録を解除する関数
+        """
+        self._render_subscribers.append(callback)
+        return lambda: self.unsubscribe_render(callback)
+
+    def unsubscribe_render(self, callback):
+        """subscribe_renderで登録した関数を解除する"""
+        if callback in self._render_subscribers:
+            self._render_subscribers.remove(callback)
+
+    def render_tasks(self, generation, user_id, query, result):
+        if generation != self._refresh_generation or result is None:
+            # 新しい取得が始まっているか、前回の描画から変化がない
+            return
+        state, tasks_page, tags, shared_page = result
+        self._rendered_state = state
+        self._last_result = result
+        # タグ一覧を更新
+        tag_filter_values = ["すべて"] + [str(t[2]) for t in tags]  # タグ名のリスト
+        self.tag_id_dict = {str(t[2]): t[0] for t in tags}  # タグ名→IDの辞書
+        self.tag_filter_menu.configure(values=tag_filter_values)
+
+        tasks, cursor = tasks_page
+        shared_tasks, shared_cursor = shared_page
+        self._paging["own"].update(user_id=user_id, query=query, cursor=cursor)
+        self._paging["shared"].update(user_id=None, query={"shared_with": user_id}, cursor=shared_cursor)
+
+        # 一覧から消えたタスクは選択から外す
+        self.selected_task_ids &= {task[0] for task in tasks}
+        self.update_selection_label()
+
+        # 前回の表示とタスクIDで突き合わせ、変化した行だけを描き直す
+        self.task_list.set_items(tasks)
+        # 共有タスクも同じ仕組みで表示
+        self.shared_task_list.set_items(shared_tasks)
+        for callback in list(self._render_subscribers):
+            callback()
+
+    def load_next_page(self, name):
+        """
+        一覧の末尾までスクロールされたときに続きのページを読み込む
+
+        Args:
+            name (str): 対象の一覧（own: マイタスク, shared: 共有されたタスク）
+        """
+        paging = self._paging[name]
+        if paging["cursor"] is None or paging["loading"]:
+            return
+        paging["loading"] = True
+        generation = self._refresh_generation
+        target = self.task_list if name == "own" else self.shared_task_list
+
+        def on_loaded(result):
+            paging["loading"] = False
+            # 読み込み中に条件が変わった場合は破棄する
+            if generation != self._refresh_generation:
+                return
+            rows, paging["cursor"] = result
+            target.append_items(rows)
+
+        def on_error(e):
+            paging["loading"] = False
+            self.show_error("取得エラー")(e)
+
+        self.controller.run_async(
+            task_manager.query(paging["user_id"], limit=TASK_PAGE_SIZE, cursor=paging["cursor"], **paging["query"]),
+            callback=on_loaded,
+            error_callback=on_error,
         )
-        share_img = tk.CTkImage(
-            light_image=Image.open("static/share.png"), size=(20, 20)
+
+    def toggle_selection(self, task_id):
+        """タスクの選択状態を切り替える"""
+        if task_id is None:
+            return
+        self.selected_task_ids ^= {task_id}
+        self.update_selection_label()
+        # 選択状態は行の背景色だけに反映するため、表示中の行を再バインドする
+        self.task_list.refresh()
+
+    def select_all_tasks(self):
+        """読み込み済みのタスクをすべて選択する"""
+        self.selected_task_ids = {task[0] for task in self.task_list.items}
+        self.update_selection_label()
+        self.task_list.refresh()
+
+    def clear_selection(self):
+        """選択をすべて解除する"""
+        self.selected_task_ids = set()
+        self.update_selection_label()
+        self.task_list.refresh()
+
+    def update_selection_label(self):
+        count = len(self.selected_task_ids)
+        self.selection_label.configure(text=f"{count}件選択中" if count else "Ctrl+クリックで選択")
+
+    def run_bulk_action(self, coro, message):
+        """
+        選択したタスクへの一括操作を実行し、完了したら選択を解除して一覧を取り直す
+
+        Args:
+            coro (coroutine): TaskManagerの一括操作
+            message (str): 完了時にステータス欄へ表示するメッセージ（{count}に件数が入る）
+        """
+        def on_done(count):
+            self.clear_selection()
+            self.refresh_tasks()
+            self.status_label.configure(text=message.format(count=count), text_color="green")
+
+        self.controller.run_async(coro, callback=on_done, error_callback=self.show_error("一括操作エラー"))
+
+    def set_selected_done(self, is_done):
+        if not self.selected_task_ids:
+            self.status_label.configure(text="タスクが選択されていません", text_color="red")
+            return
+        self.run_bulk_action(
+            task_manager.set_done_many(list(self.selected_task_ids), is_done),
+            "{count}件を完了にしました" if is_done else "{count}件を未完了にしました",
         )
 
-        for task in tasks:
-            # DB設計に合わせてインデックス修正
-            task_id = task[0]
-            name = task[4]
-            is_done = bool(task[3])  # 0/1→False/True
-            tag_id = task[6]
-            # タグ名取得（tag_idがNoneならDBアクセスしない）
-            if tag_id:
-                tag_info = asyncio.run(tag_manager.get_by_id(tag_id))
-                tag_name = tag_info[2] if tag_info else ""
-            else:
-                tag_name = ""
-            row_frame = tk.CTkFrame(self.task_list_frame)
-            row_frame.pack(fill="x", pady=2)
-            # 完了チェックボックス
-            is_done_var = tk.BooleanVar(value=is_done)
-            done_check = tk.CTkCheckBox(row_frame, text="", variable=is_done_var,
-                command=lambda tid=task_id, v=is_done_var: self.toggle_done(tid, v.get()))
-            done_check.pack(side="left", padx=5)
-            # 名前
-            label = tk.CTkLabel(row_frame, text=f"{name}", width=200, anchor="w")
-            label.pack(side="left", padx=5)
-            label.bind("<Double-Button-1>", lambda e, tid=task_id: self.show_detail_popup(tid))
-            # タグ
-            tag_label = tk.CTkLabel(row_frame, text=tag_name if tag_name else "", width=60)
-            tag_label.pack(side="left", padx=5)
-            del_btn = tk.CTkButton(row_frame, image=trash_img, text="", width=30,command=lambda tid=task_id: self.delete_task(tid))
-            del_btn.pack(side="right", padx=5)
-            edit_btn = tk.CTkButton(row_frame, image=edit_img,text="", width=30, command=lambda tid=task_id, nm=name: self.open_edit_popup(tid, nm))
-            edit_btn.pack(side="right", padx=5)
-            reminder_btn = tk.CTkButton(row_frame, image=reminder_img, text="", width=30, command=lambda tid=task_id: self.open_reminder_popup(tid))
-            reminder_btn.pack(side="right", padx=5)
-            share_btn = tk.CTkButton(row_frame, image=share_img, text="", width=30, command=lambda tid=task_id: self.open_share_popup(tid))
-            share_btn.pack(side="right", padx=5)
-
-        # 共有タスクもFrameで表示
-        for widget in self.shared_task_list_frame.winfo_children():
-            widget.destroy()
-        shared_tasks = self.get_shared_tasks()
-        for task in shared_tasks:
-            # タスク構造: (id, user, created_at, is_done, name, description, tag, deadline, priority)
-            task_id, name = task[0], task[4]  # nameは5番目のフィールド（インデックス4）
-            row_frame = tk.CTkFrame(self.shared_task_list_frame)
-            row_frame.pack(fill="x", pady=2)
-            label = tk.CTkLabel(row_frame, text=f"{name} (共有)", width=200, anchor="w")
-            label.pack(side="left", padx=5)
-            label.bind("<Double-Button-1>", lambda e, tid=task_id: self.show_detail_popup(tid))
-            del_btn = tk.CTkButton(row_frame, image=trash_img, text="", width=30, command=lambda tid=task_id: self.delete_task(tid))
-            del_btn.pack(side="right", padx=5)
-            edit_btn = tk.CTkButton(row_frame, image=edit_img, text="", width=30, command=lambda tid=task_id, nm=name: self.open_edit_popup(tid, nm))
-            edit_btn.pack(side="right", padx=5)
-            reminder_btn = tk.CTkButton(row_frame, image=reminder_img, text="", width=30, command=lambda tid=task_id: self.open_reminder_popup(tid))
-            reminder_btn.pack(side="right", padx=5)
+    def delete_selected_tasks(self):
+        if not self.selected_task_ids:
+            self.status_label.configure(text="タスクが選択されていません", text_color="red")
+            return
+        self.run_bulk_action(
+            task_manager.delete_many(list(self.selected_task_ids)),
+            "{count}件を削除しました",
+        )
 
     def toggle_done(self, task_id, is_done):
-        try:
-            asyncio.run(task_manager.update(task_id, is_done=is_done))
-            self.refresh_tasks()
-        except Exception as e:
+        # 書き込みを待たずに表示へ反映し、書き込みに失敗したら元に戻す
+        # 連続して切り替えた場合も、戻す先は最初の切り替え前の状態
+        entry = self._optimistic_done.setdefault(task_id, [self.task_list.get_item(task_id), 0])
+        entry[1] += 1
+        self.apply_done_state(task_id, is_done)
+
+        def on_written(_):
+            entry[1] -= 1
+            if entry[1] == 0 and self._optimistic_done.get(task_id) is entry:
+                del self._optimistic_done[task_id]
+
+        def on_error(e):
+            if self._optimistic_done.pop(task_id, None) is not entry:
+                return  # 同じタスクの別の切り替えで戻し済み
+            previous = entry[0]
+            if previous is not None and self.task_list.get_item(task_id) is not None:
+                self.task_list.update_item(previous)
+            else:
+                # フィルタ条件で一覧から外した行は取り直して戻す
+                self.refresh_tasks()
             self.status_label.configure(text=f"完了状態更新エラー: {e}", text_color="red")
 
+        self.controller.run_async(
+            task_manager.update_deferred(task_id, is_done=is_done),
+            callback=on_written,
+            error_callback=on_error,
+        )
+
+    def apply_done_state(self, task_id, is_done):
+        """完了状態の変更を一覧の該当行だけに反映する"""
+        task = self.task_list.get_item(task_id)
+        if task is None:
+            return
+        status_filter = self.show_completed_var.get()
+        if (status_filter == "未完了" and is_done) or (status_filter == "完了済み" and not is_done):
+            # フィルタ条件から外れたので一覧から取り除く
+            self.task_list.remove_item(task_id)
+            return
+        task = task[:3] + (1 if is_done else 0,) + task[4:]
+        self.task_list.update_item(task)
+
     def show_detail_popup(self, task_id):
-        # タスク詳細取得
-        task = asyncio.run(task_manager.get_by_id(task_id))
+        async def fetch():
+            # タスク詳細をタグ名付きで取得
+            task = await task_manager.get_by_id_with_tag(task_id)
+            return task, task[12] or "なし"
+        self.controller.run_async(fetch(), callback=lambda result: self.build_detail_popup(*result),
+                                  error_callback=self.show_error("取得エラー"))
+
+    def build_detail_popup(self, task, tag_name):
         # タスク構造例: (id, name, description, tag, deadline, priority, ...)
         popup = tk.CTkToplevel(self)
         popup.title("タスク詳細")
         popup.geometry("350x250")
-        tag_name = asyncio.run(tag_manager.get_by_id(task[6]))[2] if task[6] else "なし"
         detail_text = f"ID: {task[0]}\n名前: {task[4]}\n説明: {task[5]}\nタグ: {tag_name}\n締切: {task[7]}\n優先度: {priority[task[8]]}"
         label = tk.CTkLabel(popup, text=detail_text, anchor="w", justify="left")
         label.pack(padx=20, pady=20)
@@ -442,21 +780,31 @@ class TodoPage(tk.CTkFrame):
         close_btn.pack(pady=10)
 
     def delete_task(self, task_id):
-        try:
-            asyncio.run(task_manager.delete(task_id))
-            self.refresh_tasks()
+        def on_deleted(_):
+            self.task_list.remove_item(task_id)
+            self.shared_task_list.remove_item(task_id)
             self.status_label.configure(text="タスクを削除しました", text_color="green")
-        except Exception as e:
-            self.status_label.configure(text=f"削除エラー: {e}", text_color="red")
+        self.controller.run_async(task_manager.delete(task_id), callback=on_deleted,
+                                  error_callback=self.show_error("削除エラー"))
 
     def open_edit_popup(self, task_id, name):
+        async def fetch():
+            # タスク情報を現在のタグ名付きで一度だけ取得
+            task = await task_manager.get_by_id_with_tag(task_id)
+            tag_options = await tag_manager.get_by_user(get_current_user_id())
+            current_tag_name = str(task[12]) if task[12] else "なし"
+            return task, tag_options, current_tag_name
+        self.controller.run_async(
+            fetch(),
+            callback=lambda result: self.build_edit_popup(task_id, name, *result),
+            error_callback=self.show_error("取得エラー"),
+        )
+
+    def build_edit_popup(self, task_id, name, task, tag_options, current_tag_name):
         popup = tk.CTkToplevel(self)
         popup.title("タスク編集")
         popup.geometry("350x625")
 
-        # タスク情報を一度だけ取得
-        task = asyncio.run(task_manager.get_by_id(task_id))
-
         # 名前
         name_label = tk.CTkLabel(popup, text="名前:")
         name_label.pack(pady=(20, 0))
@@ -475,17 +823,9 @@ class TodoPage(tk.CTkFrame):
         tag_label.pack(pady=(15, 0))
         tag_frame = tk.CTkFrame(popup)
         tag_frame.pack(pady=5)
-        tag_options = self.get_tag_list()  # 例: [(id, user_id, name), ...]
-        tag_names = [str(t[2]) for t in tag_options]
+        tag_names = [str(t[2]) for t in tag_options]  # 例: [(id, user_id, name), ...]
         if "なし" not in tag_names:
             tag_names = ["なし"] + tag_names
-        # 現在のタグIDを取得
-        current_tag_id = task[6] if len(task) > 6 else None
-        if current_tag_id:
-            tag_info = asyncio.run(tag_manager.get_by_id(current_tag_id))
-            current_tag_name = str(tag_info[2]) if tag_info else "なし"
-        else:
-            current_tag_name = "なし"
         # 初期値を現在のタグ名に
         tag_var = tk.StringVar(value=current_tag_name if current_tag_name in tag_names else tag_names[0])
         tag_menu = tk.CTkOptionMenu(tag_frame, variable=tag_var, values=tag_names)
@@ -569,13 +909,6 @@ class TodoPage(tk.CTkFrame):
             new_name = name_entry.get()
             new_desc = desc_entry.get()
             selected_tag_name = tag_var.get()
-            # タグID取得（"なし"ならNone、そうでなければIDを取得）
-            if selected_tag_name == "なし":
-                new_tag_id = None
-            else:
-                tag_options = self.get_tag_list()
-                tag_dict = {str(t[2]): t[0] for t in tag_options}
-                new_tag_id = tag_dict.get(selected_tag_name, None)
             new_date = deadline_entry.get()
             new_time = time_entry.get().strip()
             # 締切なしがチェックされている場合はNone
@@ -589,8 +922,17 @@ class TodoPage(tk.CTkFrame):
                 new_deadline = None
             new_priority = priority.index(priority_var.get())
             new_is_done = is_done_var.get()
-            try:
-                asyncio.run(task_manager.update(
+
+            async def do_update():
+                # タグID取得（"なし"ならNone、そうでなければIDを取得）
+                if selected_tag_name == "なし":
+                    new_tag_id = None
+                else:
+                    tag_options = await tag_manager.get_by_user(get_current_user_id())
+                    tag_dict = {str(t[2]): t[0] for t in tag_options}
+                    new_tag_id = tag_dict.get(selected_tag_name, None)
+                # 直前の完了切り替えなどと同じ書き込みにまとめる
+                await task_manager.update_deferred(
                     task_id,
                     name=new_name,
                     description=new_desc,
@@ -598,12 +940,15 @@ class TodoPage(tk.CTkFrame):
                     deadline=new_deadline,
                     priority=new_priority,
                     is_done=new_is_done
-                ))
+                )
+
+            def on_updated(_):
                 self.refresh_tasks()
                 self.status_label.configure(text="タスクを更新しました", text_color="green")
                 popup.destroy()
-            except Exception as e:
-                self.status_label.configure(text=f"更新エラー: {e}", text_color="red")
+
+            self.controller.run_async(do_update(), callback=on_updated,
+                                      error_callback=self.show_error("更新エラー"))
         save_btn = tk.CTkButton(btn_frame, text="保存", command=save)
         save_btn.pack(side="left", padx=10)
         cancel_btn = tk.CTkButton(btn_frame, text="キャンセル", command=popup.destroy)
@@ -622,19 +967,26 @@ class TodoPage(tk.CTkFrame):
         def save():
             name = name_entry.get()
             user_id = get_current_user_id()
-            try:
-                asyncio.run(tag_manager.create(user_id, name))
+
+            async def create():
+                await tag_manager.create(user_id, name)
                 # タグ一覧を再取得してOptionMenuに反映
-                tag_options = self.get_tag_list()
+                return await tag_manager.get_by_user(user_id)
+
+            def on_created(tag_options):
                 tag_names = [str(t[2]) for t in tag_options]
                 tag_menu.configure(values=tag_names)
                 if name in tag_names:
                     tag_var.set(name)
                 popup.destroy()
-            except IntegrityError:
-                error_label.configure(text="タグ名が重複しています", text_color="red")
-            except Exception as e:
-                error_label.configure(text=f"エラー: {e}", text_color="red")
+
+            def on_error(e):
+                if isinstance(e, IntegrityError):
+                    error_label.configure(text="タグ名が重複しています", text_color="red")
+                else:
+                    error_label.configure(text=f"エラー: {e}", text_color="red")
+
+            self.controller.run_async(create(), callback=on_created, error_callback=on_error)
         save_btn = tk.CTkButton(popup, text="保存", command=save)
         save_btn.pack(pady=10)
         cancel_btn = tk.CTkButton(popup, text="キャンセル", command=popup.destroy)
@@ -650,16 +1002,14 @@ class TodoPage(tk.CTkFrame):
         entry_frame.pack(pady=10)
         reminder_entry = tk.CTkEntry(entry_frame, placeholder_text="リマインダー内容")
         reminder_entry.pack(side="left", padx=5)
-        def format_content(content):
+        def parse_content(content):
             """
-            形式は(YYYY-MM-DD HH:MM)
-            
             contentは1hや30mのような形式を想定する。ただし、1h30mや2h15m10sのように複数組み合わせても良い。
             許容されるのはw,d,h,mのみ
-            contentから時間を解析して、現在時刻からの相対時間を計算し、フォーマットする
+            contentから締切の何分前かを解析してtimedeltaで返す
             """
             import re
-            from datetime import datetime, timedelta
+            from datetime import timedelta
             pattern = r'(?:(\d+)w)?(?:(\d+)d)?(?:(\d+)h)?(?:(\d+)m)?'
             match = re.fullmatch(pattern, content.strip())
             if not match:
@@ -670,24 +1020,35 @@ class TodoPage(tk.CTkFrame):
             minutes = int(match.group(4) or 0)
             if weeks == days == hours == minutes == 0:
                 return None
-            delta = timedelta(weeks=weeks, days=days, hours=hours, minutes=minutes)
-            task = asyncio.run(task_manager.get_by_id(task_id))
+            return timedelta(weeks=weeks, days=days, hours=hours, minutes=minutes)
+
+        async def create_reminder(delta):
+            """
+            締切日時からdeltaだけ前の日時(YYYY-MM-DD HH:MM)でリマインダーを作成する
+            """
+            from datetime import datetime
+            task = await task_manager.get_by_id(task_id)
             deadline_str = task[7]  # 締切日時
             if deadline_str:
                 deadline_str = datetime.fromisoformat(str(deadline_str))
             reminder_time = deadline_str - delta
-            return reminder_time.strftime("%Y-%m-%d %H:%M")
+            await reminder_manager.create_reminder(task_id, reminder_time.strftime("%Y-%m-%d %H:%M"))
 
         def add_reminder():
             content = reminder_entry.get()
-            formatted_content = format_content(content)
-            if formatted_content is False:
+            delta = parse_content(content)
+            if delta is False:
                 error_label.configure(text="形式エラー(2d, 1h, 30mのような形式のみ許可されています)", text_color="red")
                 return
-            if formatted_content:
-                asyncio.run(reminder_manager.create_reminder(task_id, formatted_content))
-                reminder_entry.delete(0, tk.END)
-                refresh_reminder_list()
+            if delta:
+                def on_created(_):
+                    reminder_entry.delete(0, tk.END)
+                    refresh_reminder_list()
+                self.controller.run_async(
+                    create_reminder(delta),
+                    callback=on_created,
+                    error_callback=lambda e: error_label.configure(text=f"エラー: {e}", text_color="red"),
+                )
         add_btn = tk.CTkButton(entry_frame, text="+", width=30, command=add_reminder)
         add_btn.pack(side="left", padx=5)
 
@@ -698,10 +1059,12 @@ class TodoPage(tk.CTkFrame):
         error_label.pack()
 
         def refresh_reminder_list():
+            # DBからリマインダー一覧取得（タプル型返却）
+            self.controller.run_async(reminder_manager.fetch_reminders_by_task(task_id), callback=render_reminder_list)
+
+        def render_reminder_list(reminders):
             for widget in list_frame.winfo_children():
                 widget.destroy()
-            # DBからリマインダー一覧取得（タプル型返却）
-            reminders = asyncio.run(reminder_manager.fetch_reminders_by_task(task_id))
             for reminder in reminders:
                 row = tk.CTkFrame(list_frame)
                 row.pack(fill="x", pady=2)
@@ -713,8 +1076,8 @@ class TodoPage(tk.CTkFrame):
 
         def delete_reminder(reminder_id):
             # DBからリマインダー削除
-            asyncio.run(reminder_manager.remove_reminder(reminder_id))
-            refresh_reminder_list()
+            self.controller.run_async(reminder_manager.remove_reminder(reminder_id),
+                                      callback=lambda _: refresh_reminder_list())
 
         refresh_reminder_list()
 
@@ -736,33 +1099,39 @@ class TodoPage(tk.CTkFrame):
                 error_label.configure(text="メールアドレスを入力してください", text_color="red")
                 return
 
-            try:
-                user = asyncio.run(user_manager.get_by_email(email))
+            current_user_id = get_current_user_id()
+
+            async def share():
+                """共有を実行し、結果メッセージを返す（共有できた場合はNone）"""
+                user = await user_manager.get_by_email(email)
                 if not user:
-                    error_label.configure(text="ユーザーが見つかりません", text_color="red")
-                    return
+                    return "ユーザーが見つかりません"
 
                 # 自分自身との共有をチェック
-                current_user_id = get_current_user_id()
                 if user[0] == current_user_id:
-                    error_label.configure(text="自分自身とは共有できません", text_color="red")
-                    return
+                    return "自分自身とは共有できません"
 
                 # 既に共有済みかチェック
-                shared_users = asyncio.run(task_manager.get_shared_users_by_task(task_id))
+                shared_users = await task_manager.get_shared_users_by_task(task_id)
                 if any(shared_user[0] == user[0] for shared_user in shared_users):
-                    error_label.configure(text="既にこのユーザーと共有済みです", text_color="red")
-                    return
+                    return "既にこのユーザーと共有済みです"
 
-                asyncio.run(task_manager.share_with_users(task_id, user[0]))
+                await task_manager.share_with_users(task_id, user[0])
+                return None
+
+            def on_shared(message):
+                if message:
+                    error_label.configure(text=message, text_color="red")
+                    return
                 email_entry.delete(0, tk.END)
-                error_label.configure(text="共有しました", text_color="green")
-                refresh_share_list()
+                refresh_share_list(message="共有しました")
 
-            except Exception as e:
+            def on_error(e):
                 print(f"共有エラー: {e}")
                 error_label.configure(text="共有に失敗しました", text_color="red")
 
+            self.controller.run_async(share(), callback=on_shared, error_callback=on_error)
+
         add_btn = tk.CTkButton(entry_frame, text="+", width=30, command=add_share)
         add_btn.pack(side="left", padx=5)
 
@@ -774,60 +1143,61 @@ class TodoPage(tk.CTkFrame):
         error_label = tk.CTkLabel(popup, text="", text_color="red")
         error_label.pack()
 
-        def refresh_share_list():
-            # エラー/成功メッセージをクリア
-            error_label.configure(text="")
+        def refresh_share_list(message=""):
+            # 指定されたタスクが共有されているユーザー一覧を取得
+            self.controller.run_async(
+                task_manager.get_shared_users_by_task(task_id),
+                callback=lambda shared_users: render_share_list(shared_users, message),
+                error_callback=render_share_error,
+            )
+
+        def render_share_list(shared_users, message):
+            # エラー/成功メッセージを更新
+            error_label.configure(text=message, text_color="green")
 
             for widget in list_frame.winfo_children():
                 widget.destroy()
-            try:
-                # 指定されたタスクが共有されているユーザー一覧を取得
-                shared_users = asyncio.run(task_manager.get_shared_users_by_task(task_id))
-                if shared_users:
-                    for user in shared_users:
-                        row = tk.CTkFrame(list_frame)
-                        row.pack(fill="x", pady=2)
-                        # user = (user_id, email, name)
-                        label = tk.CTkLabel(row, text=user[1], anchor="w")  # nameを表示
-                        label.pack(side="left", padx=5)
-                        del_btn = tk.CTkButton(
-                            row,
-                            text="削除",
-                            width=40,
-                            command=lambda uid=user[0]: remove_share(task_id, uid),
-                        )
-                        del_btn.pack(side="right", padx=5)
-                else:
-                    # 共有ユーザーがいない場合
-                    no_share_label = tk.CTkLabel(list_frame, text="まだ誰とも共有していません")
-                    no_share_label.pack(pady=10)
-            except Exception as e:
-                print(f"共有リスト取得エラー: {e}")
-                # list_frame内に一時的なエラーラベルを作成
-                temp_error_label = tk.CTkLabel(list_frame, text="共有リストの取得に失敗しました", text_color="red")
-                temp_error_label.pack(pady=10)
+            if shared_users:
+                for user in shared_users:
+                    row = tk.CTkFrame(list_frame)
+                    row.pack(fill="x", pady=2)
+                    # user = (user_id, email, name)
+                    label = tk.CTkLabel(row, text=user[1], anchor="w")  # nameを表示
+                    label.pack(side="left", padx=5)
+                    del_btn = tk.CTkButton(
+                        row,
+                        text="削除",
+                        width=40,
+                        command=lambda uid=user[0]: remove_share(task_id, uid),
+                    )
+                    del_btn.pack(side="right", padx=5)
+            else:
+                # 共有ユーザーがいない場合
+                no_share_label = tk.CTkLabel(list_frame, text="まだ誰とも共有していません")
+                no_share_label.pack(pady=10)
+
+        def render_share_error(e):
+            print(f"共有リスト取得エラー: {e}")
+            error_label.configure(text="")
+            for widget in list_frame.winfo_children():
+                widget.destroy()
+            # list_frame内に一時的なエラーラベルを作成
+            temp_error_label = tk.CTkLabel(list_frame, text="共有リストの取得に失敗しました", text_color="red")
+            temp_error_label.pack(pady=10)
 
         def remove_share(task_id, user_id):
-            try:
-                # DBから共有を削除
-                asyncio.run(task_manager.unshare(task_id, user_id))
-                error_label.configure(text="共有を解除しました", text_color="green")
-                refresh_share_list()
-            except Exception as e:
+            def on_error(e):
                 print(f"共有解除エラー: {e}")
                 error_label.configure(text="共有の解除に失敗しました", text_color="red")
 
-        refresh_share_list()
-
-    def get_tag_list(self):
-        # DBからタグ一覧取得
-        return asyncio.run(tag_manager.get_by_user(get_current_user_id()))
+            # DBから共有を削除
+            self.controller.run_async(
+                task_manager.unshare(task_id, user_id),
+                callback=lambda _: refresh_share_list(message="共有を解除しました"),
+                error_callback=on_error,
+            )
 
-    def get_shared_tasks(self):
-        user_id = get_current_user_id()
-        # TaskManager.get_shared_with_meはリストを返す
-        shared_tasks = asyncio.run(task_manager.get_shared_with_me(user_id))
-        return shared_tasks
+        refresh_share_list()
 
     def logout(self):
         db_logout()
@@ -0,0 +1,275 @@
+import sys
+from collections import namedtuple
+import customtkinter as tk
+
+# set_itemsで前回の表示内容から変化した件数
+ListDiff = namedtuple("ListDiff", ["inserted", "removed", "moved", "changed"])
+
+
+class VirtualList(tk.CTkFrame):
+    """
+    表示範囲の行だけウィジェットを持つスクロールリスト
+
+    行ウィジェットは表示領域に収まる数だけプールしておき、スクロールに合わせて
+    表示するデータを差し替える（bind_item）。件数が増えてもウィジェット数は一定。
+
+    row_factory(master, height) は行ウィジェットを返す関数で、行ウィジェットは
+    bind_item(item) メソッドを持つこと。
+
+    on_reach_end() を渡すと、末尾付近の行が表示されたときに呼び出される。
+    続きのページを読み込んで append_items で追加するのに使う。
+
+    各itemはkey(item)で識別し、データを差し替えても同じキーで内容が変わらない行は
+    そのまま残す。挿入・削除・並び替え・変更があった行だけを再バインド・移動する。
+    """
+
+    # 末尾から何行以内が表示されたらon_reach_endを呼ぶか
+    REACH_END_MARGIN = 10
+
+    def __init__(self, master, row_factory, row_height=40, key=None, on_reach_end=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self._row_factory = row_factory
+        self._on_reach_end = on_reach_end
+        self._row_height = row_height
+        self._key = key or id
+        self._items = []
+        self._index_by_key = {}
+        self._rows = []
+        self._row_keys = []  # 各行ウィジェットが表示しているitemのキー
+        self._row_items = []  # 各行ウィジェットに現在バインドしているitem
+        self._row_y = []  # 各行ウィジェットの配置位置（未配置はNone）
+        self._offset = 0  # 先頭からのスクロール量
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self._viewport = tk.CTkFrame(self, fg_color="transparent")
+        self._viewport.grid(row=0, column=0, sticky="nsew")
+        self._viewport.bind("<Configure>", lambda e: self._layout())
+
+        self._scrollbar = tk.CTkScrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.grid(row=0, column=1, sticky="ns")
+
+        # ホイール操作はウィジェット単位では拾えないため、全体で受けて自分の配下かを判定する
+        toplevel = self.winfo_toplevel()
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            toplevel.bind_all(sequence, self._on_mouse_wheel, add="+")
+
+    @property
+    def items(self):
+        """表示中のデータのリスト"""
+        return self._items
+
+    def set_items(self, items):
+        """
+        表示するデータを差し替える（スクロール位置はできるだけ維持する）
+
+        前回と同じキーで内容が等しいitemは前回のオブジェクトを使い続けるため、
+        その行ウィジェットは再バインドされない。
+
+        Args:
+            items (list): 1行に1つ対応するデータのリスト
+
+        Returns:
+            ListDiff: 挿入・削除・移動・変更された件数
+        """
+        old_items = self._items
+        old_index = self._index_by_key
+        merged = []
+        index_by_key = {}
+        inserted = changed = 0
+        for item in items:
+            key = self._key(item)
+            if key in old_index:
+                previous = old_items[old_index[key]]
+                if previous == item:
+                    item = previous
+                else:
+                    changed += 1
+            else:
+                inserted += 1
+            index_by_key[key] = len(merged)
+            merged.append(item)
+
+        # 両方に残ったitemの相対順序が変わった数を移動として数える
+        old_order = [key for key in (self._key(item) for item in old_items) if key in index_by_key]
+        new_order = [self._key(item) for item in merged if self._key(item) in old_index]
+        moved = sum(1 for a, b in zip(old_order, new_order) if a != b)
+
+        self._items = merged
+        self._index_by_key = index_by_key
+        self._layout()
+        return ListDiff(inserted, len(old_items) - len(old_order), moved, changed)
+
+    def append_items(self, items):
+        """
+        末尾にitemを追加する（既に同じキーのitemがあれば追加しない）
+
+        Args:
+            items (list): 追加するデータのリスト
+        """
+        for item in items:
+            key = self._key(item)
+            if key in self._index_by_key:
+                continue
+            self._index_by_key[key] = len(self._items)
+            self._items.append(item)
+        self._layout()
+
+    def get_item(self, key):
+        """
+        キーに対応するitemを取得する
+
+        Args:
+            key: itemのキー
+
+        Returns:
+            Any or None: item、存在しない場合はNone
+        """
+        index = self._index_by_key.get(key)
+        return None if index is None else self._items[index]
+
+    def update_item(self, item):
+        """
+        1件のitemだけを差し替える（表示中であればその行だけ再バインドする）
+
+        Args:
+            item: 差し替えるitem（同じキーのitemが存在すること）
+        """
+        index = self._index_by_key.get(self._key(item))
+        if index is None:
+            return
+        self._items[index] = item
+        self._layout()
+
+    def remove_item(self, key):
+        """
+        1件のitemを取り除く（存在しなければ何もしない）
+
+        Args:
+            key: 取り除くitemのキー
+        """
+        index = self._index_by_key.pop(key, None)
+        if index is None:
+            return
+        del self._items[index]
+        for other in self._items[index:]:
+            self._index_by_key[self._key(other)] -= 1
+        self._layout()
+
+    def refresh(self):
+        """表示中の行をすべてデータに再バインドする"""
+        self._row_items = [None] * len(self._rows)
+        self._layout()
+
+    def scroll_to_top(self):
+        """先頭までスクロールする"""
+        self._offset = 0
+        self._layout()
+
+    def scroll_by(self, amount):
+        """
+        指定量だけスクロールする
+
+        Args:
+            amount (float): スクロール量（正の値で下方向）
+        """
+        self._offset += amount
+        self._layout()
+
+    def _viewport_height(self):
+        return self._viewport.winfo_height() / self._get_widget_scaling()
+
+    def _max_offset(self):
+        return max(0, len(self._items) * self._row_height - self._viewport_height())
+
+    def _layout(self):
+        height = self._viewport_height()
+        self._offset = int(min(max(self._offset, 0), self._max_offset()))
+
+        # 表示領域を埋めるのに必要な数まで行ウィジェットを増やす
+        needed = int(height // self._row_height) + 2
+        while len(self._rows) < needed:
+            self._rows.append(self._row_factory(self._viewport, self._row_height))
+            self._row_keys.append(None)
+            self._row_items.append(None)
+            self._row_y.append(None)
+
+        # 表示範囲に入るitemのキー → 配置位置
+        first, shift = divmod(self._offset, self._row_height)
+        wanted = {}
+        for i in range(needed):
+            index = first + i
+            y = i * self._row_height - shift
+            if index >= len(self._items) or y >= height:
+                break
+            wanted[self._key(self._items[index])] = index
+
+        # 同じキーを表示している行ウィジェットはそのまま使い、それ以外を空き行にする
+        free = []
+        for slot, key in enumerate(self._row_keys):
+            if key in wanted:
+                self._place_row(slot, wanted.pop(key), first, shift)
+            else:
+                free.append(slot)
+        for key, index in wanted.items():
+            slot = free.pop()
+            self._row_keys[slot] = key
+            self._place_row(slot, index, first, shift)
+        for slot in free:
+            if self._row_y[slot] is not None:
+                self._rows[slot].place_forget()
+            self._row_keys[slot] = None
+            self._row_items[slot] = None
+            self._row_y[slot] = None
+        self._update_scrollbar(height)
+
+        if self._on_reach_end and first + needed >= len(self._items) - self.REACH_END_MARGIN:
+            self._on_reach_end()
+
+    def _place_row(self, slot, index, first, shift):
+        row = self._rows[slot]
+        item = self._items[index]
+        if self._row_items[slot] is not item:
+            row.bind_item(item)
+            self._row_items[slot] = item
+        y = (index - first) * self._row_height - shift
+        if self._row_y[slot] != y:
+            row.place(x=0, y=y, relwidth=1)
+            self._row_y[slot] = y
+
+    def _update_scrollbar(self, height):
+        total = len(self._items) * self._row_height
+        if total <= height:
+            self._scrollbar.set(0, 1)
+        else:
+            self._scrollbar.set(self._offset / total, (self._offset + height) / total)
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self._offset = float(value) * len(self._items) * self._row_height
+        elif unit == "pages":
+            self._offset += int(value) * self._viewport_height()
+        else:
+            self._offset += int(value) * self._row_height
+        self._layout()
+
+    def _contains(self, widget):
+        while widget is not None:
+            if widget is self:
+                return True
+            widget = getattr(widget, "master", None)
+        return False
+
+    def _on_mouse_wheel(self, event):
+        if isinstance(event.widget, str) or not self._contains(event.widget):
+            return
+        if event.num == 4:
+            steps = -1
+        elif event.num == 5:
+            steps = 1
+        elif sys.platform == "darwin":
+            steps = -event.delta
+        else:
+            steps = -int(event.delta / 120)
+        self.scroll_by(steps * self._row_height)
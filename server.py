@@ -0,0 +1,61 @@
+"""
+GUIを起動せずにTaskManager・TagManager・ReminderManagerを操作するHTTP/JSON APIサーバー
+
+    python server.py --port 8765
+
+1つのイベントループで全接続を処理し、データベースには共有の接続プールを使う。
+"""
+import argparse
+import asyncio
+from config import DB_PATH, DB_POOL_READERS, DB_DURABILITY_PROFILE, API_HOST, API_PORT
+from lib.api import start_server
+from lib.tasks import TaskManager
+from utils.db_init import ensure_schema
+from utils.db_pool import open_pool, close_pool, maintenance_loop
+
+
+async def serve(host=API_HOST, port=API_PORT, db_path=DB_PATH, readers=DB_POOL_READERS,
+                profile=DB_DURABILITY_PROFILE):
+    """
+    スキーマを確認してからAPIサーバーを起動し、停止されるまで処理を続ける
+
+    Args:
+        host (str): 待ち受けるアドレス
+        port (int): 待ち受けるポート
+        db_path (str): データベースファイルのパス
+        readers (int): 読み取り用接続の数
+        profile (str): 接続に設定するPRAGMAのプロファイル名
+    """
+    ensure_schema(db_path)
+    await open_pool(db_path, readers, profile)
+    server = await start_server(host, port)
+    maintenance = asyncio.create_task(maintenance_loop())
+    for sock in server.sockets:
+        print(f"Serving todo API on http://{sock.getsockname()[0]}:{sock.getsockname()[1]}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        maintenance.cancel()
+        try:
+            await TaskManager.flush()
+        finally:
+            await close_pool()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="todo.db を操作するHTTP/JSON APIサーバー")
+    parser.add_argument("--host", default=API_HOST, help="待ち受けるアドレス")
+    parser.add_argument("--port", type=int, default=API_PORT, help="待ち受けるポート")
+    parser.add_argument("--db", default=DB_PATH, help="データベースファイルのパス")
+    parser.add_argument("--readers", type=int, default=DB_POOL_READERS, help="読み取り用接続の数")
+    parser.add_argument("--profile", default=DB_DURABILITY_PROFILE, help="PRAGMAのプロファイル名")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.db, args.readers, args.profile))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+
+
+class AsyncRunner:
+    """
+    バックグラウンドスレッドで1つのイベントループを動かし続けるランナー
+
+    UIスレッドから呼び出すたびにasyncio.runでイベントループを作り直す代わりに、
+    コルーチンをこのループへ投入してconcurrent.futures.Futureを受け取る。
+    """
+
+    def __init__(self, name="async-runner"):
+        self._name = name
+        self._loop = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    @property
+    def loop(self):
+        """ランナーが動かしているイベントループ"""
+        return self._loop
+
+    @property
+    def is_running(self):
+        """ランナーが起動中かどうか"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        イベントループ用のスレッドを起動する（起動済みなら何もしない）
+
+        Returns:
+            AsyncRunner: 自分自身
+        """
+        if self.is_running:
+            return self
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            # 残っているタスクを片付けてからループを閉じる
+            pending = asyncio.all_tasks(self._loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                self._loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self._loop.close()
+
+    def submit(self, coro):
+        """
+        コルーチンをイベントループへ投入する
+
+        Args:
+            coro (coroutine): 実行するコルーチン
+
+        Returns:
+            concurrent.futures.Future: 実行結果を受け取るFuture
+        """
+        if not self.is_running:
+            coro.close()
+            raise RuntimeError("AsyncRunner is not running")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro, timeout=None):
+        """
+        コルーチンを投入し、完了するまで待って結果を返す
+
+        Args:
+            coro (coroutine): 実行するコルーチン
+            timeout (float, optional): 待機する最大秒数
+
+        Returns:
+            Any: コルーチンの戻り値
+        """
+        return self.submit(coro).result(timeout)
+
+    def stop(self, timeout=5):
+        """
+        イベントループを停止し、スレッドの終了を待つ
+
+        Args:
+            timeout (float): スレッド終了を待つ最大秒数
+        """
+        if not self.is_running:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
@@ -1,24 +1,62 @@
-import aiosqlite
-import bcrypt
+import asyncio
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import DB_PATH
+from config import BCRYPT_ROUNDS, BCRYPT_WORKERS
+from utils.db_pool import reader, writer
+from utils.metrics import instrument_module
 import re
 
-async def encryption(password):
+# bcryptの計算はGILを解放するため、スレッドプールで実行してイベントループを止めない
+_hash_executor = None
+_hash_executor_lock = threading.Lock()
+
+def _get_hash_executor():
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is None:
+            _hash_executor = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+        return _hash_executor
+
+async def _run_hash(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(_get_hash_executor(), partial(func, *args))
+
+async def encryption(password, rounds=BCRYPT_ROUNDS):
     """
     パスワードをハッシュ化する
     
     Args:
         password (str): ハッシュ化するパスワード
+        rounds (int): bcryptのコスト（ストレッチング回数は2のrounds乗）
         
     Returns:
         bytes: ハッシュ化されたパスワード
     """
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed
+    # bcryptはパスワードを扱うときにだけ読み込む（起動時間を短くするため）
+    import bcrypt
+    salt = bcrypt.gensalt(rounds)
+    return await _run_hash(bcrypt.hashpw, password.encode('utf-8'), salt)
+
+def password_needs_rehash(stored_password, rounds=BCRYPT_ROUNDS):
+    """
+    保存されているハッシュのコストが設定値と異なるかを判定する
+    
+    Args:
+        stored_password (bytes): ハッシュ化されて保存されているパスワード（$2b$12$... 形式）
+        rounds (int): 現在のbcryptのコスト設定
+        
+    Returns:
+        bool: 設定値のコストで作り直すべき場合True
+    """
+    if isinstance(stored_password, str):
+        stored_password = stored_password.encode('utf-8')
+    try:
+        return int(stored_password.split(b"$")[2]) != rounds
+    except (IndexError, ValueError):
+        return True
 
 def validate_email(email):
     """
@@ -51,11 +89,11 @@ async def create_user(name, email, password):
     Returns:
         None
     """
-    hashed_password = await encryption(password)
     # validate email format
     if not validate_email(email):
         raise ValueError("Invalid email format")
-    async with aiosqlite.connect(DB_PATH) as conn:
+    hashed_password = await encryption(password)
+    async with writer() as conn:
         await conn.execute(
             "INSERT INTO users (name, email, password) VALUES (?, ?, ?)",
             (name, email, hashed_password)
@@ -72,7 +110,7 @@ async def get_user_by_email(email):
     Returns:
         tuple or None: ユーザー情報のタプル（id, name, email, password）、見つからない場合はNone
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with reader() as conn:
         cursor = await conn.execute("SELECT * FROM users WHERE email = ?", (email,))
         return await cursor.fetchone()
     
@@ -86,7 +124,7 @@ async def get_user_by_id(user_id):
     Returns:
         tuple or None: ユーザー情報のタプル（id, name, email, password）、見つからない場合はNone
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with reader() as conn:
         cursor = await conn.execute("SELECT * FROM users WHERE id = ?", (user_id,))
         return await cursor.fetchone()
 
@@ -101,7 +139,28 @@ async def verify_password(stored_password, provided_password):
     Returns:
         bool: パスワードが一致する場合True、一致しない場合False
     """
-    return bcrypt.checkpw(provided_password.encode('utf-8'), stored_password)
+    if isinstance(stored_password, str):
+        stored_password = stored_password.encode('utf-8')
+    import bcrypt
+    return await _run_hash(bcrypt.checkpw, provided_password.encode('utf-8'), stored_password)
+
+async def update_user_password_hash(user_id, hashed_password):
+    """
+    ユーザーの保存済みパスワードハッシュを置き換える
+    
+    Args:
+        user_id (int): ユーザーID
+        hashed_password (bytes): 新しいパスワードハッシュ
+        
+    Returns:
+        None
+    """
+    async with writer() as conn:
+        await conn.execute(
+            "UPDATE users SET password = ? WHERE id = ?",
+            (hashed_password, user_id)
+        )
+        await conn.commit()
 
 async def auth_user(email, password):
     """
@@ -116,6 +175,11 @@ async def auth_user(email, password):
     """
     user = await get_user_by_email(email)
     if user and await verify_password(user[3], password):
+        # コスト設定が変わっていれば、平文が手元にあるこの機会にハッシュを作り直す
+        if password_needs_rehash(user[3]):
+            hashed_password = await encryption(password)
+            await update_user_password_hash(user[0], hashed_password)
+            user = user[:3] + (hashed_password,) + user[4:]
         return user
     return False
 
@@ -129,7 +193,7 @@ async def get_tags_by_user(user_id=None):
     Returns:
         list: タグ情報のタプルのリスト
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with reader() as conn:
         if user_id is None:
             cursor = await conn.execute("SELECT * FROM tags")
         else:
@@ -149,15 +213,16 @@ async def create_task(user_id, name, description=None, tag=None, deadline=None,
         priority (int, optional): 優先度。デフォルトは0
         
     Returns:
-        None
+        int: 作成したタスクのID
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
-        await conn.execute(
+    async with writer() as conn:
+        cursor = await conn.execute(
             """INSERT INTO tasks (user, name, description, tag, deadline, priority)
                VALUES (?, ?, ?, ?, ?, ?)""",
             (user_id, name, description, tag, deadline, priority)
         )
         await conn.commit()
+        return cursor.lastrowid
 
 async def get_tasks_by_user(user_id=None):
     """
@@ -169,13 +234,79 @@ async def get_tasks_by_user(user_id=None):
     Returns:
         list: タスク情報のタプルのリスト
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with reader() as conn:
         if user_id is None:
             cursor = await conn.execute("SELECT * FROM tasks")
         else:
             cursor = await conn.execute("SELECT * FROM tasks WHERE user = ?", (user_id,))
         return await cursor.fetchall()
 
+# タスクにタグ名・タグ色を結合して取得するための列とFROM句
+# 行の末尾に tag_name（インデックス12）, tag_color（インデックス13）が追加される
+TASK_WITH_TAG_COLUMNS = "tasks.*, tags.name AS tag_name, tags.color AS tag_color"
+TASK_WITH_TAG_FROM = "tasks LEFT JOIN tags ON tags.id = tasks.tag"
+
+async def get_tasks_with_tags_by_user(user_id=None, limit=None):
+    """
+    タグ名・タグ色付きのタスク一覧を1回のクエリで取得する
+    
+    Args:
+        user_id (int, optional): 取得するユーザーのID。Noneの場合は全ユーザーのタスクを取得
+        limit (int, optional): 取得する最大件数。Noneの場合は全件
+        
+    Returns:
+        list: タスク情報の末尾にtag_name, tag_colorを加えたタプルのリスト
+    """
+    query = f"SELECT {TASK_WITH_TAG_COLUMNS} FROM {TASK_WITH_TAG_FROM}"
+    params = []
+    if user_id is not None:
+        query += " WHERE tasks.user = ?"
+        params.append(user_id)
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    async with reader() as conn:
+        cursor = await conn.execute(query, params)
+        return await cursor.fetchall()
+
+async def get_tasks_with_tags_by_ids(task_ids):
+    """
+    複数のタスクIDでタグ名・タグ色付きのタスク情報をまとめて取得する
+    
+    Args:
+        task_ids (list): 取得するタスクIDのリスト
+        
+    Returns:
+        list: タスク情報の末尾にtag_name, tag_colorを加えたタプルのリスト（存在しないIDは含まれない）
+    """
+    task_ids = list(task_ids)
+    if not task_ids:
+        return []
+    placeholders = ", ".join("?" for _ in task_ids)
+    async with reader() as conn:
+        cursor = await conn.execute(
+            f"SELECT {TASK_WITH_TAG_COLUMNS} FROM {TASK_WITH_TAG_FROM} WHERE tasks.id IN ({placeholders})",
+            task_ids
+        )
+        return await cursor.fetchall()
+
+async def get_task_with_tag_by_id(task_id):
+    """
+    タスクIDでタグ名・タグ色付きのタスク情報を取得する
+    
+    Args:
+        task_id (int): 取得するタスクのID
+        
+    Returns:
+        tuple or None: タスク情報の末尾にtag_name, tag_colorを加えたタプル、見つからない場合はNone
+    """
+    async with reader() as conn:
+        cursor = await conn.execute(
+            f"SELECT {TASK_WITH_TAG_COLUMNS} FROM {TASK_WITH_TAG_FROM} WHERE tasks.id = ?",
+            (task_id,)
+        )
+        return await cursor.fetchone()
+
 async def mark_task_done(task_id):
     """
     タスクを完了状態にする
@@ -186,7 +317,7 @@ async def mark_task_done(task_id):
     Returns:
         None
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with writer() as conn:
         await conn.execute(
             "UPDATE tasks SET is_done = 1, completed_at = CURRENT_TIMESTAMP WHERE id = ?",
             (task_id,)
@@ -204,7 +335,7 @@ async def share_task(task_id, user_id):
     Returns:
         None
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with writer() as conn:
         await conn.execute(
             "INSERT INTO task_shares (task_id, user_id) VALUES (?, ?)",
             (task_id, user_id)
@@ -221,7 +352,7 @@ async def get_shared_tasks(user_id):
     Returns:
         list: 共有されたタスク情報のタプルのリスト
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with reader() as conn:
         cursor = await conn.execute(
             """SELECT tasks.* FROM tasks
                JOIN task_shares ON tasks.id = task_shares.task_id
@@ -230,6 +361,25 @@ async def get_shared_tasks(user_id):
         )
         return await cursor.fetchall()
 
+async def get_shared_tasks_with_tags(user_id):
+    """
+    指定ユーザーが他ユーザーから共有されたタスク一覧をタグ名・タグ色付きで取得する
+    
+    Args:
+        user_id (int): 共有されたタスクを取得するユーザーのID
+        
+    Returns:
+        list: 共有されたタスク情報の末尾にtag_name, tag_colorを加えたタプルのリスト
+    """
+    async with reader() as conn:
+        cursor = await conn.execute(
+            f"""SELECT {TASK_WITH_TAG_COLUMNS} FROM {TASK_WITH_TAG_FROM}
+               JOIN task_shares ON tasks.id = task_shares.task_id
+               WHERE task_shares.user_id = ?""",
+            (user_id,)
+        )
+        return await cursor.fetchall()
+
 async def get_shared_tasks_by_user(user_id):
     """
     指定ユーザーが他ユーザーに共有したタスク一覧を取得する
@@ -240,7 +390,7 @@ async def get_shared_tasks_by_user(user_id):
     Returns:
         list: 共有したタスク情報と共有先ユーザーIDのタプルのリスト（shared_withカラム含む）
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with reader() as conn:
         cursor = await conn.execute(
             """
             SELECT tasks.*, task_shares.user_id AS shared_with
@@ -263,7 +413,7 @@ async def get_shared_task_by_id(task_id, user_id):
     Returns:
         tuple or None: タスク情報のタプル、見つからない場合はNone
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with reader() as conn:
         cursor = await conn.execute(
             """SELECT tasks.* FROM tasks
                JOIN task_shares ON tasks.id = task_shares.task_id
@@ -282,14 +432,62 @@ async def delete_task(task_id):
     Returns:
         None
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
-        # タスク共有も削除
+    async with writer() as conn:
+        # タスク共有・リマインダーも削除
         await conn.execute("DELETE FROM task_shares WHERE task_id = ?", (task_id,))
+        await conn.execute("DELETE FROM reminders WHERE task_id = ?", (task_id,))
         # タスク削除
         await conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
         await conn.commit()
 
-async def update_task(task_id, name=None, description=None, tag=None, deadline=None, priority=None, is_done=None):
+# update_task の clear で NULL に戻せるフィールド
+TASK_CLEARABLE_FIELDS = ("description", "tag", "deadline")
+
+def _build_task_updates(name=None, description=None, tag=None, deadline=None, priority=None, is_done=None,
+                        clear=()):
+    """
+    タスク更新用のSET句の要素とパラメータを組み立てる（Noneのフィールドは更新しない）
+
+    clear に指定したフィールドは NULL にする（TASK_CLEARABLE_FIELDS のみ）。
+
+    Returns:
+        tuple: (SET句の要素のリスト, パラメータのリスト)
+    """
+    updates = []
+    params = []
+    for field in clear:
+        if field not in TASK_CLEARABLE_FIELDS:
+            raise ValueError(f"Cannot clear field: {field}")
+        updates.append(f"{field} = NULL")
+    
+    if name is not None:
+        updates.append("name = ?")
+        params.append(name)
+    if description is not None:
+        updates.append("description = ?")
+        params.append(description)
+    if tag is not None:
+        updates.append("tag = ?")
+        params.append(tag)
+    if deadline is not None:
+        updates.append("deadline = ?")
+        params.append(deadline)
+    if priority is not None:
+        updates.append("priority = ?")
+        params.append(priority)
+    if is_done is not None:
+        updates.append("is_done = ?")
+        params.append(1 if is_done else 0)
+        if is_done:
+            updates.append("completed_at = CURRENT_TIMESTAMP")
+        else:
+            updates.append("completed_at = NULL")
+    if updates:
+        updates.append("updated_at = CURRENT_TIMESTAMP")
+    return updates, params
+
+async def update_task(task_id, name=None, description=None, tag=None, deadline=None, priority=None, is_done=None,
+                      clear=()):
     """
     タスク情報を更新する
     
@@ -301,81 +499,298 @@ async def update_task(task_id, name=None, description=None, tag=None, deadline=N
         deadline (datetime, optional): 新しい締め切り日時
         priority (int, optional): 新しい優先度
         is_done (bool, optional): 完了状態（True: 完了済み, False: 未完了）
+        clear (tuple, optional): NULLにするフィールド名（description, tag, deadline）
     Returns:
         None
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
-        # 更新するフィールドを動的に構築
-        updates = []
-        params = []
-        
-        if name is not None:
-            updates.append("name = ?")
-            params.append(name)
-        if description is not None:
-            updates.append("description = ?")
-            params.append(description)
-        if tag is not None:
-            updates.append("tag = ?")
-            params.append(tag)
-        if deadline is not None:
-            updates.append("deadline = ?")
-            params.append(deadline)
-        if priority is not None:
-            updates.append("priority = ?")
-            params.append(priority)
-        if is_done is not None:
-            updates.append("is_done = ?")
-            params.append(1 if is_done else 0)
-            if is_done:
-                updates.append("completed_at = CURRENT_TIMESTAMP")
-            else:
-                updates.append("completed_at = NULL")
-        if updates:
-            updates.append("updated_at = CURRENT_TIMESTAMP")
-            params.append(task_id)
-            query = f"UPDATE tasks SET {', '.join(updates)} WHERE id = ?"
+    # 更新するフィールドを動的に構築
+    updates, params = _build_task_updates(name, description, tag, deadline, priority, is_done, clear)
+    if updates:
+        params.append(task_id)
+        query = f"UPDATE tasks SET {', '.join(updates)} WHERE id = ?"
+        async with writer() as conn:
             await conn.execute(query, params)
             await conn.commit()
 
-async def search_tasks(user_id=None, keyword=None, tag_id=None, is_done=None, priority=None):
+async def create_tasks_many(user_id, tasks):
+    """
+    複数のタスクを1つのトランザクションでまとめて作成する
+    
+    Args:
+        user_id (int): タスクを作成するユーザーのID
+        tasks (list): 各タスクの辞書（name必須, description, tag, deadline, priorityは省略可）のリスト
+        
+    Returns:
+        int: 作成したタスクの数
+    """
+    rows = [
+        (user_id, task["name"], task.get("description"), task.get("tag"),
+         task.get("deadline"), task.get("priority", 0))
+        for task in tasks
+    ]
+    if not rows:
+        return 0
+    async with writer() as conn:
+        await conn.executemany(
+            """INSERT INTO tasks (user, name, description, tag, deadline, priority)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            rows
+        )
+        await conn.commit()
+    return len(rows)
+
+async def update_tasks_many(updates):
+    """
+    複数のタスクを1つのトランザクションでまとめて更新する
+
+    更新するフィールドの組み合わせが同じタスクごとに1つのUPDATE文へまとめて実行する。
+    
+    Args:
+        updates (list): (タスクID, 更新するフィールドの辞書) のリスト。
+            辞書のキーはupdate_taskの引数（name, description, tag, deadline, priority, is_done, clear）
+        
+    Returns:
+        int: 更新対象にしたタスクの数
+    """
+    groups = {}
+    for task_id, fields in updates:
+        set_clause, params = _build_task_updates(**fields)
+        if set_clause:
+            query = f"UPDATE tasks SET {', '.join(set_clause)} WHERE id = ?"
+            groups.setdefault(query, []).append((*params, task_id))
+    if not groups:
+        return 0
+    async with writer() as conn:
+        for query, rows in groups.items():
+            await conn.executemany(query, rows)
+        await conn.commit()
+    return sum(len(rows) for rows in groups.values())
+
+async def delete_tasks_many(task_ids):
+    """
+    複数のタスクを1つのトランザクションでまとめて削除する（共有・リマインダーも削除）
+    
+    Args:
+        task_ids (list): 削除するタスクIDのリスト
+        
+    Returns:
+        int: 削除対象にしたタスクの数
+    """
+    rows = [(task_id,) for task_id in task_ids]
+    if not rows:
+        return 0
+    async with writer() as conn:
+        await conn.executemany("DELETE FROM task_shares WHERE task_id = ?", rows)
+        await conn.executemany("DELETE FROM reminders WHERE task_id = ?", rows)
+        await conn.executemany("DELETE FROM tasks WHERE id = ?", rows)
+        await conn.commit()
+    return len(rows)
+
+async def set_tasks_done_many(task_ids, is_done=True):
+    """
+    複数のタスクの完了状態を1つのトランザクションでまとめて変更する
+    
+    Args:
+        task_ids (list): 対象のタスクIDのリスト
+        is_done (bool): 完了状態（True: 完了済み, False: 未完了）
+        
+    Returns:
+        int: 更新対象にしたタスクの数
+    """
+    return await update_tasks_many([(task_id, {"is_done": is_done}) for task_id in task_ids])
+
+# trigramトークナイザで索引を引ける最小の文字数
+FTS_MIN_TERM_LENGTH = 3
+
+def build_fts_query(keyword):
+    """
+    検索キーワードをFTS5のMATCH式と、索引を使えない短い語に分ける
+
+    空白区切りの各語をAND条件で扱う。末尾の「*」（前方一致指定）は取り除く。
+    trigramは部分一致で引けるため、前方一致もそのまま含まれる。
+
+    Args:
+        keyword (str): 検索キーワード
+
+    Returns:
+        tuple: (MATCH式 または None, 3文字未満のためLIKEで絞り込む語のリスト)
+    """
+    fts_terms = []
+    short_terms = []
+    for term in keyword.split():
+        term = term.rstrip("*")
+        if not term:
+            continue
+        if len(term) >= FTS_MIN_TERM_LENGTH:
+            fts_terms.append('"' + term.replace('"', '""') + '"')
+        else:
+            short_terms.append(term)
+    match = " AND ".join(fts_terms) if fts_terms else None
+    return match, short_terms
+
+async def search_tasks(user_id=None, keyword=None, tag_id=None, is_done=None, priority=None, with_tags=False):
     """
     タスクを検索する
+
+    キーワードはtasks_fts（FTS5, trigram）で検索し、関連度（bm25）順に並べる。
+    3文字未満の語だけはLIKEで絞り込む。
     
     Args:
         user_id (int, optional): 検索するユーザーのID。Noneの場合は全ユーザーのタスクを検索
-        keyword (str, optional): タスク名や詳細に含まれるキーワード
+        keyword (str, optional): タスク名や詳細に含まれるキーワード（空白区切りでAND検索）
         tag_id (int, optional): 特定のタグID
         is_done (bool, optional): 完了状態（True: 完了済み, False: 未完了）
         priority (int, optional): 特定の優先度
+        with_tags (bool, optional): Trueの場合は末尾にtag_name, tag_colorを結合して返す
         
     Returns:
         list: 検索条件に一致するタスク情報のタプルのリスト
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
-        if user_id is None:
-            query = "SELECT * FROM tasks WHERE 1=1"
-            params = []
+    columns = TASK_WITH_TAG_COLUMNS if with_tags else "tasks.*"
+    tag_join = " LEFT JOIN tags ON tags.id = tasks.tag" if with_tags else ""
+    match, short_terms = build_fts_query(keyword) if keyword else (None, [])
+    async with reader() as conn:
+        if match:
+            query = f"""SELECT {columns} FROM tasks_fts
+                       JOIN tasks ON tasks.id = tasks_fts.rowid{tag_join}
+                       WHERE tasks_fts MATCH ?"""
+            params = [match]
         else:
-            query = "SELECT * FROM tasks WHERE user = ?"
-            params = [user_id]
+            query = f"SELECT {columns} FROM tasks{tag_join} WHERE 1=1"
+            params = []
+        if user_id is not None:
+            query += " AND tasks.user = ?"
+            params.append(user_id)
         
-        if keyword:
-            query += " AND (name LIKE ? OR description LIKE ?)"
-            params.extend([f"%{keyword}%", f"%{keyword}%"])
+        for term in short_terms:
+            query += " AND (tasks.name LIKE ? OR tasks.description LIKE ?)"
+            params.extend([f"%{term}%", f"%{term}%"])
         if tag_id is not None:
-            query += " AND tag = ?"
+            query += " AND tasks.tag = ?"
             params.append(tag_id)
         if is_done is not None:
-            query += " AND is_done = ?"
+            query += " AND tasks.is_done = ?"
             params.append(1 if is_done else 0)
         if priority is not None:
-            query += " AND priority = ?"
+            query += " AND tasks.priority = ?"
             params.append(priority)
+        if match:
+            query += " ORDER BY bm25(tasks_fts)"
             
         cursor = await conn.execute(query, params)
         return await cursor.fetchall()
 
+# query_tasksで指定できる並び順と、そのソートキーになる式
+# 締切なしのタスクは昇順で最後、降順で最初に並ぶ
+# 優先度なし（NULL）のタスクは優先度0として並べる（カーソルにNULLが入るとそこで続きが読めなくなるため）
+TASK_SORT_EXPRESSIONS = {
+    "created_at": "tasks.created_at",
+    "deadline": "COALESCE(tasks.deadline, '9999-12-31 23:59:59')",
+    "priority": "COALESCE(tasks.priority, 0)",
+    "name": "tasks.name COLLATE NOCASE",
+}
+
+def build_task_query(user_id=None, keyword=None, tag_id=None, is_done=None, priority=None,
+                     deadline_from=None, deadline_to=None, shared_with=None,
+                     sort_by="created_at", order="ASC", limit=None, cursor=None):
+    """
+    query_tasks が実行するSQLとパラメータを組み立てる（utils/query_plan.py の確認にも使う）
+
+    引数は query_tasks と同じ。
+
+    Returns:
+        tuple: (SQL, パラメータのリスト)。SQLの末尾の列はソートキー（sort_key）
+    """
+    # SQLインジェクション対策でソートキーと順序を検証
+    sort_expression = TASK_SORT_EXPRESSIONS.get(sort_by, TASK_SORT_EXPRESSIONS["created_at"])
+    order = "DESC" if str(order).upper() == "DESC" else "ASC"
+
+    query = f"SELECT {TASK_WITH_TAG_COLUMNS}, {sort_expression} AS sort_key FROM {TASK_WITH_TAG_FROM} WHERE 1=1"
+    params = []
+    if user_id is not None:
+        query += " AND tasks.user = ?"
+        params.append(user_id)
+    if shared_with is not None:
+        query += " AND tasks.id IN (SELECT task_id FROM task_shares WHERE user_id = ?)"
+        params.append(shared_with)
+    if keyword:
+        match, short_terms = build_fts_query(keyword)
+        if match:
+            query += " AND tasks.id IN (SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ?)"
+            params.append(match)
+        for term in short_terms:
+            query += " AND (tasks.name LIKE ? OR tasks.description LIKE ?)"
+            params.extend([f"%{term}%", f"%{term}%"])
+    if tag_id is not None:
+        query += " AND tasks.tag = ?"
+        params.append(tag_id)
+    if is_done is not None:
+        query += " AND tasks.is_done = ?"
+        params.append(1 if is_done else 0)
+    if priority is not None:
+        query += " AND tasks.priority = ?"
+        params.append(priority)
+    if deadline_from is not None:
+        query += " AND tasks.deadline >= ?"
+        params.append(deadline_from)
+    if deadline_to is not None:
+        query += " AND tasks.deadline <= ?"
+        params.append(deadline_to)
+    if cursor is not None:
+        # 行値の比較だけでは式インデックス（deadline, name）の範囲検索にならないため、
+        # 同じ意味になるソートキー単独の条件も付けてインデックスで続きの位置から読む
+        query += (f" AND {sort_expression} {'<=' if order == 'DESC' else '>='} ?"
+                  f" AND ({sort_expression}, tasks.id) {'<' if order == 'DESC' else '>'} (?, ?)")
+        params.extend([cursor[0], *cursor])
+    query += f" ORDER BY {sort_expression} {order}, tasks.id {order}"
+    if limit is not None:
+        # 次のページがあるかを判定するため1件多く取得する
+        query += " LIMIT ?"
+        params.append(limit + 1)
+    return query, params
+
+async def query_tasks(user_id=None, keyword=None, tag_id=None, is_done=None, priority=None,
+                      deadline_from=None, deadline_to=None, shared_with=None,
+                      sort_by="created_at", order="ASC", limit=None, cursor=None):
+    """
+    条件・並び順・ページ指定をまとめて1つのSQLでタスクを取得する
+
+    並び順は (ソートキー, タスクID) で一意に決まり、前ページの最後の行を
+    cursorとして渡すとその続きから取得する（キーセットページング）。
+    
+    Args:
+        user_id (int, optional): タスクの所有ユーザーID
+        keyword (str, optional): タスク名や詳細に含まれるキーワード（tasks_ftsで検索）
+        tag_id (int, optional): 特定のタグID
+        is_done (bool, optional): 完了状態（True: 完了済み, False: 未完了）
+        priority (int, optional): 特定の優先度
+        deadline_from (str, optional): この日時以降が締切のタスクに絞る
+        deadline_to (str, optional): この日時以前が締切のタスクに絞る
+        shared_with (int, optional): このユーザーに共有されたタスクに絞る
+        sort_by (str): ソートキー（created_at, deadline, priority, name）
+        order (str): ソート順（ASC: 昇順, DESC: 降順）
+        limit (int, optional): 1ページの最大件数。Noneの場合は全件
+        cursor (list, optional): 前ページが返した次ページ用カーソル
+        
+    Returns:
+        tuple: (タグ名・タグ色付きタスクのタプルのリスト, 次ページ用カーソル または None)
+    """
+    query, params = build_task_query(
+        user_id, keyword, tag_id, is_done, priority, deadline_from, deadline_to, shared_with,
+        sort_by, order, limit, cursor,
+    )
+
+    async with reader() as conn:
+        cursor_ = await conn.execute(query, params)
+        rows = await cursor_.fetchall()
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = [rows[-1][-1], rows[-1][0]]
+    # 末尾のsort_key列は呼び出し側に返さない
+    return [row[:-1] for row in rows], next_cursor
+
 async def get_tasks_sorted(user_id=None, sort_by="created_at", order="ASC"):
     """
     ソート済みのタスク一覧を取得する
@@ -388,7 +803,7 @@ async def get_tasks_sorted(user_id=None, sort_by="created_at", order="ASC"):
     Returns:
         list: ソート済みタスク情報のタプルのリスト
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with reader() as conn:
         # SQLインジェクション対策でカラム名を検証
         allowed_columns = ["created_at", "deadline", "priority", "name", "is_done"]
         if sort_by not in allowed_columns:
@@ -414,7 +829,7 @@ async def mark_task_undone(task_id):
     Returns:
         None
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with writer() as conn:
         await conn.execute(
             "UPDATE tasks SET is_done = 0, completed_at = NULL WHERE id = ?",
             (task_id,)
@@ -433,7 +848,7 @@ async def get_tasks_by_deadline(user_id=None, start_date=None, end_date=None):
     Returns:
         list: 指定期間内の締め切りがあるタスク情報のタプルのリスト
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with reader() as conn:
         if user_id is None:
             query = "SELECT * FROM tasks WHERE deadline IS NOT NULL"
             params = []
@@ -462,7 +877,7 @@ async def get_task_by_id(task_id):
     Returns:
         tuple or None: タスク情報のタプル、見つからない場合はNone
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with reader() as conn:
         cursor = await conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
         return await cursor.fetchone()
 
@@ -476,7 +891,7 @@ async def get_shared_users_by_task(task_id):
     Returns:
         list: 共有先ユーザー情報のリスト（user_id, email, nameの順）
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with reader() as conn:
         cursor = await conn.execute(
             """
             SELECT users.id, users.email, users.name
@@ -499,7 +914,7 @@ async def unshare_task(task_id, user_id=None):
     Returns:
         None
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with writer() as conn:
         if user_id:
             await conn.execute(
                 "DELETE FROM task_shares WHERE task_id = ? AND user_id = ?",
@@ -522,14 +937,15 @@ async def create_tag(user_id, name, color=None):
         color (str, optional): タグの色。デフォルトはNone
         
     Returns:
-        None
+        int: 作成したタグのID
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
-        await conn.execute(
+    async with writer() as conn:
+        cursor = await conn.execute(
             "INSERT INTO tags (user, name, color) VALUES (?, ?, ?)",
             (user_id, name, color)
         )
         await conn.commit()
+        return cursor.lastrowid
 
 async def delete_tag(tag_id):
     """
@@ -541,7 +957,7 @@ async def delete_tag(tag_id):
     Returns:
         None
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with writer() as conn:
         # タグを使用しているタスクのタグをNULLに設定
         await conn.execute("UPDATE tasks SET tag = NULL WHERE tag = ?", (tag_id,))
         # タグ削除
@@ -558,7 +974,7 @@ async def get_tag_by_id(tag_id):
     Returns:
         tuple or None: タグ情報のタプル、見つからない場合はNone
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with reader() as conn:
         cursor = await conn.execute("SELECT * FROM tags WHERE id = ?", (tag_id,))
         return await cursor.fetchone()
     
@@ -571,14 +987,15 @@ async def reminder_create(task_id, remind_at):
         remind_at (datetime): リマインド日時
         
     Returns:
-        None
+        int: 作成したリマインダーのID
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
-        await conn.execute(
+    async with writer() as conn:
+        cursor = await conn.execute(
             "INSERT INTO reminders (task_id, remind_at) VALUES (?, ?)",
             (task_id, remind_at)
         )
         await conn.commit()
+        return cursor.lastrowid
 
 async def get_upcoming_reminders(current_time):
     """
@@ -590,7 +1007,7 @@ async def get_upcoming_reminders(current_time):
     Returns:
         list: 指定日時以降のリマインダー情報のタプルのリスト
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with reader() as conn:
         cursor = await conn.execute(
             "SELECT * FROM reminders WHERE remind_at >= ? ORDER BY remind_at ASC",
             (current_time,)
@@ -607,7 +1024,7 @@ async def delete_reminder(reminder_id):
     Returns:
         None
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with writer() as conn:
         await conn.execute("DELETE FROM reminders WHERE id = ?", (reminder_id,))
         await conn.commit()
 
@@ -621,7 +1038,7 @@ async def get_reminders_by_user(user_id=None):
     Returns:
         list: リマインダー情報のタプルのリスト
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with reader() as conn:
         if user_id is None:
             query = """
             SELECT reminders.* FROM reminders
@@ -637,6 +1054,31 @@ async def get_reminders_by_user(user_id=None):
             cursor = await conn.execute(query, (user_id,))
         return await cursor.fetchall()
 
+async def get_pending_reminders(user_id=None):
+    """
+    未送信のリマインダーをリマインド日時の早い順に取得する
+    
+    Args:
+        user_id (int, optional): タスクの所有ユーザーID。Noneの場合は全ユーザーのリマインダーを取得
+        
+    Returns:
+        list: リマインダー情報のタプルのリスト
+    """
+    query = """
+    SELECT reminders.* FROM reminders
+    JOIN tasks ON reminders.task_id = tasks.id
+    WHERE reminders.is_sent = 0
+    """
+    params = []
+    if user_id is not None:
+        query += " AND tasks.user = ?"
+        params.append(user_id)
+    query += " ORDER BY reminders.remind_at ASC"
+
+    async with reader() as conn:
+        cursor = await conn.execute(query, params)
+        return await cursor.fetchall()
+
 async def get_reminder_by_id(reminder_id):
     """
     リマインダーIDで特定のリマインダー情報を取得する
@@ -647,7 +1089,7 @@ async def get_reminder_by_id(reminder_id):
     Returns:
         tuple or None: リマインダー情報のタプル、見つからない場合はNone
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with reader() as conn:
         cursor = await conn.execute("SELECT * FROM reminders WHERE id = ?", (reminder_id,))
         return await cursor.fetchone()
 
@@ -662,7 +1104,7 @@ async def update_reminder(reminder_id, remind_at=None):
     Returns:
         None
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with writer() as conn:
         updates = []
         params = []
         
@@ -691,7 +1133,7 @@ async def get_reminders_by_task(task_id):
 
     query = f"SELECT * FROM reminders WHERE task_id = ?"
 
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with reader() as conn:
         cursor = await conn.execute(query, (task_id,))
         return await cursor.fetchall()
 
@@ -705,9 +1147,12 @@ async def done_reminder(reminder_id):
     Returns:
         None
     """
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with writer() as conn:
         await conn.execute(
             "UPDATE reminders SET is_sent = 1 WHERE id = ?",
             (reminder_id,)
         )
-        await conn.commit()
\ No newline at end of file
+        await conn.commit()
+
+# このモジュールのすべてのデータベース関数を計測対象にする（utils/metrics.py）
+instrument_module(sys.modules[__name__])
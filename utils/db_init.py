@@ -1,67 +1,218 @@
-import aiosqlite
-import asyncio
 import os
+import sqlite3
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import DB_PATH
 
-async def init_db():
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL
-        );
-        """)
-        await db.execute("""
-        CREATE TABLE IF NOT EXISTS tags (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user INTEGER NOT NULL,
-            name TEXT NOT NULL,
-            color TEXT,
-            FOREIGN KEY(user) REFERENCES users(id),
-            UNIQUE(user, name)
-        );
-        """)
-        await db.execute("""
-        CREATE TABLE IF NOT EXISTS tasks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user INTEGER NOT NULL,
-            shared_with TEXT,
-            is_done INTEGER DEFAULT 0,
-            name TEXT NOT NULL,
-            description TEXT,
-            tag INTEGER,
-            deadline DATETIME,
-            priority INTEGER DEFAULT 0,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            updated_at DATETIME,
-            completed_at DATETIME,
-            FOREIGN KEY(user) REFERENCES users(id),
-            FOREIGN KEY(tag) REFERENCES tags(id)
-        );
-        """)
-        await db.execute("""
-        CREATE TABLE IF NOT EXISTS task_shares (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            task_id INTEGER NOT NULL,
+# スキーマのマイグレーション（バージョン順に適用する）
+# 各ステップは (バージョン, 名前, SQL文のリスト) で、何度実行しても結果が変わらないように書く
+MIGRATIONS = [
+    (1, "add_query_indexes", [
+        # WHERE user = ? / user + is_done の検索、締切順の取得
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_done_deadline ON tasks(user, is_done, deadline)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_deadline ON tasks(user, deadline)",
+        # タグ削除時の UPDATE tasks SET tag = NULL WHERE tag = ?
+        "CREATE INDEX IF NOT EXISTS idx_tasks_tag ON tasks(tag)",
+        # 共有されたタスク（user_id起点）と共有先ユーザー（task_id起点）
+        "CREATE INDEX IF NOT EXISTS idx_task_shares_user_task ON task_shares(user_id, task_id)",
+        "CREATE INDEX IF NOT EXISTS idx_task_shares_task_user ON task_shares(task_id, user_id)",
+        # タスクごとのリマインダーと、未送信リマインダーの日時順走査
+        "CREATE INDEX IF NOT EXISTS idx_reminders_task ON reminders(task_id)",
+        "CREATE INDEX IF NOT EXISTS idx_reminders_sent_remind_at ON reminders(is_sent, remind_at)",
+        "CREATE INDEX IF NOT EXISTS idx_reminders_remind_at ON reminders(remind_at)",
+    ]),
+    (2, "add_tasks_fts", [
+        # タスク名・説明の全文検索用インデックス（日本語も引けるようtrigramで分割）
+        """CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+            name, description, content='tasks', content_rowid='id', tokenize='trigram'
+        )""",
+        # tasksの変更に追従させるトリガー
+        """CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF name, description ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO tasks_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+        END""",
+        # 既存タスクを索引に取り込む
+        "INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')",
+    ]),
+    (3, "add_task_sort_indexes", [
+        # query_tasksの並び順（ソートキー, id）をユーザー単位でインデックスから読めるようにする
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_created ON tasks(user, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_priority ON tasks(user, priority)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_name ON tasks(user, name COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_deadline_sort ON tasks(user, COALESCE(deadline, '9999-12-31 23:59:59'))",
+    ]),
+    (4, "add_import_checkpoints", [
+        # utils/importer.py の再開位置（取り込みと同じトランザクションで更新する）
+        """CREATE TABLE IF NOT EXISTS import_checkpoints (
+            source TEXT NOT NULL,
             user_id INTEGER NOT NULL,
-            FOREIGN KEY(task_id) REFERENCES tasks(id),
-            FOREIGN KEY(user_id) REFERENCES users(id)
-        );
-        """)
-        await db.execute("""
-        CREATE TABLE IF NOT EXISTS reminders (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            task_id INTEGER NOT NULL,
-            remind_at DATETIME NOT NULL,
-            is_sent INTEGER DEFAULT 0,
-            FOREIGN KEY(task_id) REFERENCES tasks(id)
-        );
-        """)
-        await db.commit()
+            rows INTEGER NOT NULL DEFAULT 0,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY(source, user_id)
+        )""",
+    ]),
+    (5, "coalesce_task_priority_sort_index", [
+        # query_tasksの優先度順はNULLを0として並べるため、同じ式でインデックスを張り直す
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_priority_sort ON tasks(user, COALESCE(priority, 0))",
+        "DROP INDEX IF EXISTS idx_tasks_user_priority",
+        # 新しいインデックスに統計情報がないとプランナーが他の並び順でも選んでしまうため、統計を取り直す
+        "ANALYZE tasks",
+    ]),
+]
+
+# 最新のスキーマバージョン（作成・マイグレーションが済むと PRAGMA user_version に記録する）
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# テーブル定義（マイグレーションより前に作成する）
+TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tags (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        color TEXT,
+        FOREIGN KEY(user) REFERENCES users(id),
+        UNIQUE(user, name)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user INTEGER NOT NULL,
+        shared_with TEXT,
+        is_done INTEGER DEFAULT 0,
+        name TEXT NOT NULL,
+        description TEXT,
+        tag INTEGER,
+        deadline DATETIME,
+        priority INTEGER DEFAULT 0,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME,
+        completed_at DATETIME,
+        FOREIGN KEY(user) REFERENCES users(id),
+        FOREIGN KEY(tag) REFERENCES tags(id)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS task_shares (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        FOREIGN KEY(task_id) REFERENCES tasks(id),
+        FOREIGN KEY(user_id) REFERENCES users(id)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS reminders (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER NOT NULL,
+        remind_at DATETIME NOT NULL,
+        is_sent INTEGER DEFAULT 0,
+        FOREIGN KEY(task_id) REFERENCES tasks(id)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    """,
+]
+
+def get_schema_version(conn):
+    """
+    適用済みの最新マイグレーションのバージョンを取得する
+
+    Args:
+        conn (sqlite3.Connection): データベース接続
+
+    Returns:
+        int: バージョン番号（未適用の場合は0）
+    """
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+def migrate(conn):
+    """
+    未適用のマイグレーションを順番に適用する
+
+    各ステップは1トランザクション（BEGIN IMMEDIATE）で実行し、途中で失敗した場合はそのステップだけ
+    ロールバックして例外を送出する（適用済みのステップは残る）。複数のプロセスが同時に
+    起動しても、書き込みロックを取ってから適用済みかを確認するため二重に適用しない。
+
+    Args:
+        conn (sqlite3.Connection): 自動コミットモード（isolation_level=None）の接続
+
+    Returns:
+        list: 今回適用したバージョン番号のリスト
+    """
+    applied = []
+    for version, name, statements in MIGRATIONS:
+        if version <= get_schema_version(conn):
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if version > get_schema_version(conn):
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(
+                    "INSERT INTO schema_version (version, name) VALUES (?, ?)",
+                    (version, name)
+                )
+                applied.append(version)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    return applied
+
+def ensure_schema(db_path=DB_PATH):
+    """
+    テーブルを作成し、未適用のマイグレーションを適用する（何度呼び出してもよい）
+
+    PRAGMA user_version が SCHEMA_VERSION 以上なら何もせずに返るため、
+    作成済みのデータベースでは接続してPRAGMAを1回読むだけで済む。
+    ファイルが存在しない場合は作成する。
+
+    Args:
+        db_path (str): データベースファイルのパス
+
+    Returns:
+        list: 今回適用したマイグレーションのバージョン番号のリスト
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for statement in TABLES:
+                conn.execute(statement)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        applied = migrate(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return applied
+    finally:
+        conn.close()
 
 if __name__ == "__main__":
-    asyncio.run(init_db())
\ No newline at end of file
+    applied = ensure_schema()
+    print(f"Applied migrations: {applied}" if applied else "Schema is up to date")
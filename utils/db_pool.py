@@ -0,0 +1,400 @@
+import aiosqlite
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    DB_PATH,
+    DB_POOL_READERS,
+    DB_POOL_HEALTH_CHECK_INTERVAL,
+    DB_PRAGMA_PROFILES,
+    DB_DURABILITY_PROFILE,
+    DB_CHECKPOINT_INTERVAL,
+    DB_OPTIMIZE_INTERVAL,
+)
+from utils.metrics import metrics, InstrumentedConnection
+
+# 接続初期化時に設定できるPRAGMA（journal_modeは最初に設定する）
+PRAGMA_ORDER = ("journal_mode", "busy_timeout", "synchronous", "cache_size", "mmap_size", "temp_store")
+
+
+def get_pragmas(profile=DB_DURABILITY_PROFILE):
+    """
+    プロファイル名から接続に設定するPRAGMAを取得する
+
+    Args:
+        profile (str): config.DB_PRAGMA_PROFILES のプロファイル名
+
+    Returns:
+        dict: PRAGMA名 → 値
+    """
+    if profile not in DB_PRAGMA_PROFILES:
+        raise ValueError(f"Unknown durability profile: {profile}")
+    return DB_PRAGMA_PROFILES[profile]
+
+
+async def apply_pragmas(conn, pragmas):
+    """
+    接続にPRAGMAを設定する
+
+    Args:
+        conn (aiosqlite.Connection): 対象の接続
+        pragmas (dict): PRAGMA名 → 値
+    """
+    for name in PRAGMA_ORDER:
+        if name in pragmas:
+            value = pragmas[name]
+            if not isinstance(value, int):
+                value = str(value).upper()
+                if not value.isalnum():
+                    raise ValueError(f"Invalid value for PRAGMA {name}: {pragmas[name]}")
+            await conn.execute(f"PRAGMA {name} = {value}")
+
+
+class _ConnectionQueue:
+    """
+    接続の貸し出しを管理するキュー
+
+    UIスレッドとリマインダースレッドなど、異なるイベントループから同時に
+    利用されるため、asyncio.Queueではなくスレッドロックと待機Futureで実装する。
+    """
+
+    def __init__(self, factory, limit):
+        self._factory = factory
+        self._limit = limit
+        self._lock = threading.Lock()
+        self._idle = deque()
+        self._waiters = deque()
+        self._opened = 0
+
+    async def get(self):
+        """
+        接続を1本取得する（空きがなければ新規作成、上限なら返却を待つ）
+
+        Returns:
+            aiosqlite.Connection: 取得した接続
+        """
+        with self._lock:
+            if self._idle:
+                return self._idle.popleft()
+            if self._opened < self._limit:
+                self._opened += 1
+                waiter = None
+            else:
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.append(waiter)
+
+        if waiter is None:
+            try:
+                return await self._factory()
+            except BaseException:
+                with self._lock:
+                    self._opened -= 1
+                raise
+
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+            # 受け渡し直後にキャンセルされた場合は接続を戻す
+            if waiter.done() and not waiter.cancelled():
+                self.put(waiter.result())
+            raise
+
+    def put(self, conn):
+        """
+        接続を返却する（待機中の利用者がいればそのまま受け渡す）
+
+        Args:
+            conn (aiosqlite.Connection): 返却する接続
+        """
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if waiter.done():
+                    continue
+                try:
+                    waiter.get_loop().call_soon_threadsafe(self._hand_over, waiter, conn)
+                    return
+                except RuntimeError:
+                    # 待機側のイベントループが既に閉じている
+                    continue
+            self._idle.append(conn)
+
+    def _hand_over(self, waiter, conn):
+        if waiter.done():
+            self.put(conn)
+        else:
+            waiter.set_result(conn)
+
+    def discard(self):
+        """
+        壊れた接続を破棄したことを記録し、作成枠を1つ空ける
+        """
+        with self._lock:
+            self._opened -= 1
+
+    def drain(self):
+        """
+        空いている接続をすべて取り出す（取り出した接続はputで戻すかdiscardする）
+
+        Returns:
+            list: 空いていた接続のリスト
+        """
+        with self._lock:
+            conns = list(self._idle)
+            self._idle.clear()
+            return conns
+
+
+class ConnectionPool:
+    """
+    SQLite接続プール
+
+    読み取り用の接続を複数本、書き込み用の接続を1本だけ長期間保持し、
+    呼び出しのたびに接続（とaiosqliteのワーカースレッド）を作り直すコストを省く。
+    """
+
+    def __init__(self, db_path=DB_PATH, readers=DB_POOL_READERS,
+                 health_check_interval=DB_POOL_HEALTH_CHECK_INTERVAL, pragmas=None):
+        self.db_path = db_path
+        self.health_check_interval = health_check_interval
+        self.pragmas = get_pragmas() if pragmas is None else pragmas
+        self._readers = _ConnectionQueue(self._connect, max(1, readers))
+        self._writers = _ConnectionQueue(self._connect, 1)
+        self._last_used = {}
+        self._closed = False
+
+    async def _connect(self):
+        start = time.perf_counter()
+        conn = aiosqlite.connect(self.db_path)
+        # 閉じ忘れた接続がプロセス終了を妨げないようにする
+        conn.daemon = True
+        await conn
+        try:
+            await apply_pragmas(conn, self.pragmas)
+        except BaseException:
+            await conn.close()
+            raise
+        metrics.record_connection("open", (time.perf_counter() - start) * 1000)
+        self._last_used[id(conn)] = time.monotonic()
+        return conn
+
+    async def _is_healthy(self, conn):
+        try:
+            await conn.execute("SELECT 1")
+            return True
+        except Exception:
+            return False
+
+    async def _acquire(self, queue):
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        start = time.perf_counter()
+        while True:
+            conn = await queue.get()
+            idle = time.monotonic() - self._last_used.get(id(conn), 0)
+            if idle < self.health_check_interval or await self._is_healthy(conn):
+                metrics.record_connection("acquire", (time.perf_counter() - start) * 1000)
+                return conn
+            await self._close_quietly(conn)
+            queue.discard()
+
+    async def _release(self, queue, conn):
+        if self._closed:
+            # 貸し出し中にプールが閉じられた接続はここで閉じる
+            await self._close_quietly(conn)
+            queue.discard()
+            return
+        self._last_used[id(conn)] = time.monotonic()
+        queue.put(conn)
+
+    async def _close_quietly(self, conn):
+        self._last_used.pop(id(conn), None)
+        try:
+            await conn.close()
+        except Exception:
+            pass
+
+    @asynccontextmanager
+    async def reader(self):
+        """
+        読み取り用の接続を借りる
+
+        Yields:
+            aiosqlite.Connection: 読み取り用接続
+        """
+        conn = await self._acquire(self._readers)
+        try:
+            yield InstrumentedConnection(conn) if metrics.enabled else conn
+        finally:
+            await self._release(self._readers, conn)
+
+    @asynccontextmanager
+    async def writer(self):
+        """
+        書き込み用の接続を借りる（同時に1つの処理だけが利用できる）
+
+        例外が発生した場合は未コミットの変更をロールバックしてから返却する。
+
+        Yields:
+            aiosqlite.Connection: 書き込み用接続
+        """
+        conn = await self._acquire(self._writers)
+        try:
+            yield InstrumentedConnection(conn) if metrics.enabled else conn
+        except BaseException as error:
+            try:
+                await conn.rollback()
+            except Exception:
+                # ロールバックできない接続は返却せずに破棄し、元の例外を呼び出し元に伝える
+                await self._close_quietly(conn)
+                self._writers.discard()
+                raise error
+            await self._release(self._writers, conn)
+            raise
+        else:
+            await self._release(self._writers, conn)
+
+    async def health_check(self):
+        """
+        空いている接続すべての疎通を確認し、壊れた接続を破棄する
+
+        Returns:
+            int: 破棄した接続の数
+        """
+        broken = 0
+        for queue in (self._readers, self._writers):
+            for conn in queue.drain():
+                if await self._is_healthy(conn):
+                    await self._release(queue, conn)
+                else:
+                    await self._close_quietly(conn)
+                    queue.discard()
+                    broken += 1
+        return broken
+
+    async def checkpoint(self, mode="PASSIVE"):
+        """
+        WALの内容をデータベースファイルへ書き戻す
+
+        Args:
+            mode (str): チェックポイントのモード（PASSIVE, FULL, RESTART, TRUNCATE）
+
+        Returns:
+            tuple: (busy, WALのページ数, 書き戻したページ数)
+        """
+        mode = mode.upper()
+        if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+            raise ValueError(f"Invalid checkpoint mode: {mode}")
+        async with self.writer() as conn:
+            cursor = await conn.execute(f"PRAGMA wal_checkpoint({mode})")
+            return await cursor.fetchone()
+
+    async def optimize(self):
+        """
+        PRAGMA optimize でクエリプランナーの統計情報を必要な分だけ更新する
+        """
+        async with self.writer() as conn:
+            await conn.execute("PRAGMA optimize")
+
+    async def close(self):
+        """
+        空いている接続をすべて閉じ、以降の貸し出しを停止する
+        """
+        self._closed = True
+        for queue in (self._readers, self._writers):
+            for conn in queue.drain():
+                await self._close_quietly(conn)
+                queue.discard()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    アプリ全体で共有する接続プールを取得する（初回呼び出し時に作成）
+
+    Returns:
+        ConnectionPool: 接続プール
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool()
+        return _pool
+
+
+async def open_pool(db_path=DB_PATH, readers=DB_POOL_READERS, profile=DB_DURABILITY_PROFILE):
+    """
+    接続先や接続数を指定して共有プールを作り直す（既存のプールは閉じる）
+
+    Args:
+        db_path (str): データベースファイルのパス
+        readers (int): 読み取り用接続の数
+        profile (str): 接続に設定するPRAGMAのプロファイル名
+
+    Returns:
+        ConnectionPool: 新しい接続プール
+    """
+    global _pool
+    with _pool_lock:
+        old, _pool = _pool, ConnectionPool(db_path, readers, pragmas=get_pragmas(profile))
+        pool = _pool
+    if old is not None:
+        await old.close()
+    return pool
+
+
+async def close_pool():
+    """
+    共有プールを閉じる（アプリ終了時に呼び出す）
+    """
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        await pool.close()
+
+
+async def maintenance_loop(checkpoint_interval=DB_CHECKPOINT_INTERVAL,
+                           optimize_interval=DB_OPTIMIZE_INTERVAL):
+    """
+    共有プールに対してWALのチェックポイントとPRAGMA optimizeを定期的に実行する
+
+    Args:
+        checkpoint_interval (float): チェックポイントの間隔（秒）
+        optimize_interval (float): PRAGMA optimizeの間隔（秒）
+    """
+    next_checkpoint = time.monotonic() + checkpoint_interval
+    next_optimize = time.monotonic() + optimize_interval
+    while True:
+        await asyncio.sleep(max(0, min(next_checkpoint, next_optimize) - time.monotonic()))
+        now = time.monotonic()
+        try:
+            if now >= next_checkpoint:
+                next_checkpoint = now + checkpoint_interval
+                await get_pool().checkpoint()
+            if now >= next_optimize:
+                next_optimize = now + optimize_interval
+                await get_pool().optimize()
+        except Exception as e:
+            print(f"Error in database maintenance: {e}")
+
+
+def reader():
+    """共有プールから読み取り用接続を借りる"""
+    return get_pool().reader()
+
+
+def writer():
+    """共有プールから書き込み用接続を借りる"""
+    return get_pool().writer()
@@ -0,0 +1,219 @@
+import argparse
+import asyncio
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import DB_PATH, EXPORT_BATCH_SIZE
+from utils.db_pool import reader, open_pool, close_pool
+
+# エクスポートするテーブルと、全件・ユーザー指定時のSQL
+# ユーザー指定時は、そのユーザーのタスクに紐づく共有・リマインダーも含める
+# tasksにはタグ名（tag_name）も付け、utils/importer.py でそのまま取り込めるようにする（tagはタグID）
+EXPORT_QUERIES = {
+    "tags": (
+        "SELECT * FROM tags ORDER BY id",
+        "SELECT * FROM tags WHERE user = ? ORDER BY id",
+    ),
+    "tasks": (
+        "SELECT tasks.*, tags.name AS tag_name FROM tasks LEFT JOIN tags ON tasks.tag = tags.id ORDER BY tasks.id",
+        """SELECT tasks.*, tags.name AS tag_name FROM tasks LEFT JOIN tags ON tasks.tag = tags.id
+           WHERE tasks.user = ? ORDER BY tasks.id""",
+    ),
+    "task_shares": (
+        "SELECT * FROM task_shares ORDER BY id",
+        """SELECT task_shares.* FROM task_shares
+           JOIN tasks ON task_shares.task_id = tasks.id
+           WHERE tasks.user = ? ORDER BY task_shares.id""",
+    ),
+    "reminders": (
+        "SELECT * FROM reminders ORDER BY id",
+        """SELECT reminders.* FROM reminders
+           JOIN tasks ON reminders.task_id = tasks.id
+           WHERE tasks.user = ? ORDER BY reminders.id""",
+    ),
+}
+
+FORMATS = ("jsonl", "csv")
+
+
+async def count_rows(table, user_id=None):
+    """
+    エクスポート対象の行数を数える（進捗表示用）
+
+    Args:
+        table (str): EXPORT_QUERIES のテーブル名
+        user_id (int, optional): 指定した場合はそのユーザーの行だけを数える
+
+    Returns:
+        int: 行数
+    """
+    sql, params = _query(table, user_id)
+    async with reader() as conn:
+        cursor = await conn.execute(f"SELECT COUNT(*) FROM ({sql})", params)
+        return (await cursor.fetchone())[0]
+
+
+def _query(table, user_id):
+    if table not in EXPORT_QUERIES:
+        raise ValueError(f"Unknown table: {table}")
+    all_rows, by_user = EXPORT_QUERIES[table]
+    return (all_rows, ()) if user_id is None else (by_user, (user_id,))
+
+
+async def iter_batches(table, user_id=None, batch_size=EXPORT_BATCH_SIZE):
+    """
+    テーブルの行をfetchmanyでbatch_size件ずつ読み出す
+
+    全件をfetchallで読み込まないため、テーブルの大きさによらずメモリ使用量は一定になる。
+    読み出しの間は読み取り用接続を1本借り続ける（同じスナップショットを読む）。
+
+    Args:
+        table (str): EXPORT_QUERIES のテーブル名
+        user_id (int, optional): 指定した場合はそのユーザーの行だけを読む
+        batch_size (int): 1回に読み出す行数
+
+    Yields:
+        tuple: (列名のリスト, 行のタプルのリスト)。行がない場合も列名を渡すため空のリストを1回返す
+    """
+    sql, params = _query(table, user_id)
+    async with reader() as conn:
+        cursor = await conn.execute(sql, params)
+        columns = [column[0] for column in cursor.description]
+        try:
+            rows = await cursor.fetchmany(batch_size)
+            yield columns, rows
+            while rows:
+                rows = await cursor.fetchmany(batch_size)
+                if rows:
+                    yield columns, rows
+        finally:
+            await cursor.close()
+
+
+def jsonl_lines(columns, rows):
+    """行を1行1オブジェクトのJSONにする"""
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n"
+
+
+def csv_lines(columns, rows, header=False):
+    """行をCSVにする（headerがTrueの場合は先頭に列名の行を付ける）"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for row in ([columns] if header else []) + list(rows):
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def open_output(path, compress=False):
+    """
+    書き出し先のファイルをテキストモードで開く（compressがTrueの場合はgzip）
+    """
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+async def export_table(table, path, fmt="jsonl", compress=False, user_id=None,
+                       batch_size=EXPORT_BATCH_SIZE, progress=None):
+    """
+    テーブルをJSONLまたはCSVのファイルに書き出す
+
+    Args:
+        table (str): EXPORT_QUERIES のテーブル名
+        path (str): 書き出すファイルのパス
+        fmt (str): "jsonl" または "csv"
+        compress (bool): Trueの場合はgzipで圧縮する
+        user_id (int, optional): 指定した場合はそのユーザーの行だけを書き出す
+        batch_size (int): 1回に読み出す行数
+        progress (callable, optional): バッチを書き出すたびに progress(table, 書き出した行数, 全体の行数) で呼ばれる
+
+    Returns:
+        int: 書き出した行数
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt}")
+    total = await count_rows(table, user_id) if progress else None
+    written = 0
+    header = fmt == "csv"
+    with open_output(path, compress) as f:
+        async for columns, rows in iter_batches(table, user_id, batch_size):
+            if fmt == "jsonl":
+                lines = jsonl_lines(columns, rows)
+            else:
+                # 最初のバッチ（空のテーブルでも1回は来る）で列名の行を書き出す
+                lines = csv_lines(columns, rows, header)
+                header = False
+            for line in lines:
+                f.write(line)
+            written += len(rows)
+            if progress:
+                progress(table, written, total)
+    return written
+
+
+def export_path(output_dir, table, fmt="jsonl", compress=False):
+    """テーブルの書き出し先のファイルパス（例: export/tasks.jsonl.gz）"""
+    return os.path.join(output_dir, f"{table}.{fmt}" + (".gz" if compress else ""))
+
+
+async def export_all(output_dir, fmt="jsonl", compress=False, user_id=None, tables=None,
+                     batch_size=EXPORT_BATCH_SIZE, progress=None):
+    """
+    テーブルごとに1ファイルずつ書き出す
+
+    Args:
+        output_dir (str): 書き出すディレクトリ（なければ作成する）
+        tables (list, optional): 書き出すテーブル名のリスト。Noneの場合はすべて
+        その他の引数は export_table と同じ
+
+    Returns:
+        dict: テーブル名 → 書き出した行数
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    counts = {}
+    for table in tables or EXPORT_QUERIES:
+        counts[table] = await export_table(
+            table, export_path(output_dir, table, fmt, compress), fmt, compress,
+            user_id, batch_size, progress,
+        )
+    return counts
+
+
+def print_progress(table, written, total):
+    """進捗を標準エラー出力に表示する"""
+    percent = f" ({written * 100 // total}%)" if total else ""
+    print(f"\r{table}: {written}/{total}{percent}", end="\n" if written == total else "", file=sys.stderr)
+
+
+async def main(args):
+    await open_pool(args.db)
+    try:
+        counts = await export_all(
+            args.output_dir, args.format, args.gzip, args.user,
+            args.tables.split(",") if args.tables else None, args.batch_size,
+            None if args.quiet else print_progress,
+        )
+    finally:
+        await close_pool()
+    for table, count in counts.items():
+        print(f"{table}: {count} rows -> {export_path(args.output_dir, table, args.format, args.gzip)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="タスク・タグ・共有・リマインダーをJSONL/CSVに書き出す")
+    parser.add_argument("output_dir", help="書き出すディレクトリ")
+    parser.add_argument("--format", choices=FORMATS, default="jsonl", help="出力形式")
+    parser.add_argument("--gzip", action="store_true", help="gzipで圧縮する")
+    parser.add_argument("--user", type=int, default=None, help="このユーザーのデータだけを書き出す")
+    parser.add_argument("--tables", default=None, help="書き出すテーブル（カンマ区切り）")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE, help="1回に読み出す行数")
+    parser.add_argument("--db", default=DB_PATH, help="データベースファイルのパス")
+    parser.add_argument("--quiet", action="store_true", help="進捗を表示しない")
+    asyncio.run(main(parser.parse_args()))
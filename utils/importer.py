@@ -0,0 +1,327 @@
+import argparse
+import asyncio
+import csv
+import gzip
+import json
+import os
+import sys
+import time
+from itertools import islice
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import DB_PATH, IMPORT_BATCH_SIZE
+from utils.db_init import ensure_schema
+from utils.db_pool import reader, writer, open_pool, close_pool
+
+FORMATS = ("jsonl", "csv")
+
+# 取り込むタスクの項目（CSVの列名・JSONLのキー）。tagはタグ名で指定する
+TASK_COLUMNS = ("name", "description", "tag", "deadline", "priority", "is_done", "created_at", "completed_at")
+# utils/export.py が書き出したtasksでは、tagはタグIDでタグ名はtag_nameに入っている
+EXPORTED_TAG_NAME = "tag_name"
+
+
+def detect_format(path):
+    """
+    拡張子から入力形式を判定する（.gz は外して判定）
+
+    Returns:
+        str: "jsonl" または "csv"
+    """
+    base = path[:-3] if path.endswith(".gz") else path
+    for fmt in FORMATS:
+        if base.endswith(f".{fmt}"):
+            return fmt
+    raise ValueError(f"Cannot detect the format of {path} (use .jsonl or .csv, optionally .gz)")
+
+
+def open_input(path):
+    """入力ファイルをテキストモードで開く（.gz はgzipとして読む）"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def iter_records(f, fmt):
+    """
+    入力を1件ずつ読み出す（ファイル全体は読み込まない）
+
+    JSONLは行をそのまま返し、parse_record で読み込む（不正な行を1件の不正なレコードとして扱うため）。
+
+    Args:
+        f (file): open_input で開いたファイル
+        fmt (str): "jsonl" または "csv"
+
+    Yields:
+        dict or str: 1件分のタスク（CSV）または1行分の文字列（JSONL）
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(f)
+        return
+    for line in f:
+        if line.strip():
+            yield line
+
+
+def parse_record(record):
+    """
+    iter_records の1件を辞書にする（JSONLの行はここでJSONとして読み込む）
+
+    Raises:
+        ValueError: JSONとして読み込めない場合
+    """
+    if isinstance(record, str):
+        return json.loads(record)
+    return record
+
+
+def normalize_record(record):
+    """
+    入力の1件を挿入する値に変換する（CSVの空文字はNoneとして扱う）
+
+    Returns:
+        tuple: (name, description, タグ名, deadline, priority, is_done, created_at, completed_at)
+    """
+    if not isinstance(record, dict):
+        raise ValueError("record must be an object")
+    values = {column: record.get(column) for column in TASK_COLUMNS}
+    if EXPORTED_TAG_NAME in record:
+        values["tag"] = record[EXPORTED_TAG_NAME]
+    for column, value in values.items():
+        if isinstance(value, str) and value.strip() == "":
+            values[column] = None
+    if not values["name"]:
+        raise ValueError("name is required")
+    priority = int(values["priority"] or 0)
+    is_done = values["is_done"]
+    if isinstance(is_done, str):
+        is_done = is_done.strip().lower() in ("1", "true", "yes")
+    return (
+        str(values["name"]),
+        values["description"],
+        None if values["tag"] is None else str(values["tag"]),
+        values["deadline"],
+        priority,
+        1 if is_done else 0,
+        values["created_at"],
+        values["completed_at"],
+    )
+
+
+class TagMap:
+    """
+    タグ名 → タグIDの対応をメモリに保持し、未登録のタグ名はバッチごとにまとめて作成する
+    """
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.created = 0
+        self._ids = {}
+
+    async def load(self):
+        """ユーザーの既存タグを読み込む"""
+        async with reader() as conn:
+            cursor = await conn.execute("SELECT id, name FROM tags WHERE user = ?", (self.user_id,))
+            self._ids = {name: tag_id for tag_id, name in await cursor.fetchall()}
+
+    async def resolve(self, conn, names):
+        """
+        タグ名をIDに変換する（未登録のタグは呼び出し側のトランザクション内で作成する）
+
+        Args:
+            conn (aiosqlite.Connection): 書き込み用接続
+            names (set): タグ名の集合
+
+        Returns:
+            dict: タグ名 → タグID
+        """
+        missing = list(self.missing(names))
+        if missing:
+            await conn.executemany(
+                "INSERT OR IGNORE INTO tags (user, name) VALUES (?, ?)",
+                [(self.user_id, name) for name in missing]
+            )
+            placeholders = ", ".join("?" * len(missing))
+            cursor = await conn.execute(
+                f"SELECT id, name FROM tags WHERE user = ? AND name IN ({placeholders})",
+                (self.user_id, *missing)
+            )
+            for tag_id, name in await cursor.fetchall():
+                self._ids[name] = tag_id
+            self.created += len(missing)
+        return self._ids
+
+    def missing(self, names):
+        """対応表にないタグ名の集合"""
+        return {name for name in names if name not in self._ids}
+
+    def forget(self, names):
+        """ロールバックされたバッチで作成したはずのタグを対応表から外す"""
+        for name in names:
+            if self._ids.pop(name, None) is not None:
+                self.created -= 1
+
+
+async def get_checkpoint(source, user_id):
+    """
+    前回の取り込みで処理済みの入力件数を取得する
+
+    Returns:
+        int: 処理済みの件数（チェックポイントがない場合は0）
+    """
+    async with reader() as conn:
+        cursor = await conn.execute(
+            "SELECT rows FROM import_checkpoints WHERE source = ? AND user_id = ?",
+            (source, user_id)
+        )
+        row = await cursor.fetchone()
+        return row[0] if row else 0
+
+
+async def clear_checkpoint(source, user_id):
+    """チェックポイントを削除する（最初から取り込み直す・取り込み完了時）"""
+    async with writer() as conn:
+        await conn.execute(
+            "DELETE FROM import_checkpoints WHERE source = ? AND user_id = ?",
+            (source, user_id)
+        )
+        await conn.commit()
+
+
+async def insert_batch(tag_map, source, rows, consumed):
+    """
+    1バッチ分のタスクを1つのトランザクションで挿入し、同じトランザクションで再開位置を記録する
+
+    Args:
+        tag_map (TagMap): タグ名の対応表
+        source (str): 入力ファイルの識別子（絶対パス）
+        rows (list): normalize_record の戻り値のリスト
+        consumed (int): このバッチまでに処理した入力の件数
+    """
+    user_id = tag_map.user_id
+    names = {row[2] for row in rows if row[2] is not None}
+    new_names = tag_map.missing(names)
+    try:
+        async with writer() as conn:
+            tag_ids = await tag_map.resolve(conn, names)
+            await conn.executemany(
+                """INSERT INTO tasks (user, name, description, tag, deadline, priority, is_done, created_at, completed_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), ?)""",
+                [
+                    (user_id, name, description, None if tag is None else tag_ids[tag],
+                     deadline, priority, is_done, created_at, completed_at)
+                    for name, description, tag, deadline, priority, is_done, created_at, completed_at in rows
+                ]
+            )
+            await conn.execute(
+                """INSERT INTO import_checkpoints (source, user_id, rows, updated_at)
+                   VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                   ON CONFLICT(source, user_id) DO UPDATE SET rows = excluded.rows, updated_at = excluded.updated_at""",
+                (source, user_id, consumed)
+            )
+            await conn.commit()
+    except BaseException:
+        tag_map.forget(new_names)
+        raise
+
+
+async def import_tasks(path, user_id, fmt=None, batch_size=IMPORT_BATCH_SIZE, resume=True,
+                       skip_invalid=False, progress=None):
+    """
+    JSONL/CSVのタスクを読みながら、batch_size件ずつまとめて挿入する
+
+    各バッチは1つのトランザクションで、タスク・新しいタグ・再開位置をまとめてコミットする。
+    途中で失敗した場合は、同じファイルで再実行すると最後にコミットしたバッチの続きから取り込む。
+
+    Args:
+        path (str): 入力ファイルのパス（.jsonl / .csv、.gz で圧縮していてもよい）
+        user_id (int): タスクを登録するユーザーのID
+        fmt (str, optional): "jsonl" または "csv"。Noneの場合は拡張子から判定
+        batch_size (int): 1トランザクションで挿入する件数
+        resume (bool): Falseの場合はチェックポイントを無視して最初から取り込む
+        skip_invalid (bool): Trueの場合は不正な行を数えて読み飛ばす（Falseの場合は例外を送出）
+        progress (callable, optional): バッチをコミットするたびに progress(取り込んだ件数, 経過秒数) で呼ばれる
+
+    Returns:
+        dict: imported（今回挿入した件数）, skipped（再開で読み飛ばした件数）, invalid（不正な行の数）,
+              tags_created, seconds, rows_per_sec
+    """
+    fmt = fmt or detect_format(path)
+    source = os.path.abspath(path)
+    if not resume:
+        await clear_checkpoint(source, user_id)
+    skipped = await get_checkpoint(source, user_id)
+    tag_map = TagMap(user_id)
+    await tag_map.load()
+
+    imported = invalid = 0
+    consumed = skipped
+    start = time.perf_counter()
+    with open_input(path) as f:
+        records = islice(iter_records(f, fmt), skipped, None)
+        batch = []
+        for number, record in enumerate(records, start=skipped + 1):
+            consumed += 1
+            try:
+                batch.append(normalize_record(parse_record(record)))
+            except (ValueError, TypeError) as e:
+                if not skip_invalid:
+                    raise ValueError(f"{path}: record {number}: {e}") from e
+                invalid += 1
+            if len(batch) >= batch_size:
+                await insert_batch(tag_map, source, batch, consumed)
+                imported += len(batch)
+                batch = []
+                if progress:
+                    progress(imported, time.perf_counter() - start)
+        if batch:
+            await insert_batch(tag_map, source, batch, consumed)
+            imported += len(batch)
+            if progress:
+                progress(imported, time.perf_counter() - start)
+    await clear_checkpoint(source, user_id)
+
+    seconds = time.perf_counter() - start
+    return {
+        "imported": imported,
+        "skipped": skipped,
+        "invalid": invalid,
+        "tags_created": tag_map.created,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(imported / seconds, 1) if seconds > 0 else None,
+    }
+
+
+def print_progress(imported, seconds):
+    """進捗と取り込み速度を標準エラー出力に表示する"""
+    rate = imported / seconds if seconds > 0 else 0
+    print(f"\rimported {imported} rows ({rate:,.0f} rows/s)", end="", file=sys.stderr)
+
+
+async def main(args):
+    # import_checkpoints などのテーブルがなければ作成する
+    ensure_schema(args.db)
+    await open_pool(args.db)
+    try:
+        result = await import_tasks(
+            args.path, args.user, args.format, args.batch_size,
+            resume=not args.restart, skip_invalid=args.skip_invalid,
+            progress=None if args.quiet else print_progress,
+        )
+    finally:
+        await close_pool()
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(json.dumps(result, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JSONL/CSVのタスクをまとめて取り込む")
+    parser.add_argument("path", help="入力ファイル（.jsonl / .csv、.gz 可）")
+    parser.add_argument("--user", type=int, required=True, help="タスクを登録するユーザーのID")
+    parser.add_argument("--format", choices=FORMATS, default=None, help="入力形式（省略時は拡張子から判定）")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="1トランザクションで挿入する件数")
+    parser.add_argument("--restart", action="store_true", help="前回の途中から再開せず、最初から取り込む")
+    parser.add_argument("--skip-invalid", action="store_true", help="不正な行を読み飛ばす")
+    parser.add_argument("--db", default=DB_PATH, help="データベースファイルのパス")
+    parser.add_argument("--quiet", action="store_true", help="進捗を表示しない")
+    asyncio.run(main(parser.parse_args()))
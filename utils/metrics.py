@@ -0,0 +1,303 @@
+import atexit
+import bisect
+import contextvars
+import functools
+import inspect
+import json
+import queue
+import threading
+import time
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import METRICS_ENABLED, SLOW_QUERY_MS, SLOW_QUERY_LOG, METRICS_DUMP_PATH
+
+# レイテンシのヒストグラムの区切り（ミリ秒、各値以下の回数を数える。最後は上限なし）
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+# 実行中のutils/db.pyの関数名（スロークエリログに記録する）
+current_function = contextvars.ContextVar("current_function", default=None)
+
+
+class _Stats:
+    """1つの計測対象の集計値"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def add(self, elapsed_ms, rows=0, error=False):
+        self.calls += 1
+        self.errors += 1 if error else 0
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.rows += rows
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+    def snapshot(self):
+        histogram = {f"le_{bound}ms": count for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets)}
+        histogram["inf"] = self.buckets[-1]
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.calls, 3) if self.calls else 0,
+            "max_ms": round(self.max_ms, 3),
+            "rows": self.rows,
+            "histogram": histogram,
+        }
+
+
+class _LogWriter:
+    """
+    ログファイルへの追記を専用のスレッドで行う（イベントループのスレッドではファイルを開かない）
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="slow-query-log", daemon=True)
+        self._thread.start()
+
+    def write(self, line):
+        """1行を書き出し待ちに追加する（ブロックしない）"""
+        self._queue.put(line)
+
+    def flush(self):
+        """書き出し待ちの行がすべて書き出されるまで待つ"""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            lines = [self._queue.get()]
+            # 溜まっている行はまとめて1回で追記する
+            while True:
+                try:
+                    lines.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.writelines(lines)
+            except OSError as e:
+                print(f"Error writing slow query log: {e}")
+            finally:
+                for _ in lines:
+                    self._queue.task_done()
+
+
+class Metrics:
+    """
+    データベース呼び出しの計測値を集める
+
+    - functions: utils/db.pyの関数ごとの呼び出し回数・レイテンシ・返した行数
+    - connections: 接続の作成（open）と、プールからの取得待ち（acquire）にかかった時間
+    - slow_queries: しきい値を超えたSQLの件数（内容はスロークエリログに書き出す）
+    """
+
+    def __init__(self, slow_query_ms=SLOW_QUERY_MS, slow_query_log=SLOW_QUERY_LOG):
+        self.enabled = METRICS_ENABLED
+        self.slow_query_ms = slow_query_ms
+        self.slow_query_log = slow_query_log
+        self._lock = threading.Lock()
+        self._functions = {}
+        self._connections = {}
+        self._slow_queries = 0
+        self._started_at = time.time()
+        self._log_writer = None
+
+    def record_function(self, name, elapsed_ms, rows=0, error=False):
+        with self._lock:
+            self._functions.setdefault(name, _Stats()).add(elapsed_ms, rows, error)
+
+    def record_connection(self, kind, elapsed_ms):
+        with self._lock:
+            self._connections.setdefault(kind, _Stats()).add(elapsed_ms)
+
+    def record_slow_query(self, sql, params_count, elapsed_ms, plan):
+        """
+        スロークエリをログファイルに1行のJSONとして追記する（パラメータの値は記録しない）
+
+        ファイルへの書き込みは_LogWriterのスレッドで行い、呼び出し元（イベントループ）は待たない。
+        """
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "function": current_function.get(),
+            "duration_ms": round(elapsed_ms, 3),
+            "sql": " ".join(sql.split()),
+            "params": params_count,
+            "plan": plan,
+        }
+        with self._lock:
+            self._slow_queries += 1
+            if not self.slow_query_log:
+                return
+            if self._log_writer is None or self._log_writer.path != self.slow_query_log:
+                self._log_writer = _LogWriter(self.slow_query_log)
+            log_writer = self._log_writer
+        log_writer.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def flush(self):
+        """スロークエリログの書き出し待ちがなくなるまで待つ"""
+        with self._lock:
+            log_writer = self._log_writer
+        if log_writer is not None:
+            log_writer.flush()
+
+    def snapshot(self):
+        """
+        現在の計測値を取得する
+
+        Returns:
+            dict: functions, connections, slow_queries, uptime_sec を持つ辞書
+        """
+        with self._lock:
+            return {
+                "uptime_sec": round(time.time() - self._started_at, 3),
+                "functions": {name: stats.snapshot() for name, stats in sorted(self._functions.items())},
+                "connections": {kind: stats.snapshot() for kind, stats in sorted(self._connections.items())},
+                "slow_queries": self._slow_queries,
+            }
+
+    def reset(self):
+        """計測値をすべて消去する"""
+        with self._lock:
+            self._functions = {}
+            self._connections = {}
+            self._slow_queries = 0
+            self._started_at = time.time()
+
+    def dump(self, path):
+        """
+        計測値をJSONファイルに書き出す
+
+        Args:
+            path (str): 書き出すファイルのパス
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+
+
+metrics = Metrics()
+
+
+def get_metrics():
+    """現在の計測値を取得する"""
+    return metrics.snapshot()
+
+
+def reset_metrics():
+    """計測値をすべて消去する"""
+    metrics.reset()
+
+
+def _count_rows(result):
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[0], list):
+        # query_tasks の (行のリスト, カーソル)
+        return len(result[0])
+    return 0 if result is None or isinstance(result, (bool, int, bytes, str)) else 1
+
+
+def instrument(func):
+    """
+    utils/db.pyの非同期関数を計測対象にするデコレータ
+
+    計測対象の関数から呼ばれた計測対象の関数は数えない（外側の呼び出しだけを1回として記録する）。
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        if not metrics.enabled or current_function.get() is not None:
+            return await func(*args, **kwargs)
+        token = current_function.set(name)
+        start = time.perf_counter()
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException:
+            metrics.record_function(name, (time.perf_counter() - start) * 1000, error=True)
+            raise
+        finally:
+            current_function.reset(token)
+        metrics.record_function(name, (time.perf_counter() - start) * 1000, _count_rows(result))
+        return result
+
+    wrapper.__wrapped__ = func
+    return wrapper
+
+
+def instrument_module(module):
+    """
+    モジュールで定義されたすべての非同期関数をinstrumentで包む
+
+    Args:
+        module (module): 対象のモジュール（utils.db）
+    """
+    for name, value in list(vars(module).items()):
+        if (inspect.iscoroutinefunction(value) and value.__module__ == module.__name__
+                and not name.startswith("_") and not hasattr(value, "__wrapped__")):
+            setattr(module, name, instrument(value))
+
+
+class InstrumentedConnection:
+    """
+    aiosqliteの接続を包み、execute/executemanyの所要時間を測ってスロークエリを記録する
+
+    それ以外の属性（commit, rollbackなど）は元の接続にそのまま委ねる。
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    async def _timed(self, method, sql, params):
+        start = time.perf_counter()
+        result = await method(sql, params)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if metrics.enabled and elapsed_ms >= metrics.slow_query_ms:
+            await self._log_slow_query(sql, params, elapsed_ms)
+        return result
+
+    async def _log_slow_query(self, sql, params, elapsed_ms):
+        plan = []
+        params_count = len(params) if params is not None and hasattr(params, "__len__") else None
+        if sql.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "INSERT", "WITH")):
+            try:
+                cursor = await self._conn.execute(f"EXPLAIN QUERY PLAN {sql}", params or ())
+                plan = [row[3] for row in await cursor.fetchall()]
+            except Exception as e:
+                plan = [f"EXPLAIN failed: {e}"]
+        metrics.record_slow_query(sql, params_count, elapsed_ms, plan)
+
+    async def execute(self, sql, parameters=None):
+        return await self._timed(self._conn.execute, sql, parameters)
+
+    async def executemany(self, sql, parameters):
+        rows = parameters if isinstance(parameters, list) else list(parameters)
+        start = time.perf_counter()
+        result = await self._conn.executemany(sql, rows)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if metrics.enabled and elapsed_ms >= metrics.slow_query_ms:
+            # 実行計画は先頭の行のパラメータで取得する
+            await self._log_slow_query(sql, rows[0] if rows else None, elapsed_ms)
+        return result
+
+
+def _dump_on_exit():
+    metrics.flush()
+    if METRICS_DUMP_PATH and metrics.enabled:
+        try:
+            metrics.dump(METRICS_DUMP_PATH)
+        except OSError as e:
+            print(f"Error writing metrics: {e}")
+
+
+atexit.register(_dump_on_exit)
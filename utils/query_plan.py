@@ -0,0 +1,122 @@
+import aiosqlite
+import asyncio
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import DB_PATH
+from utils.db import build_task_query
+
+# utils/db.py の代表的なクエリと、使われるべきインデックス
+# (関数名, SQL, パラメータ, 期待するインデックス名（複数候補の場合はタプル）)
+CHECKED_QUERIES = [
+    ("get_tasks_by_user",
+     "SELECT * FROM tasks WHERE user = ?",
+     (1,), ("idx_tasks_user_done_deadline", "idx_tasks_user_deadline", "idx_tasks_user_created",
+            "idx_tasks_user_priority_sort", "idx_tasks_user_name", "idx_tasks_user_deadline_sort")),
+    ("search_tasks(is_done)",
+     "SELECT * FROM tasks WHERE user = ? AND is_done = ?",
+     (1, 0), "idx_tasks_user_done_deadline"),
+    ("get_tasks_by_deadline",
+     "SELECT * FROM tasks WHERE user = ? AND deadline IS NOT NULL AND deadline >= ? ORDER BY deadline ASC",
+     (1, "2025-01-01"), "idx_tasks_user_deadline"),
+    ("delete_tag",
+     "UPDATE tasks SET tag = NULL WHERE tag = ?",
+     (1,), "idx_tasks_tag"),
+    ("get_shared_tasks",
+     """SELECT tasks.* FROM tasks
+        JOIN task_shares ON tasks.id = task_shares.task_id
+        WHERE task_shares.user_id = ?""",
+     (1,), "idx_task_shares_user_task"),
+    ("get_shared_users_by_task",
+     """SELECT users.id, users.email, users.name
+        FROM users
+        JOIN task_shares ON users.id = task_shares.user_id
+        WHERE task_shares.task_id = ?""",
+     (1,), "idx_task_shares_task_user"),
+    ("unshare_task",
+     "DELETE FROM task_shares WHERE task_id = ? AND user_id = ?",
+     (1, 1), "idx_task_shares_task_user"),
+    ("get_reminders_by_task",
+     "SELECT * FROM reminders WHERE task_id = ?",
+     (1,), "idx_reminders_task"),
+    ("get_reminders_by_user",
+     """SELECT reminders.* FROM reminders
+        JOIN tasks ON reminders.task_id = tasks.id
+        WHERE tasks.user = ?""",
+     (1,), "idx_reminders_task"),
+    # ユーザー指定時は、ユーザーが多いとそのユーザーのタスク → idx_reminders_task の順に辿り、
+    # 数件の未送信リマインダーを一時B-TREEで並べ替える方が速いため、どちらの計画も許す
+    ("get_pending_reminders(user_id)",
+     """SELECT reminders.* FROM reminders
+        JOIN tasks ON reminders.task_id = tasks.id
+        WHERE reminders.is_sent = 0 AND tasks.user = ?
+        ORDER BY reminders.remind_at ASC""",
+     (1,), ("idx_reminders_task", "idx_reminders_sent_remind_at")),
+    ("get_pending_reminders",
+     """SELECT reminders.* FROM reminders
+        JOIN tasks ON reminders.task_id = tasks.id
+        WHERE reminders.is_sent = 0
+        ORDER BY reminders.remind_at ASC""",
+     (), "idx_reminders_sent_remind_at"),
+    ("get_upcoming_reminders",
+     "SELECT * FROM reminders WHERE remind_at >= ? ORDER BY remind_at ASC",
+     ("2025-01-01",), "idx_reminders_remind_at"),
+]
+
+# query_tasks の並び順ごとに使われるべきインデックスと、カーソルに渡すソートキーの値
+QUERY_TASKS_INDEXES = {
+    "created_at": ("idx_tasks_user_created", "2025-01-01 00:00:00"),
+    "deadline": ("idx_tasks_user_deadline_sort", "2025-01-01 00:00"),
+    "priority": ("idx_tasks_user_priority_sort", 2),
+    "name": ("idx_tasks_user_name", "m"),
+}
+
+# query_tasks はSQLを組み立てる build_task_query から、1ページ目と続きのページ（カーソル指定）の両方を確認する
+for sort_by, (index, value) in QUERY_TASKS_INDEXES.items():
+    for order in ("ASC", "DESC"):
+        for cursor in (None, [value, 100]):
+            sql, params = build_task_query(1, sort_by=sort_by, order=order, limit=100, cursor=cursor)
+            name = f"query_tasks(sort_by={sort_by}, order={order}{', cursor' if cursor else ''})"
+            # カーソル指定時はソートキーの範囲で検索できていること（user=? だけでは続きの位置まで読み飛ばす）
+            CHECKED_QUERIES.append((name, sql, tuple(params), f"{index} (user=? AND" if cursor else index))
+
+async def explain(conn, sql, params=()):
+    """
+    クエリの実行計画を取得する
+
+    Args:
+        conn (aiosqlite.Connection): データベース接続
+        sql (str): 対象のSQL
+        params (tuple): SQLのパラメータ
+
+    Returns:
+        list: 実行計画の各行の説明文（detail列）のリスト
+    """
+    cursor = await conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+    return [row[3] for row in await cursor.fetchall()]
+
+async def check_query_plans(db_path=DB_PATH):
+    """
+    CHECKED_QUERIES の実行計画を表示し、期待するインデックスが使われているか確認する
+
+    Args:
+        db_path (str): 確認するデータベースファイルのパス
+
+    Returns:
+        bool: すべてのクエリで期待するインデックスが使われていればTrue
+    """
+    ok = True
+    async with aiosqlite.connect(db_path) as conn:
+        for name, sql, params, indexes in CHECKED_QUERIES:
+            if isinstance(indexes, str):
+                indexes = (indexes,)
+            plan = await explain(conn, sql, params)
+            used = any(f"INDEX {index} " in f"{detail} " for detail in plan for index in indexes)
+            ok = ok and used
+            print(f"[{'OK' if used else 'NG'}] {name} ({' / '.join(indexes)})")
+            for detail in plan:
+                print(f"    {detail}")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(check_query_plans()) else 1)
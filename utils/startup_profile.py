@@ -0,0 +1,119 @@
+import sys
+import time
+from contextlib import contextmanager
+
+
+class _TimedLoader:
+    """
+    モジュールのローダーを包み、exec_module（モジュール本体の実行）の時間を計測する
+
+    それ以外の属性は元のローダーにそのまま委ねる。
+    """
+
+    def __init__(self, loader, profiler, name):
+        self._loader = loader
+        self._profiler = profiler
+        self._name = name
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # モジュールから見えるローダーは元のものに戻しておく
+        module.__loader__ = self._loader
+        if getattr(module, "__spec__", None) is not None:
+            module.__spec__.loader = self._loader
+        with self._profiler.timing(self._name):
+            self._loader.exec_module(module)
+
+
+class StartupProfiler:
+    """
+    起動時のモジュールごとのimport時間と、起動処理の経過時間を記録する
+
+    sys.meta_pathの先頭に入り、他のファインダーが見つけたモジュールの実行時間を測る。
+    （python -X importtime と同じく、自身の時間と依存モジュールを含む累積時間を記録する）
+    """
+
+    def __init__(self):
+        self.started = None
+        self.imports = {}  # モジュール名 -> (自身の時間, 累積時間)（秒）
+        self.marks = []  # (ラベル, 開始からの秒数)
+        self._stack = []  # 計測中のモジュールごとの [開始時刻, 依存モジュールの時間]
+        self._finding = False
+
+    def start(self):
+        """計測を開始する（計測したいimportより前に呼び出す）"""
+        if self.started is None:
+            self.started = time.perf_counter()
+            sys.meta_path.insert(0, self)
+
+    def stop(self):
+        """importの計測を終了する"""
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def mark(self, label):
+        """
+        開始からの経過時間を記録する
+
+        Args:
+            label (str): 記録する時点の名前（例: "first paint"）
+        """
+        self.marks.append((label, time.perf_counter() - self.started))
+
+    def find_spec(self, fullname, path=None, target=None):
+        if self._finding:
+            return None
+        self._finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._finding = False
+        if spec.loader is None or not hasattr(spec.loader, "exec_module"):
+            return spec
+        spec.loader = _TimedLoader(spec.loader, self, fullname)
+        return spec
+
+    @contextmanager
+    def timing(self, name):
+        entry = [time.perf_counter(), 0.0]
+        self._stack.append(entry)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            total = time.perf_counter() - entry[0]
+            self.imports[name] = (total - entry[1], total)
+            if self._stack:
+                self._stack[-1][1] += total
+
+    def report(self, limit=25, file=None):
+        """
+        計測結果を表示する
+
+        Args:
+            limit (int): 表示するモジュールの数（累積時間の長い順）
+            file (file, optional): 出力先（省略時は標準エラー出力）
+        """
+        file = file or sys.stderr
+        print(f"startup profile: {len(self.imports)} modules imported", file=file)
+        print(f"{'self ms':>10} {'cumulative ms':>14}  module", file=file)
+        ranked = sorted(self.imports.items(), key=lambda item: item[1][1], reverse=True)
+        for name, (own, total) in ranked[:limit]:
+            print(f"{own * 1000:10.1f} {total * 1000:14.1f}  {name}", file=file)
+        for label, seconds in self.marks:
+            print(f"{label}: {seconds * 1000:.1f} ms", file=file)
+
+
+profiler = StartupProfiler()